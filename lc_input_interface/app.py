@@ -1,12 +1,14 @@
 # app.py
 
 import argparse
-import time
-from flask import Flask, render_template, request
+import os
+from flask import Flask, Response, jsonify, render_template, request, stream_with_context
 from input_providers.manual import ManualInputProvider
+from input_providers.bulk import BulkImportProvider
 from input_providers.live import LiveInputProvider
-from langchain_relay import process_input
-from lc_core import save_memory  # Assumes lc_core exists
+from langchain_relay import process_input, stream_input_sse
+from lc_core import stream_turn, render_metrics, profile, compact_memory, rollback_compaction
+from lc_core import save_memory, warm_up, is_ready, get_warm_up_error, import_texts  # Assumes lc_core exists
 
 app = Flask(__name__)
 
@@ -22,9 +24,20 @@ def index():
         if chunk.startswith("Error:"):
             error_message = chunk
         else:
-            result = process_input(chunk)
+            result = process_input(chunk, session_id=request.form.get('session_id') or None)
     return render_template('input_form.html', result=result, error=error_message)
 
+@app.route('/stream', methods=['POST'])
+def stream():
+    # Server-Sent Events: tokens are sent as the LLM produces them (see templates/input_form.html)
+    text_input = request.form.get('text_input', '')
+    chunk = ManualInputProvider(text_input, None).get_next_chunk()
+    if chunk.startswith("Error:"):
+        return jsonify(error=chunk), 400
+    events = stream_input_sse(chunk, session_id=request.form.get('session_id') or None)
+    return Response(stream_with_context(events), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/save', methods=['POST'])
 def trigger_save():
     try:
@@ -33,37 +46,126 @@ def trigger_save():
     except Exception as e:
         return render_template('input_form.html', result='', error=f'Error during save: {e}')
 
-def run_flask_app(host, port):
+@app.route('/import', methods=['POST'])
+def bulk_import():
+    # Large transcripts: streamed, chunked and embedded straight into memory, no LLM call
+    file = request.files.get('file_input', None)
+    session_id = request.form.get('session_id') or None
+    try:
+        input_provider = ManualInputProvider('', file).bulk_import()
+        count = import_texts(input_provider.chunks(), session_id=session_id,
+                             metadata={"source": input_provider.filename})
+    except ValueError as e:
+        return render_template('input_form.html', result='', error=f'Error: {e}')
+    return render_template('input_form.html', result=f'✅ Imported {count} chunks into memory.', error='')
+
+@app.route('/healthz')
+def healthz():
+    # Liveness: answers as soon as the worker is up, before the model has loaded
+    return jsonify(status='ok')
+
+@app.route('/readyz')
+def readyz():
+    error = get_warm_up_error()
+    if error is not None:
+        return jsonify(ready=False, error=str(error)), 503
+    if not is_ready():
+        return jsonify(ready=False), 503
+    return jsonify(ready=True)
+
+@app.route('/metrics')
+def metrics():
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/debug/profile')
+def debug_profile():
+    # Collapsed stacks for flamegraph.pl / speedscope; 404 unless PROFILER_ENABLED is set
+    seconds = min(request.args.get('seconds', 10.0, type=float), 60.0)
+    try:
+        return Response(profile(seconds), mimetype='text/plain')
+    except PermissionError:
+        return jsonify(error='not found'), 404
+    except RuntimeError as e:
+        return jsonify(error=str(e)), 409
+
+def run_flask_app(host, port, warm=True):
     print(f"Starting Flask app on {host}:{port}")
+    # With debug=True the reloader runs the app in a child process (WERKZEUG_RUN_MAIN set);
+    # the watching parent serves nothing and must not load the model as well
+    if warm and os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        warm_up(background=True)
     app.run(debug=True, host=host, port=port)
 
-def run_live_mode(log_file_path):
+def run_live_mode(log_file_path, window=2.0, max_tokens=512):
     print(f"Starting LiveInputProvider for {log_file_path}")
-    input_provider = LiveInputProvider(log_file_path)
-    while True:
-        try:
-            chunk = input_provider.get_next_chunk()
-            output = process_input(chunk)
-            print(f"LangChain Output:\n{output}")
-            time.sleep(1)
-        except NotImplementedError:
-            print("LiveInputProvider not yet implemented. Exiting.")
-            break
+    input_provider = LiveInputProvider(log_file_path, window=window, max_tokens=max_tokens)
+    try:
+        # Blocks until the log grows; each chunk's offset is saved once it has been processed
+        for chunk in input_provider.chunks():
+            print("LangChain Output:")
+            ctx, tokens = stream_turn(chunk.text)
+            for token in tokens:
+                print(token, end="", flush=True)
+            print(f"\n  (first token {ctx.first_token or 0:.2f}s, total {ctx.total_time:.2f}s)")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        input_provider.close()
+
+def run_import_mode(file_path, session_id=None, chunk_tokens=400, overlap_tokens=50):
+    input_provider = BulkImportProvider(file_path, chunk_tokens=chunk_tokens, overlap_tokens=overlap_tokens)
+    print(f"Importing {file_path} ({input_provider.total_bytes:,} bytes)")
+
+    def report(count):
+        print(f"  {count} chunks, {input_provider.progress or 0:.0%} read", flush=True)
+
+    count = import_texts(input_provider.chunks(), session_id=session_id,
+                         metadata={"source": file_path}, progress=report)
+    save_memory()
+    print(f"Imported {count} chunks.")
+
+def run_compact_mode(session_id=None, rollback=None):
+    if rollback:
+        restored = rollback_compaction(session_id, rollback)
+        save_memory()
+        print(f"Rolled back {rollback}: {restored} turns restored.")
+        return
+    results = compact_memory(session_id)
+    save_memory()
+    for result in results:
+        print(f"{result.session_id}: {result.turns} turns -> {result.summaries} summaries, "
+              f"{result.facts} facts (rollback tag {result.tag})")
+    print(f"Compacted {len(results)} sessions.")
 
 def main():
     parser = argparse.ArgumentParser(description="LC Input Interface Module")
-    parser.add_argument('--mode', choices=['text', 'live'], default='text', help="Input mode: 'text' or 'live'")
+    parser.add_argument('--mode', choices=['text', 'live', 'import', 'compact'], default='text', help="Input mode: 'text', 'live', 'import' or 'compact'")
     parser.add_argument('--host', default='127.0.0.1', help="Host IP (default: 127.0.0.1)")
     parser.add_argument('--port', default=5000, type=int, help="Port (default: 5000)")
     parser.add_argument('--logfile', default='/path/to/logfile.jsonl', help="Path to log file for live mode")
+    parser.add_argument('--window', default=2.0, type=float, help="Live mode: seconds of log lines grouped into one chunk")
+    parser.add_argument('--max-tokens', default=512, type=int, help="Live mode: emit a chunk early once it reaches this many tokens (estimated)")
+    parser.add_argument('--file', help="Import mode: transcript to chunk and embed into memory (.txt/.md/.jsonl)")
+    parser.add_argument('--session', default=None, help="Import mode: session to import into (default: the default session); compact mode: session to compact (default: all)")
+    parser.add_argument('--chunk-tokens', default=400, type=int, help="Import mode: tokens per chunk (estimated)")
+    parser.add_argument('--overlap-tokens', default=50, type=int, help="Import mode: tokens repeated from the previous chunk")
+    parser.add_argument('--rollback', metavar='TAG', help="Compact mode: undo the compaction run with this tag instead")
+    parser.add_argument('--no-warmup', action='store_true', help="Load the model and index on first request instead of at startup")
     args = parser.parse_args()
 
     if args.mode == 'text':
-        run_flask_app(args.host, args.port)
+        run_flask_app(args.host, args.port, warm=not args.no_warmup)
     elif args.mode == 'live':
-        run_live_mode(args.logfile)
+        run_live_mode(args.logfile, window=args.window, max_tokens=args.max_tokens)
+    elif args.mode == 'import':
+        if not args.file:
+            parser.error("--mode import requires --file")
+        run_import_mode(args.file, session_id=args.session,
+                        chunk_tokens=args.chunk_tokens, overlap_tokens=args.overlap_tokens)
+    elif args.mode == 'compact':
+        run_compact_mode(session_id=args.session, rollback=args.rollback)
     else:
-        print("Invalid mode. Use --mode text or --mode live.")
+        print("Invalid mode. Use --mode text, --mode live, --mode import or --mode compact.")
 
 if __name__ == '__main__':
     main()
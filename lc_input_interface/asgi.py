@@ -0,0 +1,135 @@
+# asgi.py
+#
+# Async JSON API for LangChain Core, for any ASGI server:
+#
+#   uvicorn asgi:app --host 127.0.0.1 --port 8000
+#
+#   POST /api/process   {"input": "...", "session_id": "..."}  ->  {"response": "...", "timings": {...}}
+#   POST /api/stream    same body  ->  text/event-stream of {"token": "..."}, then a "done" event
+#   GET  /healthz, /readyz, /metrics (Prometheus text format)
+#
+# The Flask app (app.py) keeps serving the HTML form; this app serves
+# programmatic clients without tying up a worker per in-flight LLM call.
+
+import asyncio
+import json
+
+from langchain_relay import done_event, sse_event
+from lc_core import (flush_writes, get_warm_up_error, is_ready, process_turn_async, render_metrics,
+                     stream_turn_async, warm_up)
+
+MAX_BODY_BYTES = 1 << 20
+
+
+async def _read_body(receive) -> bytes:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if len(body) > MAX_BODY_BYTES:
+            raise ValueError("request body too large")
+        if not message.get("more_body"):
+            return body
+
+
+async def _send_json(send, status: int, payload: dict):
+    body = json.dumps(payload).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            warm_up(background=True)
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            # Let queued memory write-backs land before the process exits
+            await asyncio.get_running_loop().run_in_executor(None, flush_writes)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def _read_input(receive, send):
+    """Parse {"input", "session_id"}; sends a 400 and returns None when invalid."""
+    try:
+        payload = json.loads(await _read_body(receive) or b"{}")
+    except ValueError as e:
+        await _send_json(send, 400, {"error": f"invalid request: {e}"})
+        return None
+    text = payload.get("input") if isinstance(payload, dict) else None
+    if not isinstance(text, str) or not text.strip():
+        await _send_json(send, 400, {"error": "'input' must be a non-empty string"})
+        return None
+    return payload
+
+
+async def _process(receive, send):
+    payload = await _read_input(receive, send)
+    if payload is None:
+        return
+    text = payload["input"]
+
+    try:
+        ctx = await process_turn_async(text, session_id=payload.get("session_id"))
+    except Exception as e:
+        return await _send_json(send, 500, {"error": str(e)})
+    await _send_json(send, 200, {"response": ctx.response, "session_id": ctx.session_id, "cached": ctx.cached,
+                                 "timings": ctx.timings})
+
+
+async def _stream(receive, send):
+    payload = await _read_input(receive, send)
+    if payload is None:
+        return
+    try:
+        ctx, tokens = await stream_turn_async(payload["input"], session_id=payload.get("session_id"))
+    except Exception as e:
+        return await _send_json(send, 500, {"error": str(e)})
+
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache")],
+    })
+    try:
+        async for token in tokens:
+            await send({"type": "http.response.body", "body": sse_event({"token": token}).encode(), "more_body": True})
+        last = done_event(ctx)
+    except Exception as e:
+        last = sse_event({"error": str(e)}, event="error")
+    await send({"type": "http.response.body", "body": last.encode()})
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await _lifespan(receive, send)
+    if scope["type"] != "http":
+        return
+
+    path, method = scope["path"], scope["method"]
+    if path == "/api/process":
+        if method != "POST":
+            return await _send_json(send, 405, {"error": "use POST"})
+        return await _process(receive, send)
+    if path == "/api/stream":
+        if method != "POST":
+            return await _send_json(send, 405, {"error": "use POST"})
+        return await _stream(receive, send)
+    if path == "/healthz":
+        return await _send_json(send, 200, {"status": "ok"})
+    if path == "/readyz":
+        error = get_warm_up_error()
+        if error is not None:
+            return await _send_json(send, 503, {"ready": False, "error": str(error)})
+        return await _send_json(send, 200 if is_ready() else 503, {"ready": is_ready()})
+    if path == "/metrics":
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"text/plain; version=0.0.4")]})
+        return await send({"type": "http.response.body", "body": render_metrics().encode()})
+    await _send_json(send, 404, {"error": "not found"})
@@ -0,0 +1,41 @@
+# benchmarks/fake_embedding.py
+#
+# Deterministic stand-in for BGEEmbedding so memory benchmarks run without
+# downloading a model: a hashed bag of words, L2-normalised. Texts sharing
+# words land near each other, which is all the benchmarks need.
+
+import zlib
+from typing import List
+
+import numpy as np
+
+
+class HashEmbedding:
+    def __init__(self, dimension: int = 256):
+        self.dimension = dimension
+        self.model_name = f"hash-{dimension}"
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, zlib.crc32(word.encode("utf-8")) % self.dimension] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def embed_documents(self, texts):
+        return self.encode(texts).tolist()
+
+    def embed_query(self, text):
+        return self.encode([text])[0].tolist()
+
+
+def in_memory_manager(dimension: int = 256):
+    """A VectorStoreMemory on HashEmbedding that neither loads nor saves shards."""
+    from lc_core.embedding_cache import CachedEmbedding
+    from lc_core.memory_manager import VectorStoreMemory
+
+    memory = VectorStoreMemory()
+    memory._model = CachedEmbedding(HashEmbedding(dimension), max_entries=0)
+    memory._sessions = {}
+    return memory
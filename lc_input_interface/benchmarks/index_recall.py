@@ -0,0 +1,95 @@
+# benchmarks/index_recall.py
+#
+# Recall@k, query throughput and index size for FAISS index types against the
+# exact flat baseline, on synthetic clustered vectors shaped like BGE output.
+#
+#   python -m benchmarks.index_recall --n 200000 --dim 1024 \
+#       --factories Flat HNSW32 SQ8 "IVF1024,PQ64"
+
+import argparse
+import json
+import time
+
+import faiss
+import numpy as np
+
+from lc_core.index_factory import configure_search
+
+
+def synthetic_vectors(n: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=n)
+    vectors = centres[labels] + 0.35 * rng.standard_normal((n, dim)).astype(np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def recall_at_k(truth: np.ndarray, found: np.ndarray) -> float:
+    k = truth.shape[1]
+    hits = sum(len(set(t) & set(f)) for t, f in zip(truth, found))
+    return hits / (len(truth) * k)
+
+
+def bench_factory(factory, corpus, queries, truth, k, nprobe, ef_search, train_size):
+    index = faiss.index_factory(corpus.shape[1], factory)
+    start = time.perf_counter()
+    if not index.is_trained:
+        index.train(corpus[:train_size])
+    train_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index.add(corpus)
+    add_s = time.perf_counter() - start
+
+    configure_search(index, nprobe=nprobe, ef_search=ef_search)
+    start = time.perf_counter()
+    _, found = index.search(queries, k)
+    search_s = time.perf_counter() - start
+
+    return {
+        "factory": factory,
+        "recall_at_k": round(recall_at_k(truth, found), 4),
+        "qps": round(len(queries) / search_s, 1),
+        "train_s": round(train_s, 3),
+        "add_s": round(add_s, 3),
+        "index_bytes": int(faiss.serialize_index(index).size),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall@k of FAISS index types vs the flat baseline")
+    parser.add_argument("--n", type=int, default=100000, help="Corpus size")
+    parser.add_argument("--dim", type=int, default=1024, help="Vector dimension (1024 for bge-large)")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--nprobe", type=int, default=16)
+    parser.add_argument("--ef-search", type=int, default=64)
+    parser.add_argument("--train-size", type=int, default=50000)
+    parser.add_argument("--factories", nargs="+", default=["Flat", "HNSW32", "SQ8", "IVF1024,PQ64"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    corpus = synthetic_vectors(args.n, args.dim, args.clusters, args.seed)
+    queries = synthetic_vectors(args.queries, args.dim, args.clusters, args.seed + 1)
+
+    baseline = faiss.IndexFlatL2(args.dim)
+    baseline.add(corpus)
+    _, truth = baseline.search(queries, args.k)
+
+    results = []
+    for factory in args.factories:
+        result = bench_factory(factory, corpus, queries, truth, args.k, args.nprobe, args.ef_search, args.train_size)
+        results.append(result)
+        print(f"{factory:>16}  recall@{args.k}={result['recall_at_k']:.4f}  "
+              f"qps={result['qps']:>9}  size={result['index_bytes'] / 2**20:8.1f} MiB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"params": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
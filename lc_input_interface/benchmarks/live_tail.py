@@ -0,0 +1,91 @@
+# benchmarks/live_tail.py
+#
+# Throughput and lag of LiveInputProvider against a synthetic JSONL writer.
+# The writer appends timestamped records at --rate lines/s (0 = as fast as
+# possible), optionally rotating the log every --rotate-every lines; the
+# reader reports lines/s consumed and the delay from write to chunk delivery.
+#
+#   python -m benchmarks.live_tail --rate 2000 --duration 10 --rotate-every 5000
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+from input_providers.live import LiveInputProvider
+
+
+def write_log(path: str, rate: float, duration: float, rotate_every: int, stop: threading.Event) -> int:
+    written, start = 0, time.perf_counter()
+    f = open(path, "a")
+    try:
+        while not stop.is_set() and time.perf_counter() - start < duration:
+            record = {"ts": time.time(), "seq": written, "text": f"Player {written % 7} moves to room {written}"}
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            written += 1
+            if rotate_every and written % rotate_every == 0:
+                f.close()
+                os.replace(path, f"{path}.1")
+                f = open(path, "a")
+            if rate:
+                # Sleep until this line's slot rather than a fixed interval, so the rate holds
+                delay = start + written / rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+    finally:
+        f.close()
+    return written
+
+
+def percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LiveInputProvider throughput and lag")
+    parser.add_argument("--rate", type=float, default=1000, help="Lines per second to write (0 = unthrottled)")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--rotate-every", type=int, default=0, help="Rotate the log every N lines (0 = never)")
+    parser.add_argument("--window", type=float, default=0.25)
+    parser.add_argument("--max-tokens", type=int, default=512)
+    parser.add_argument("--poll", action="store_true", help="Use polling instead of inotify")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="live_tail_")
+    path = os.path.join(directory, "session.jsonl")
+    open(path, "w").close()
+
+    stop = threading.Event()
+    result = {}
+    writer = threading.Thread(
+        target=lambda: result.setdefault("written", write_log(path, args.rate, args.duration, args.rotate_every, stop))
+    )
+    provider = LiveInputProvider(path, window=args.window, max_tokens=args.max_tokens,
+                                 use_inotify=False if args.poll else None)
+
+    lags, chunks, lines = [], 0, 0
+    start = time.perf_counter()
+    writer.start()
+    for chunk in provider.chunks(idle_timeout=max(1.0, 4 * args.window)):
+        now = time.time()
+        chunks += 1
+        lines += len(chunk.records)
+        lags.extend(now - record["ts"] for record in chunk.records if "ts" in record)
+    elapsed = time.perf_counter() - start
+    writer.join()
+    provider.close()
+
+    lags.sort()
+    print(f"written={result.get('written', 0)} read={lines} chunks={chunks} "
+          f"throughput={lines / elapsed:,.0f} lines/s")
+    print(f"lag p50={percentile(lags, 0.5) * 1000:.1f}ms p99={percentile(lags, 0.99) * 1000:.1f}ms "
+          f"max={(lags[-1] if lags else 0) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# benchmarks/load_test.py
+#
+# Closed-loop load test for the JSON API (asgi.py): `--concurrency` clients
+# each send requests back to back for `--duration` seconds, then requests/sec
+# and latency percentiles are reported. With --stream the clients call
+# /api/stream and latency is time to first token; the full-response time is
+# reported alongside.
+#
+#   python -m benchmarks.stub_llm --delay 0.5 &
+#   uvicorn asgi:app --port 8000 &
+#   python -m benchmarks.load_test --url http://127.0.0.1:8000/api/process --concurrency 32
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+
+def percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def request(http, url, payload, stream, latencies, totals):
+    start = time.perf_counter()
+    if not stream:
+        response = await http.post(url, json=payload)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        return
+    first = None
+    async with http.stream("POST", url, json=payload) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if first is None and line.startswith("data:"):
+                first = time.perf_counter() - start
+            if line.startswith("event: error"):
+                raise httpx.HTTPError("stream error")
+    latencies.append(first if first is not None else time.perf_counter() - start)
+    totals.append(time.perf_counter() - start)
+
+
+async def client(http, url, deadline, worker, stream, latencies, totals, errors):
+    n = 0
+    while time.perf_counter() < deadline:
+        payload = {"input": f"Load test question {worker}-{n}", "session_id": f"load-{worker % 4}"}
+        start = time.perf_counter()
+        try:
+            await request(http, url, payload, stream, latencies, totals)
+        except httpx.HTTPError:
+            errors.append(time.perf_counter() - start)
+        n += 1
+
+
+async def run(url: str, concurrency: int, duration: float, stream: bool = False) -> dict:
+    latencies, totals, errors = [], [], []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=120, limits=limits) as http:
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(client(http, url, deadline, w, stream, latencies, totals, errors)
+                               for w in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    result = {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+    }
+    if stream:
+        totals.sort()
+        result["total_p50_ms"] = round(percentile(totals, 0.50) * 1000, 1)
+        result["total_p95_ms"] = round(percentile(totals, 0.95) * 1000, 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Requests/sec and latency percentiles for the JSON API")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/api/process")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--stream", action="store_true", help="Use /api/stream and measure time to first token")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    url = args.url.replace("/api/process", "/api/stream") if args.stream else args.url
+    result = asyncio.run(run(url, args.concurrency, args.duration, stream=args.stream))
+    label = "first token " if args.stream else ""
+    print(f"{result['requests']} ok, {result['errors']} errors  rps={result['rps']}  {label}"
+          f"p50={result['p50_ms']}ms  p95={result['p95_ms']}ms  p99={result['p99_ms']}ms")
+    if args.stream:
+        print(f"full response p50={result['total_p50_ms']}ms  p95={result['total_p95_ms']}ms")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"params": vars(args), "result": result}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# benchmarks/session_isolation.py
+#
+# Multi-threaded check of VectorStoreMemory session isolation and lock
+# scaling. Each thread owns a session and mixes adds with searches; every
+# hit must carry its own session's ID. Run at increasing thread counts,
+# reporting operations/sec. With --shared all threads search one session
+# instead, which exercises parallel readers against a single writer.
+#
+#   python -m benchmarks.session_isolation --threads 1 2 4 8 --duration 5
+
+import argparse
+import contextlib
+import io
+import json
+import threading
+import time
+
+from benchmarks.fake_embedding import in_memory_manager
+
+
+def seed(memory, sessions, docs: int):
+    for sid in sessions:
+        memory.add([f"{sid} note {i} about room {i % 13}" for i in range(docs)], sid)
+
+
+def worker(memory, sid, deadline, write_every, k, counts, violations):
+    ops = n = 0
+    while time.perf_counter() < deadline:
+        if write_every and n % write_every == 0:
+            memory.add([f"{sid} note live {n} about room {n % 13}"], sid)
+        else:
+            for doc in memory.search(f"{sid} room {n % 13}", k, sid):
+                if doc.metadata.get("session_id") != sid:
+                    violations.append((sid, doc.metadata.get("session_id")))
+        ops += 1
+        n += 1
+    counts.append(ops)
+
+
+def run(threads: int, duration: float, docs: int, write_every: int, k: int, shared: bool) -> dict:
+    memory = in_memory_manager()
+    sessions = ["shared"] if shared else [f"session-{t}" for t in range(threads)]
+    seed(memory, sessions, docs)
+
+    counts, violations = [], []
+    deadline = time.perf_counter() + duration
+    pool = [
+        threading.Thread(target=worker, args=(memory, sessions[t % len(sessions)], deadline,
+                                              write_every, k, counts, violations))
+        for t in range(threads)
+    ]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    sizes = {sid: memory.size(sid) for sid in sessions}
+    return {
+        "threads": threads,
+        "ops": sum(counts),
+        "ops_per_s": round(sum(counts) / elapsed, 1),
+        "violations": len(violations),
+        "min_session_size": min(sizes.values()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VectorStoreMemory isolation and concurrency")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per thread count")
+    parser.add_argument("--docs", type=int, default=2000, help="Documents seeded per session")
+    parser.add_argument("--write-every", type=int, default=10, help="Every Nth operation is an add (0 = searches only)")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--shared", action="store_true", help="All threads use one session")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = []
+    for threads in args.threads:
+        # VectorStoreMemory logs every add; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = run(threads, args.duration, args.docs, args.write_every, args.k, args.shared)
+        results.append(result)
+        print(f"threads={result['threads']:<3} ops/s={result['ops_per_s']:<10} "
+              f"violations={result['violations']}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"params": vars(args), "results": results}, f, indent=2)
+    if any(result["violations"] for result in results):
+        raise SystemExit("session isolation violated")
+
+
+if __name__ == "__main__":
+    main()
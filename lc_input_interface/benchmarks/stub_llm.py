@@ -0,0 +1,103 @@
+# benchmarks/stub_llm.py
+#
+# Minimal OpenAI-compatible chat completions server with a fixed delay, so
+# the request pipeline can be load-tested without calling a real model.
+# Streaming requests get the reply word by word, --token-delay apart, after
+# the initial --delay.
+#
+#   python -m benchmarks.stub_llm --port 8001 --delay 0.5 --token-delay 0.02
+#
+# then set OPENAI_BASE_URL = "http://127.0.0.1:8001/v1" in lc_core/config.py.
+
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def completion(model: str, text: str) -> dict:
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": text},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+def completion_chunk(model: str, content: str = None) -> dict:
+    delta = {"content": content} if content is not None else {}
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": None if content is not None else "stop"}],
+    }
+
+
+def make_handler(delay: float, reply: str, token_delay: float = 0.0):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)) or 0)
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self.send_error(404)
+                return
+            request = json.loads(body or b"{}")
+            time.sleep(delay)
+            if request.get("stream"):
+                return self._stream(request.get("model", "stub"))
+            payload = json.dumps(completion(request.get("model", "stub"), reply)).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _stream(self, model: str):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            words = reply.split(" ")
+            for i, word in enumerate(words):
+                if i:
+                    time.sleep(token_delay)
+                chunk = completion_chunk(model, word if i == 0 else " " + word)
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            self.wfile.write(f"data: {json.dumps(completion_chunk(model))}\n\ndata: [DONE]\n\n".encode("utf-8"))
+            self.close_connection = True
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub LLM for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--delay", type=float, default=0.5, help="Seconds to wait before each reply")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="Seconds between streamed words")
+    parser.add_argument("--reply", default="This is a stub completion.")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.delay, args.reply, args.token_delay))
+    print(f"Stub LLM on http://{args.host}:{args.port}/v1 (delay {args.delay}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+# benchmarks/suite.py
+#
+# Benchmarks for the memory and retrieval hot paths on synthetic lore, CPU-only
+# and offline: embedding throughput, VectorStoreMemory add/search/save/load,
+# FactStore and SQLiteFactStore add/get/overwrite, and process_input end to end
+# against an in-process stub LLM. The deterministic HashEmbedding is used
+# unless --embedding bge names a small local model.
+#
+#   python -m benchmarks.suite --scale 10000 --output baseline.json
+#   python -m benchmarks.suite --scale 10000 --baseline baseline.json   # exits 1 on regression
+#   python -m benchmarks.suite --only memory facts --profile /tmp/prof  # cProfile per benchmark
+
+import argparse
+import contextlib
+import cProfile
+import io
+import json
+import os
+import platform
+import pstats
+import random
+import shutil
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from typing import Dict, Iterator, List
+
+from benchmarks.fake_embedding import HashEmbedding, in_memory_manager
+from lc_memory import FactStore, SQLiteFactStore
+
+NAMES = ["Aldric", "Brenna", "Corvin", "Dessa", "Elowen", "Fenwick", "Galen", "Hilde", "Isolde", "Jorah",
+         "Kestrel", "Lyra", "Maelis", "Nyx", "Orrin", "Perrin", "Quill", "Rowan", "Sable", "Tamsin"]
+PLACES = ["the Ashen Keep", "Duskmere", "the Hollow Road", "Ironvale", "the Sunken Library",
+          "Wyrmrest", "the Gilded Market", "Frostholm", "the Thornwood", "Saltmarsh"]
+ITEMS = ["a silver key", "the moon amulet", "a cracked map", "the ember blade", "a sealed letter",
+         "the raven banner", "a vial of nightshade", "the iron crown"]
+VERBS = ["travels to", "hides in", "searches", "defends", "betrays an ally in", "negotiates in", "escapes from"]
+PREDICATES = ["located_in", "carries", "allied_with", "distrusts", "owes_debt_to", "seeks"]
+
+
+def lore_corpus(n: int, seed: int = 0) -> Iterator[str]:
+    """n one-to-three sentence lore snippets, generated lazily so 10^7 fits in memory."""
+    rng = random.Random(seed)
+    for i in range(n):
+        sentences = []
+        for _ in range(rng.randint(1, 3)):
+            sentences.append(f"{rng.choice(NAMES)} {rng.choice(VERBS)} {rng.choice(PLACES)} "
+                             f"carrying {rng.choice(ITEMS)}.")
+        yield f"[{i}] " + " ".join(sentences)
+
+
+def lore_facts(n: int, seed: int = 0) -> Iterator[tuple]:
+    rng = random.Random(seed)
+    for i in range(n):
+        subject = f"{rng.choice(NAMES)}#{i % max(1, n // 20)}"
+        predicate = rng.choice(PREDICATES)
+        yield subject, predicate, rng.choice(PLACES + ITEMS + NAMES)
+
+
+def lore_queries(n: int, seed: int = 1) -> List[str]:
+    rng = random.Random(seed)
+    return [f"Where does {rng.choice(NAMES)} take {rng.choice(ITEMS)}?" for _ in range(n)]
+
+
+def latency(samples: List[float], prefix: str) -> Dict[str, float]:
+    samples = sorted(samples)
+    if not samples:
+        return {}
+    return {
+        f"{prefix}_p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+        f"{prefix}_p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 3),
+    }
+
+
+def timed_each(fn, items) -> List[float]:
+    samples = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+# --- Benchmarks ---
+
+def bench_embedding(args, model) -> dict:
+    texts = list(lore_corpus(min(args.scale, args.embed_texts)))
+    model.encode(texts[:8])  # warm up
+    start = time.perf_counter()
+    model.encode(texts)
+    return {"texts": len(texts), "encode_texts_per_s": round(len(texts) / (time.perf_counter() - start), 1)}
+
+
+def bench_memory(args, model) -> dict:
+    root = tempfile.mkdtemp(prefix="lc_bench_")
+    try:
+        memory = in_memory_manager()
+        memory._model.base = model
+        memory.root = root
+        start = time.perf_counter()
+        memory.import_texts(lore_corpus(args.scale), "bench", batch_size=args.batch)
+        add_s = time.perf_counter() - start
+
+        queries = lore_queries(args.queries)
+        result = {
+            "docs": args.scale,
+            "add_docs_per_s": round(args.scale / add_s, 1),
+            **latency(timed_each(lambda q: memory.search(q, args.k, "bench"), queries), "search"),
+        }
+
+        start = time.perf_counter()
+        memory.save()
+        result["save_s"] = round(time.perf_counter() - start, 3)
+        if os.path.isdir(memory._sessions_dir()):
+            loaded = in_memory_manager()
+            loaded._model = memory._model
+            loaded.root, loaded._sessions = root, None
+            start = time.perf_counter()
+            loaded.load()
+            result["load_s"] = round(time.perf_counter() - start, 3)
+        return result
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def _bench_fact_store(store, args) -> dict:
+    facts = list(lore_facts(args.scale))
+    start = time.perf_counter()
+    ids = [store.add_fact(s, p, o, source="bench") for s, p, o in facts]
+    add_s = time.perf_counter() - start
+
+    rng = random.Random(2)
+    subjects = [rng.choice(facts)[0] for _ in range(args.queries)]
+    targets = [rng.choice(ids) for _ in range(min(args.queries, len(ids)))]
+    return {
+        "facts": len(facts),
+        "add_facts_per_s": round(len(facts) / add_s, 1),
+        **latency(timed_each(lambda s: store.get_facts(subject=s), subjects), "get_facts"),
+        **latency(timed_each(lambda i: store.overwrite_fact(i, "bench", "overwritten", "yes", "bench"), targets),
+                  "overwrite"),
+    }
+
+
+def bench_facts(args, model) -> dict:
+    return _bench_fact_store(FactStore("bench"), args)
+
+
+def bench_sqlite_facts(args, model) -> dict:
+    directory = tempfile.mkdtemp(prefix="lc_bench_")
+    try:
+        with SQLiteFactStore("bench", os.path.join(directory, "facts.db")) as store:
+            return _bench_fact_store(store, args)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def bench_pipeline(args, model) -> dict:
+    """process_input end to end, with lc_core's singletons pointed at in-memory stores and a stub LLM."""
+    from langchain_openai import ChatOpenAI
+
+    import lc_core
+    from benchmarks.stub_llm import make_handler
+    from lc_core.chain_manager import ChainManager
+    from lc_core.hybrid_retrieval import FactMemory
+    from lc_core.response_cache import ResponseCache
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.llm_delay, "Stub answer.", 0.0))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    memory = in_memory_manager()
+    memory._model.base = model
+    memory.import_texts(lore_corpus(min(args.scale, 10_000)), "bench", batch_size=args.batch)
+    chain = ChainManager(memory, facts=FactMemory(path=None), cache=ResponseCache(max_entries=0))
+    chain._chain = chain.prompt | ChatOpenAI(api_key="stub", base_url=f"http://127.0.0.1:{server.server_port}/v1")
+
+    saved = lc_core._memory_manager, lc_core._chain_manager
+    lc_core._memory_manager, lc_core._chain_manager = memory, chain
+    try:
+        queries = lore_queries(args.turns)
+        samples = timed_each(lambda q: lc_core.process_input(q, "bench"), queries)
+        memory.ingest.close()
+    finally:
+        lc_core._memory_manager, lc_core._chain_manager = saved
+        server.shutdown()
+    return {"turns": len(queries), "llm_delay_ms": args.llm_delay * 1000, **latency(samples, "process_input")}
+
+
+BENCHMARKS = {
+    "embedding": bench_embedding,
+    "memory": bench_memory,
+    "facts": bench_facts,
+    "sqlite_facts": bench_sqlite_facts,
+    "pipeline": bench_pipeline,
+}
+
+
+# --- Baseline comparison ---
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Metrics worse than baseline by more than `tolerance` (a fraction); *_per_s higher is better."""
+    found = []
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            base = baseline.get(name, {}).get(metric)
+            if not isinstance(base, (int, float)) or not base or metric in ("docs", "facts", "texts", "turns"):
+                continue
+            if metric.endswith("_per_s"):
+                change = (base - value) / base
+            elif metric.endswith(("_ms", "_s")):
+                change = (value - base) / base
+            else:
+                continue
+            if change > tolerance:
+                found.append(f"{name}.{metric}: {base} -> {value} ({change:+.0%} worse)")
+    return found
+
+
+def make_model(args):
+    if args.embedding == "bge":
+        from lc_core.bge_embedding import BGEEmbedding
+        return BGEEmbedding(args.model, device="cpu", batch_size=args.batch_size)
+    return HashEmbedding(args.dim)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory and retrieval benchmark suite")
+    parser.add_argument("--scale", type=int, default=10_000, help="Documents and facts to generate (10^3-10^7)")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Run only these benchmarks")
+    parser.add_argument("--embedding", choices=["fake", "bge"], default="fake")
+    parser.add_argument("--model", default="BAAI/bge-small-en-v1.5", help="Local model for --embedding bge")
+    parser.add_argument("--dim", type=int, default=384, help="Fake embedding dimension")
+    parser.add_argument("--batch-size", type=int, default=32, help="Model batch size for --embedding bge")
+    parser.add_argument("--batch", type=int, default=1024, help="Documents per VectorStoreMemory.add")
+    parser.add_argument("--embed-texts", type=int, default=2000, help="Texts encoded by the embedding benchmark")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--turns", type=int, default=50, help="process_input calls in the pipeline benchmark")
+    parser.add_argument("--llm-delay", type=float, default=0.0, help="Stub LLM delay in seconds")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Compare against a previous --output file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before a regression (0.2 = 20%%)")
+    parser.add_argument("--profile", help="Write a cProfile .prof per benchmark to this directory")
+    args = parser.parse_args()
+
+    model = make_model(args)
+    results = {}
+    for name in args.only or BENCHMARKS:
+        profiler = cProfile.Profile() if args.profile else None
+        # VectorStoreMemory logs every add; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            if profiler:
+                profiler.enable()
+            results[name] = BENCHMARKS[name](args, model)
+            if profiler:
+                profiler.disable()
+        print(f"{name:<13} " + "  ".join(f"{k}={v}" for k, v in results[name].items()))
+        if profiler:
+            os.makedirs(args.profile, exist_ok=True)
+            path = os.path.join(args.profile, f"{name}.prof")
+            profiler.dump_stats(path)
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(12)
+
+    report = {
+        "meta": {
+            "params": {k: v for k, v in vars(args).items() if k not in ("output", "baseline", "profile")},
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("params", {}).get("scale") != args.scale:
+            print("[!] Baseline was recorded at a different --scale; comparison may be meaningless")
+        found = regressions(results, baseline.get("results", {}), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        if found:
+            raise SystemExit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
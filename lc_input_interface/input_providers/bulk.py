@@ -0,0 +1,115 @@
+# lc_input_interface/input_providers/bulk.py
+
+import os
+from collections import deque
+from typing import BinaryIO, Iterable, Iterator, Optional, Union
+
+from .base import InputProvider
+from .live import CHARS_PER_TOKEN, parse_record
+from .manual import ALLOWED_EXTENSIONS
+
+MAX_LINE_BYTES = 1 << 20  # longer lines are read in pieces, so memory stays bounded
+
+
+def estimate_tokens(word: str) -> int:
+    return len(word) // CHARS_PER_TOKEN + 1
+
+
+class TokenSplitter:
+    """
+    Splits a stream of lines into chunks of about `chunk_tokens` tokens,
+    each starting with the last `overlap_tokens` of the previous chunk.
+    Only the chunk being built is held in memory. Line breaks are kept.
+    """
+
+    def __init__(self, chunk_tokens: int = 400, overlap_tokens: int = 50):
+        if not 0 <= overlap_tokens < chunk_tokens:
+            raise ValueError("overlap_tokens must be at least 0 and less than chunk_tokens")
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+
+    def split(self, lines: Iterable[str]) -> Iterator[str]:
+        window = deque()   # (piece, tokens); a piece is a word plus the whitespace after it
+        tokens = 0
+        fresh = False      # window holds text not yet emitted
+        for line in lines:
+            words = line.split()
+            for i, word in enumerate(words):
+                piece = word + ("\n" if i == len(words) - 1 else " ")
+                cost = estimate_tokens(word)
+                window.append((piece, cost))
+                tokens += cost
+                fresh = True
+                if tokens >= self.chunk_tokens:
+                    yield "".join(p for p, _ in window).strip()
+                    fresh = False
+                    while window and tokens > self.overlap_tokens:
+                        tokens -= window.popleft()[1]
+        if fresh:
+            yield "".join(p for p, _ in window).strip()
+
+
+class BulkImportProvider(InputProvider):
+    """
+    Streams a large .txt/.md/.jsonl file (a path or a binary file object,
+    e.g. an upload's stream) as overlapping token-sized chunks for bulk
+    import into memory. Nothing is read up front and memory use does not
+    grow with the file: lines are read in bounded pieces and only the
+    chunk being built is kept. `bytes_read` / `total_bytes` report progress.
+    """
+
+    def __init__(self, source: Union[str, BinaryIO], filename: Optional[str] = None,
+                 chunk_tokens: int = 400, overlap_tokens: int = 50):
+        self.source = source
+        self.filename = filename or (source if isinstance(source, str) else getattr(source, "name", ""))
+        if not str(self.filename).endswith(ALLOWED_EXTENSIONS):
+            raise ValueError(f"Unsupported file type. Only {ALLOWED_EXTENSIONS} allowed.")
+        self.splitter = TokenSplitter(chunk_tokens, overlap_tokens)
+        self.bytes_read = 0
+        self.total_bytes = self._size()
+        self._chunks = None
+
+    def _size(self) -> Optional[int]:
+        if isinstance(self.source, str):
+            return os.path.getsize(self.source)
+        try:
+            position = self.source.tell()
+            size = self.source.seek(0, os.SEEK_END)
+            self.source.seek(position)
+            return size - position
+        except (AttributeError, OSError, ValueError):
+            return None
+
+    @property
+    def progress(self) -> Optional[float]:
+        """Fraction of the input read so far, or None when the size is unknown."""
+        if not self.total_bytes:
+            return None
+        return min(1.0, self.bytes_read / self.total_bytes)
+
+    def _lines(self) -> Iterator[str]:
+        f = open(self.source, "rb") if isinstance(self.source, str) else self.source
+        jsonl = str(self.filename).endswith(".jsonl")
+        try:
+            while True:
+                raw = f.readline(MAX_LINE_BYTES)
+                if not raw:
+                    return
+                self.bytes_read += len(raw)
+                line = raw.decode("utf-8", errors="replace")
+                if jsonl:
+                    _, line = parse_record(line)
+                if line.strip():
+                    yield line
+        finally:
+            if isinstance(self.source, str):
+                f.close()
+
+    def chunks(self) -> Iterator[str]:
+        return self.splitter.split(self._lines())
+
+    def get_next_chunk(self):
+        """Return the next chunk, or None once the input is exhausted."""
+        if self._chunks is None:
+            self._chunks = self.chunks()
+        return next(self._chunks, None)
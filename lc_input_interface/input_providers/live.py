@@ -1,17 +1,291 @@
 # lc_input_interface/input_providers/live.py
 
+import json
+import os
+import select
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+
 from .base import InputProvider
 
+CHARS_PER_TOKEN = 4
+TEXT_FIELDS = ("text", "message", "content", "msg")
+READ_SIZE = 1 << 16
+
+# inotify(7) event masks
+IN_MODIFY = 0x002
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+
+def parse_record(line: str) -> Tuple[Optional[dict], str]:
+    """
+    Parse one JSONL line into (record, text). The text comes from the first
+    string field in TEXT_FIELDS; lines that are not JSON objects are kept
+    verbatim. Blank lines give (None, "").
+    """
+    text = line.strip()
+    if not text:
+        return None, ""
+    try:
+        record = json.loads(text)
+    except ValueError:
+        return {"text": text}, text
+    if isinstance(record, dict):
+        for key in TEXT_FIELDS:
+            if isinstance(record.get(key), str):
+                return record, record[key].strip()
+        return record, text
+    return {"value": record}, text
+
+
+@dataclass
+class LiveChunk:
+    """A group of log records read together; end_offset is where reading resumes after it."""
+    text: str
+    records: List[dict] = field(default_factory=list)
+    end_offset: int = 0
+    inode: int = 0
+
+
+class _InotifyWatcher:
+    """Blocks until something changes in the log's directory (writes, rotation, creation)."""
+
+    def __init__(self, directory: str):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout: float):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if ready:
+            try:
+                while os.read(self.fd, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def reset(self):
+        pass
+
+    def close(self):
+        os.close(self.fd)
+
+
+class _PollWatcher:
+    """Fallback: sleeps with exponential backoff up to the poll interval, reset when data arrives."""
+
+    def __init__(self, max_interval: float):
+        self.max_interval = max_interval
+        self.interval = 0.01
+
+    def wait(self, timeout: float):
+        time.sleep(min(timeout, self.interval))
+        self.interval = min(self.interval * 2, self.max_interval)
+
+    def reset(self):
+        self.interval = 0.01
+
+    def close(self):
+        pass
+
+
 class LiveInputProvider(InputProvider):
-    def __init__(self, log_file_path):
+    """
+    Tails a JSONL log, resuming from a byte offset saved next to it.
+
+    Complete lines are parsed as JSON (the text is taken from a "text",
+    "message", "content" or "msg" field; anything else is passed through
+    as-is) and grouped into chunks. A chunk is emitted once it reaches
+    `max_tokens` (estimated), or `window` seconds after its first line
+    arrived. The offset is saved when the caller asks for the next chunk,
+    so a crash replays at most the chunk being processed.
+
+    Rotation (the path now names a different file) is handled by finishing
+    the old file and starting the new one at 0; truncation restarts at 0.
+    Changes are awaited with inotify on Linux, otherwise by polling with
+    backoff.
+    """
+
+    def __init__(self, log_file_path, offset_path: Optional[str] = None, window: float = 2.0,
+                 max_tokens: int = 512, poll_interval: float = 0.5, use_inotify: Optional[bool] = None):
         self.log_file_path = log_file_path
+        self.offset_path = offset_path or f"{log_file_path}.offset"
+        self.window = window
+        self.max_tokens = max_tokens
+        self.poll_interval = poll_interval
+        self.use_inotify = sys.platform.startswith("linux") if use_inotify is None else use_inotify
 
-    def get_next_chunk(self):
+        self._file = None
+        self._inode = 0
+        self._offset = 0         # just past the last complete line read
+        self._partial = b""
+        self._watcher = None
+        self._chunks = None
+
+    # --- Offsets ---
+
+    def _load_offset(self) -> Tuple[int, int]:
+        try:
+            with open(self.offset_path) as f:
+                state = json.load(f)
+            return int(state["inode"]), int(state["offset"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0, 0
+
+    def _save_offset(self, inode: int, offset: int):
+        tmp = self.offset_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"inode": inode, "offset": offset}, f)
+        os.replace(tmp, self.offset_path)
+
+    # --- File handling ---
+
+    def _open(self, resume: bool = False) -> bool:
+        try:
+            f = open(self.log_file_path, "rb")
+        except FileNotFoundError:
+            return False
+        inode = os.fstat(f.fileno()).st_ino
+        offset = 0
+        if resume:
+            saved_inode, saved_offset = self._load_offset()
+            # A different inode means the log was rotated while we were down
+            if saved_inode == inode and saved_offset <= os.fstat(f.fileno()).st_size:
+                offset = saved_offset
+        f.seek(offset)
+        if self._file is not None:
+            self._file.close()
+        self._file, self._inode, self._offset, self._partial = f, inode, offset, b""
+        return True
+
+    def _rotated(self) -> bool:
+        try:
+            return os.stat(self.log_file_path).st_ino != self._inode
+        except FileNotFoundError:
+            return False  # mid-rotation: keep reading the old file until the new one appears
+
+    def _truncated(self) -> bool:
+        """
+        The file was truncated (or rewritten) in place: it is now shorter than
+        what was read, or the byte before the offset is no longer the newline
+        that ended the last line read.
+        """
+        fd = self._file.fileno()
+        if os.fstat(fd).st_size < self._offset + len(self._partial):
+            return True
+        return self._offset > 0 and os.pread(fd, 1, self._offset - 1) != b"\n"
+
+    def _read_lines(self) -> Iterator[Tuple[bytes, int]]:
+        """Yield (line, offset after it) for every complete line available now."""
+        if self._file is None and not self._open(resume=True):
+            return
+        while True:
+            if self._truncated():
+                self._file.seek(0)
+                self._offset, self._partial = 0, b""
+            data = self._file.read(READ_SIZE)
+            if data:
+                *lines, self._partial = (self._partial + data).split(b"\n")
+                for line in lines:
+                    self._offset += len(line) + 1
+                    yield line, self._offset
+                continue
+            # Old file drained; follow the rotation if there was one
+            if self._rotated() and self._open():
+                continue
+            return
+
+    # --- Chunks ---
+
+    def _wait(self, timeout: float):
+        if self._watcher is None:
+            directory = os.path.dirname(os.path.abspath(self.log_file_path))
+            try:
+                self._watcher = _InotifyWatcher(directory) if self.use_inotify else _PollWatcher(self.poll_interval)
+            except (OSError, AttributeError):
+                self._watcher = _PollWatcher(self.poll_interval)
+        # Bounded even with inotify, as a safety net on filesystems that miss events
+        self._watcher.wait(max(0.0, min(timeout, self.poll_interval)))
+
+    def chunks(self, idle_timeout: Optional[float] = None) -> Iterator[LiveChunk]:
         """
-        This method should tail the log file and return the next line(s).
-        Currently, it's a stub.
+        Yield chunks as the log grows. With idle_timeout, return (after
+        emitting any partial chunk) once no new line has arrived for that
+        many seconds; otherwise tail forever.
         """
-        # Placeholder logic: Replace this with actual tail logic later
-        raise NotImplementedError("LiveInputProvider.get_next_chunk() is not yet implemented.")
-        # Alternatively, return a hardcoded string for dev testing:
-        # return "Simulated live input."
+        texts, records, tokens, started = [], [], 0, None
+        last_data = time.monotonic()
+
+        def emit():
+            return LiveChunk("\n".join(texts), list(records), self._offset, self._inode)
+
+        while True:
+            got_data = False
+            for line, _ in self._read_lines():
+                got_data = True
+                record, text = parse_record(line.decode("utf-8", errors="replace"))
+                if not text:
+                    continue
+                texts.append(text)
+                records.append(record)
+                tokens += len(text) // CHARS_PER_TOKEN + 1
+                if started is None:
+                    started = time.monotonic()
+                if tokens >= self.max_tokens:
+                    chunk = emit()
+                    texts, records, tokens, started = [], [], 0, None
+                    yield chunk
+                    self._save_offset(chunk.inode, chunk.end_offset)
+
+            now = time.monotonic()
+            if got_data:
+                last_data = now
+                if self._watcher is not None:
+                    self._watcher.reset()
+            if texts and (now - started >= self.window
+                          or idle_timeout is not None and now - last_data >= idle_timeout):
+                chunk = emit()
+                texts, records, tokens, started = [], [], 0, None
+                yield chunk
+                self._save_offset(chunk.inode, chunk.end_offset)
+                continue
+            if idle_timeout is not None and now - last_data >= idle_timeout:
+                return
+
+            timeout = self.poll_interval if started is None else started + self.window - now
+            if idle_timeout is not None:
+                timeout = min(timeout, last_data + idle_timeout - now)
+            self._wait(timeout)
+
+    def get_next_chunk(self):
+        """Block until the next chunk is ready and return its text."""
+        if self._chunks is None:
+            self._chunks = self.chunks()
+        return next(self._chunks).text
+
+    def close(self):
+        if self._chunks is not None:
+            self._chunks.close()
+            self._chunks = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._watcher is not None:
+            self._watcher.close()
+            self._watcher = None
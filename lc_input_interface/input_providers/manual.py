@@ -41,3 +41,14 @@ class ManualInputProvider(InputProvider):
                 return f"Error: Unsupported file type. Only {ALLOWED_EXTENSIONS} allowed."
 
         return "Error: No input provided."
+
+    def bulk_import(self, chunk_tokens=400, overlap_tokens=50):
+        """
+        Stream the uploaded file as overlapping chunks instead of reading it
+        whole, for transcripts over MAX_FILE_SIZE. Returns a BulkImportProvider.
+        """
+        from .bulk import BulkImportProvider
+        if not self.file_input:
+            raise ValueError("No file provided for bulk import.")
+        return BulkImportProvider(self.file_input.stream, self.file_input.filename,
+                                  chunk_tokens=chunk_tokens, overlap_tokens=overlap_tokens)
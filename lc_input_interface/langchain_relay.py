@@ -1,12 +1,40 @@
 # lc_input_interface/langchain_relay.py
-from lc_core import process_input
+import json
+
+from lc_core import process_input, process_input_async, stream_turn, stream_turn_async
 
 _last_output = None
 
-def process_input_relay(input_text):
+def process_input_relay(input_text, session_id=None):
     global _last_output
-    _last_output = process_input(input_text)
+    _last_output = process_input(input_text, session_id=session_id)
     return _last_output
 
 def get_output():
     return _last_output
+
+def sse_event(data: dict, event: str = None) -> str:
+    """One Server-Sent Events message carrying `data` as JSON."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+def done_event(ctx) -> str:
+    return sse_event({"session_id": ctx.session_id, "cached": ctx.cached,
+                      "first_token": ctx.first_token, "timings": ctx.timings}, event="done")
+
+def stream_input_sse(input_text, session_id=None):
+    """
+    Yield the response to `input_text` as SSE: a message per token, then a
+    "done" event with timings (or an "error" event). The turn is written to
+    memory once the last token is out.
+    """
+    global _last_output
+    try:
+        ctx, tokens = stream_turn(input_text, session_id=session_id)
+        for token in tokens:
+            yield sse_event({"token": token})
+    except Exception as e:
+        yield sse_event({"error": str(e)}, event="error")
+        return
+    _last_output = ctx.response
+    yield done_event(ctx)
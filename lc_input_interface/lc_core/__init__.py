@@ -1,55 +1,307 @@
 # lc_core/__init__.py
 
+import asyncio
+import atexit
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
 from .memory_manager import VectorStoreMemory
+from .ingest_queue import IngestQueue
 from .chain_manager import ChainManager
-from .config import DEFAULT_SESSION_ID
+from .hybrid_retrieval import FactMemory
+from .retrieval import RetrievalContext
+from .metrics import METRICS, observe_turn, span
+from .compaction import Compactor, make_summarizer
+from .config import (
+    COMPACTION_INTERVAL,
+    COMPACTION_SUMMARIZER,
+    DEFAULT_SESSION_ID,
+    INDEX_SERVICE_ADDRESS,
+    METRICS_ENABLED,
+    PIPELINE_WORKERS,
+    PROFILER_ENABLED,
+)
 
 # Sub-task 3 injection
-def write_to_memory(session_id: str, text: str) -> None:
-    # Deferred import avoids circular dependency
-    from lc_memory import store_memory
-    store_memory(session_id, text)  
+def write_to_memory(session_id: str, text: str, metadata: dict = None) -> Future:
+    # Queued for write-behind ingestion: turns are embedded and indexed in micro-batches,
+    # journaled for incremental saves, and flushed before the session is next searched.
+    # lc_memory.store_memory remains available for callers holding their own vectorstore
+    return _memory_manager.enqueue(session_id, text, metadata or {})
 # End of Sub-task 3 injection
 
-_memory_manager = VectorStoreMemory()
-_chain_manager = ChainManager(_memory_manager)
+def _make_memory():
+    if INDEX_SERVICE_ADDRESS:
+        # Model and shards live in one index service process shared by every worker
+        from .index_service import RemoteMemory
+        return RemoteMemory(INDEX_SERVICE_ADDRESS)
+    return VectorStoreMemory()
 
-def process_input(user_input: str, session_id: str = None) -> str:
+# All cheap to construct; the model, index, fact stores and OpenAI client load on first use
+_memory_manager = _make_memory()
+_fact_memory = FactMemory()
+_chain_manager = ChainManager(_memory_manager, facts=_fact_memory)
+# Workers sharing an index service each run a Compactor; the file lock lets one compact at a time
+_compactor = Compactor(_memory_manager, _fact_memory, make_summarizer(COMPACTION_SUMMARIZER, _chain_manager.complete),
+                       lock_path=f"{INDEX_SERVICE_ADDRESS}.compaction.lock" if INDEX_SERVICE_ADDRESS else None)
+
+# Queued memory writes are flushed into the index on interpreter exit
+atexit.register(_memory_manager.ingest.close)
+
+def _collect():
+    # Read from existing state at scrape time; nothing here loads the model or the index
+    families = []
+    if _memory_manager.is_loaded:
+        families.append(("lc_core_index_vectors", "gauge", "Vectors across all loaded session shards",
+                         [({}, _memory_manager.size())]))
+    ingest = _memory_manager.ingest
+    if isinstance(ingest, IngestQueue):
+        families.append(("lc_core_ingest_pending", "gauge", "Memory writes queued for write-behind ingestion",
+                         [({}, len(ingest))]))
+    caches = {"response": _chain_manager.cache.stats()}
+    if getattr(_memory_manager, "_model", None) is not None:
+        caches["embedding"] = _memory_manager._model.stats()
+    for field, metric, kind in (("hits", "hits_total", "counter"), ("misses", "misses_total", "counter"),
+                                ("memory_entries", "entries", "gauge")):
+        families.append((f"lc_core_cache_{metric}", kind, f"Cache {field.replace('_', ' ')}",
+                         [({"cache": name}, stats[field]) for name, stats in caches.items()]))
+    return families
+
+METRICS.enabled = METRICS_ENABLED
+METRICS.add_collector(_collect)
+
+_warm_up_thread = None
+_warm_up_error = None
+
+def _load_all():
+    global _warm_up_error
+    try:
+        _memory_manager.load()
+        _chain_manager.chain
+        if _chain_manager.reranker is not None:
+            _chain_manager.reranker.load()
+        if COMPACTION_INTERVAL:
+            _compactor.start(COMPACTION_INTERVAL)
+    except Exception as e:
+        _warm_up_error = e
+        raise
+
+def warm_up(background: bool = True):
+    """
+    Load the embedding model, saved index and chain ahead of the first request.
+    With background=True this runs once on a daemon thread and returns it.
+    """
+    global _warm_up_thread
+    if not background:
+        _load_all()
+        return None
+    if _warm_up_thread is None:
+        _warm_up_thread = threading.Thread(target=_load_all, name="lc_core-warm-up", daemon=True)
+        _warm_up_thread.start()
+    return _warm_up_thread
+
+def is_ready() -> bool:
+    return _memory_manager.is_loaded
+
+def get_warm_up_error():
+    return _warm_up_error
+
+def process_turn(user_input: str, session_id: str = None) -> RetrievalContext:
+    """
+    Run one turn and return its RetrievalContext, with the response and
+    per-stage timings (embed, search, llm, store) attached.
+    """
     sid = session_id or DEFAULT_SESSION_ID
 
-    # Search context
-    context_docs = _memory_manager.search(user_input, k=5, session_id=sid)
+    with span("process_input"):
+        # Embed the question once, search and add matching facts; the chain reuses these hits
+        ctx = _chain_manager.retrieve(user_input, session_id=sid)
+
+        # Run input through chain (answered from the response cache when the prompt is unchanged)
+        with ctx.timed("llm"):
+            ctx.response = _chain_manager.run(user_input, context=ctx)
+
+        # Store conversation to memory (via Sub-Task 3); a cached answer is already stored
+        if not ctx.cached:
+            with ctx.timed("store"):
+                _write_turn(user_input, ctx)
 
-    # Run input through chain
-    result = _chain_manager.run(user_input)
+    observe_turn(ctx)
+    return ctx
 
-    # Store conversation to memory (via Sub-Task 3) — delayed import
-    from lc_memory import store_memory
-    store_memory(
-        sid,
-        f"User: {user_input}\nAI: {result}",
-        embedding_model=_memory_manager.model,
-        vectorstore=_memory_manager.vectorstore
+def _write_turn(user_input: str, ctx: RetrievalContext):
+    write_to_memory(
+        ctx.session_id,
+        f"User: {user_input}\nAI: {ctx.response}",
+        metadata={"kind": "turn", "created_at": time.time(), "context_ids": ctx.doc_ids}
     )
 
-    return result
+def stream_turn(user_input: str, session_id: str = None):
+    """
+    Streaming process_turn. Retrieval runs now; returns (ctx, tokens), where
+    tokens yields the response as the LLM produces it. Once the stream is
+    exhausted ctx.response holds the full text and the turn is written to
+    memory. A stream abandoned part way is not written. ctx.first_token is
+    the latency the user sees.
+    """
+    ctx = _chain_manager.retrieve(user_input, session_id=session_id or DEFAULT_SESSION_ID)
+
+    def tokens():
+        parts = []
+        with ctx.timed("llm"):
+            for token in _chain_manager.stream(user_input, context=ctx):
+                parts.append(token)
+                yield token
+        ctx.response = "".join(parts)
+        if not ctx.cached:
+            with ctx.timed("store"):
+                _write_turn(user_input, ctx)
+        observe_turn(ctx)
+
+    return ctx, tokens()
+
+def process_input(user_input: str, session_id: str = None) -> str:
+    return process_turn(user_input, session_id=session_id).response
+
+# Async pipeline: CPU-bound work runs on a bounded pool, the LLM call is awaited
+_executor = None
+_executor_lock = threading.Lock()
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=PIPELINE_WORKERS, thread_name_prefix="lc_core")
+        return _executor
+
+async def process_turn_async(user_input: str, session_id: str = None) -> RetrievalContext:
+    """
+    Async process_turn for ASGI servers. Embedding and search run on the
+    PIPELINE_WORKERS pool and the LLM call is awaited, so a slow completion
+    does not hold a thread. The memory write-back only waits to be queued
+    (see flush_writes); the "store" timing is the time spent queueing.
+    """
+    sid = session_id or DEFAULT_SESSION_ID
+    loop = asyncio.get_running_loop()
+    ctx = await loop.run_in_executor(_pool(), _chain_manager.retrieve, user_input, sid)
+
+    with ctx.timed("llm"):
+        ctx.response = await _chain_manager.arun(user_input, context=ctx)
+
+    # Enqueued from the pool: submit only blocks when the ingest queue applies backpressure
+    if not ctx.cached:
+        with ctx.timed("store"):
+            await loop.run_in_executor(_pool(), _write_turn, user_input, ctx)
+    observe_turn(ctx)
+    return ctx
+
+async def stream_turn_async(user_input: str, session_id: str = None):
+    """Async stream_turn: retrieval runs on the pool, tokens is an async iterator."""
+    sid = session_id or DEFAULT_SESSION_ID
+    loop = asyncio.get_running_loop()
+    ctx = await loop.run_in_executor(_pool(), _chain_manager.retrieve, user_input, sid)
+
+    async def tokens():
+        parts = []
+        with ctx.timed("llm"):
+            async for token in _chain_manager.astream(user_input, context=ctx):
+                parts.append(token)
+                yield token
+        ctx.response = "".join(parts)
+        if not ctx.cached:
+            with ctx.timed("store"):
+                await loop.run_in_executor(_pool(), _write_turn, user_input, ctx)
+        observe_turn(ctx)
+
+    return ctx, tokens()
+
+async def process_input_async(user_input: str, session_id: str = None) -> str:
+    return (await process_turn_async(user_input, session_id=session_id)).response
+
+def import_texts(texts, session_id: str = None, metadata: dict = None, progress=None) -> int:
+    """Embed a stream of pre-chunked texts straight into a session's memory, bypassing the LLM."""
+    return _memory_manager.import_texts(texts, session_id or DEFAULT_SESSION_ID, metadata=metadata, progress=progress)
+
+def flush_writes():
+    """Write every queued memory write-back into the index now."""
+    _memory_manager.ingest.flush()
 
 def get_embedding_model():
     return _memory_manager.model
 
-def get_vectorstore():
-    return _memory_manager.vectorstore
+def get_vectorstore(session_id: str = None, writable: bool = False):
+    return _memory_manager.get_store(session_id or DEFAULT_SESSION_ID, writable=writable)
 
 def get_memory_manager():
     return _memory_manager
 
+def get_response_cache_stats() -> dict:
+    """Response cache hits, misses, hit rate, and the LLM seconds and tokens saved."""
+    return _chain_manager.cache.stats()
+
+def render_metrics() -> str:
+    """Stage timings, batch sizes, index size and cache counters in the Prometheus text format."""
+    return METRICS.render()
+
+def profile(seconds: float = 10.0) -> str:
+    """
+    Sample every thread's stack for `seconds` and return collapsed stacks
+    (flamegraph.pl / speedscope input). Raises PermissionError unless
+    PROFILER_ENABLED, RuntimeError if a profile is already running.
+    """
+    if not PROFILER_ENABLED:
+        raise PermissionError("profiling is disabled; set PROFILER_ENABLED in lc_core/config.py")
+    from .profiler import profile_for
+    return profile_for(seconds)
+
+def compact_memory(session_id: str = None) -> list:
+    """
+    Replace old conversation turns with summaries and facts, for one
+    session or (session_id=None) all of them. Returns a CompactionResult
+    per session compacted; its tag identifies the run for rollback.
+    """
+    if session_id is None:
+        return _compactor.run_once()
+    result = _compactor.compact(session_id)
+    return [result] if result is not None else []
+
+def rollback_compaction(session_id: str, tag: str) -> int:
+    """Undo compaction run `tag`: drop its summaries and facts, restore its turns. Returns turns restored."""
+    return _compactor.rollback(session_id or DEFAULT_SESSION_ID, tag)
+
+def list_compactions(session_id: str = None) -> list:
+    """Tags of the session's compaction runs that can still be rolled back, oldest first."""
+    return _compactor.archive.tags(session_id or DEFAULT_SESSION_ID)
+
+def get_fact_store(session_id: str = None):
+    return _fact_memory.get(session_id or DEFAULT_SESSION_ID)
+
 def save_memory():
     _memory_manager.save()
 
 __all__ = [
     "process_input",
+    "process_turn",
+    "process_input_async",
+    "process_turn_async",
+    "stream_turn",
+    "stream_turn_async",
+    "flush_writes",
+    "import_texts",
+    "RetrievalContext",
     "get_embedding_model",
     "get_vectorstore",
     "get_memory_manager",
-    "save_memory"
+    "get_fact_store",
+    "get_response_cache_stats",
+    "render_metrics",
+    "profile",
+    "compact_memory",
+    "rollback_compaction",
+    "list_compactions",
+    "save_memory",
+    "warm_up",
+    "is_ready",
+    "get_warm_up_error"
 ]
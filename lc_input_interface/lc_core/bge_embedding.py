@@ -1,16 +1,65 @@
 # lc_core/bge_embedding.py
 
+from typing import List, Sequence
+
+import numpy as np
 from langchain_core.embeddings import Embeddings
-from sentence_transformers import SentenceTransformer
-import torch
+
+from .metrics import span
 
 class BGEEmbedding(Embeddings):
-    def __init__(self, model_name: str = "BAAI/bge-large-en-v1.5", device: str = "cuda"):
+    def __init__(self, model_name: str = "BAAI/bge-large-en-v1.5", device: str = "cuda",
+                 batch_size: int = 32, normalize: bool = False):
+        # Imported here so that importing lc_core does not pull in torch
+        from sentence_transformers import SentenceTransformer
+        import torch
+
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.normalize = normalize
         self.model = SentenceTransformer(model_name)
         self.model.to(torch.device(device))
 
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def _token_lengths(self, texts: Sequence[str]) -> List[int]:
+        tokenizer = getattr(self.model, "tokenizer", None)
+        if tokenizer is None:
+            return [len(text) for text in texts]
+        return [len(ids) for ids in tokenizer(list(texts), add_special_tokens=False)["input_ids"]]
+
+    def encode(self, texts: Sequence[str], batch_size: int = None, normalize: bool = None) -> np.ndarray:
+        """
+        Encode `texts` into a contiguous (n, dimension) float32 array.
+
+        Texts are sorted by token length and encoded in batches of similar
+        length, so padding is minimal; rows come back in input order.
+        """
+        texts = list(texts)
+        with span("embedding.encode", size=len(texts)):
+            batch_size = batch_size or self.batch_size
+            normalize = self.normalize if normalize is None else normalize
+
+            vectors = np.empty((len(texts), self.dimension), dtype=np.float32)
+            if not texts:
+                return vectors
+
+            order = np.argsort(self._token_lengths(texts), kind="stable")
+            for start in range(0, len(order), batch_size):
+                rows = order[start:start + batch_size]
+                vectors[rows] = self.model.encode(
+                    [texts[i] for i in rows],
+                    batch_size=batch_size,
+                    convert_to_numpy=True,
+                    normalize_embeddings=normalize,
+                    show_progress_bar=False,
+                )
+            return vectors
+
     def embed_documents(self, texts):
-        return self.model.encode(texts, convert_to_numpy=True).tolist()
+        return self.encode(texts).tolist()
 
     def embed_query(self, text):
-        return self.model.encode(text, convert_to_numpy=True).tolist()
+        return self.encode([text])[0].tolist()
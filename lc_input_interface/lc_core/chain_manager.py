@@ -1,18 +1,52 @@
 # lc_core/chain_manager.py
 
-from langchain_openai import ChatOpenAI
+import time
+from typing import AsyncIterator, Iterator
+
 from langchain_core.prompts import PromptTemplate
-from langchain_core.runnables import RunnableLambda, RunnablePassthrough
+from .hybrid_retrieval import FactMemory, estimate_tokens, merge_context
 from .memory_manager import VectorStoreMemory
-from .config import DEFAULT_SESSION_ID, OPENAI_API_KEY
+from .metrics import span
+from .rerank import Reranker
+from .response_cache import ResponseCache, context_fingerprint
+from .retrieval import RetrievalContext
+from .config import (
+    CONTEXT_TOKEN_BUDGET,
+    DEFAULT_SESSION_ID,
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    RESPONSE_CACHE_PATH,
+    RESPONSE_CACHE_SIZE,
+    RESPONSE_CACHE_TTL,
+    RERANK_MODEL_NAME,
+    RERANK_POOL,
+    RETRIEVAL_CANDIDATES,
+    USE_DISK_PERSISTENCE,
+)
 
 
 class ChainManager:
-    def __init__(self, memory: VectorStoreMemory):
+    """
+    Builds the prompt context and runs the chain. Holds no per-request
+    state: the session travels with each call (or its RetrievalContext),
+    so one instance serves concurrent sessions. `session_id` is only the
+    default for calls that name none.
+    """
+
+    def __init__(self, memory: VectorStoreMemory, facts: FactMemory = None, cache: ResponseCache = None,
+                 reranker: Reranker = None):
         self.memory = memory
+        self.facts = facts
+        self.reranker = reranker
+        if reranker is None and (RERANK_POOL > RETRIEVAL_CANDIDATES or RERANK_MODEL_NAME):
+            self.reranker = Reranker.from_config(lambda texts: memory.model.encode(texts))
         self.session_id = DEFAULT_SESSION_ID
-
-        self.llm = ChatOpenAI(api_key=OPENAI_API_KEY)
+        self._chain = None
+        self.cache = cache or ResponseCache(
+            RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL, RESPONSE_CACHE_PATH if USE_DISK_PERSISTENCE else None
+        )
+        # Answers that may quote deleted documents must not be served again
+        memory.on_forget.append(self.cache.invalidate)
 
         self.prompt = PromptTemplate(
             input_variables=["context", "question"],
@@ -29,16 +63,129 @@ Question:
 """.strip(),
         )
 
-        self.chain = (
-            {"context": self.retrieve_context, "question": RunnablePassthrough()}
-            | self.prompt
-            | self.llm
-        )
+    @property
+    def chain(self):
+        # Built on first use so importing lc_core does not construct the OpenAI client
+        if self._chain is None:
+            from langchain_openai import ChatOpenAI
 
-    def retrieve_context(self, question: str) -> str:
-        results = self.memory.search(question, k=5, session_id=self.session_id)
-        return "\n\n".join([doc.page_content for doc in results])
+            self.llm = ChatOpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
+            # Retrieval happens up front (see run) so the query is embedded once per turn
+            self._chain = self.prompt | self.llm
+        return self._chain
 
-    def run(self, user_input: str) -> str:
-        response = self.chain.invoke(user_input)
+    def complete(self, prompt: str) -> str:
+        """One-off completion from the chain's LLM, outside the answer template (e.g. for summaries)."""
+        self.chain
+        response = self.llm.invoke(prompt)
         return response.content if hasattr(response, "content") else str(response)
+
+    def retrieve(self, question: str, session_id: str = None, budget: float = None) -> RetrievalContext:
+        """
+        Vector hits plus active facts about the entities the question names,
+        ranked together and trimmed to CONTEXT_TOKEN_BUDGET. With a reranker,
+        RERANK_POOL hits are fetched and reduced to RETRIEVAL_CANDIDATES;
+        `budget` overrides its latency budget (seconds) for this call.
+        """
+        sid = session_id or self.session_id
+        if self.reranker is None:
+            ctx = self.memory.retrieve(question, k=RETRIEVAL_CANDIDATES, session_id=sid)
+        else:
+            ctx = self.memory.retrieve(question, k=max(RERANK_POOL, RETRIEVAL_CANDIDATES), session_id=sid)
+            ctx.docs = self.reranker.rerank(ctx, RETRIEVAL_CANDIDATES, budget)
+            ctx.vectors = None   # no longer row-aligned with the reranked docs
+            ctx.k = RETRIEVAL_CANDIDATES
+        facts = []
+        if self.facts is not None:
+            with ctx.timed("facts"):
+                facts = self.facts.find_facts(question, sid)
+        with ctx.timed("merge"):
+            ctx.facts, ctx.docs = merge_context(facts, ctx.docs, CONTEXT_TOKEN_BUDGET)
+        return ctx
+
+    def retrieve_context(self, question: str, session_id: str = None) -> str:
+        return self.retrieve(question, session_id=session_id).text
+
+    def _cached(self, user_input: str, ctx: RetrievalContext):
+        """Return (cache key, cached response or None); sets ctx.cached on a hit."""
+        key = context_fingerprint(self.prompt.template, user_input, ctx)
+        response = self.cache.get(key)
+        ctx.cached = response is not None
+        return key, response
+
+    def _remember(self, key: str, user_input: str, ctx: RetrievalContext, response: str, started: float):
+        tokens = estimate_tokens(self.prompt.template) + estimate_tokens(ctx.text) + estimate_tokens(user_input)
+        self.cache.put(key, ctx.session_id, response, time.perf_counter() - started,
+                       tokens + estimate_tokens(response))
+
+    @span("chain.run")
+    def run(self, user_input: str, context: RetrievalContext = None, session_id: str = None) -> str:
+        ctx = context or self.retrieve(user_input, session_id=session_id)
+        key, cached = self._cached(user_input, ctx)
+        if cached is not None:
+            return cached
+        started = time.perf_counter()
+        with span("chain.llm"):
+            response = self.chain.invoke({"context": ctx.text, "question": user_input})
+        response = response.content if hasattr(response, "content") else str(response)
+        self._remember(key, user_input, ctx, response, started)
+        return response
+
+    def _first_token(self, ctx: RetrievalContext, started: float):
+        # Stages before the LLM are already in ctx.timings; the LLM stage is still running
+        ctx.first_token = ctx.total_time + time.perf_counter() - started
+
+    def stream(self, user_input: str, context: RetrievalContext = None, session_id: str = None) -> Iterator[str]:
+        """
+        Like run(), but yields the response as the LLM produces it (via the
+        runnable's stream). A cached response is yielded in one piece. The
+        response is cached once the stream completes.
+        """
+        ctx = context or self.retrieve(user_input, session_id=session_id)
+        started = time.perf_counter()
+        key, cached = self._cached(user_input, ctx)
+        if cached is not None:
+            self._first_token(ctx, started)
+            yield cached
+            return
+        parts = []
+        for chunk in self.chain.stream({"context": ctx.text, "question": user_input}):
+            token = chunk.content if hasattr(chunk, "content") else str(chunk)
+            if not token:
+                continue
+            if not parts:
+                self._first_token(ctx, started)
+            parts.append(token)
+            yield token
+        self._remember(key, user_input, ctx, "".join(parts), started)
+
+    async def astream(self, user_input: str, context: RetrievalContext) -> AsyncIterator[str]:
+        """Async stream(), over the runnable's astream; retrieval must already be done."""
+        started = time.perf_counter()
+        key, cached = self._cached(user_input, context)
+        if cached is not None:
+            self._first_token(context, started)
+            yield cached
+            return
+        parts = []
+        async for chunk in self.chain.astream({"context": context.text, "question": user_input}):
+            token = chunk.content if hasattr(chunk, "content") else str(chunk)
+            if not token:
+                continue
+            if not parts:
+                self._first_token(context, started)
+            parts.append(token)
+            yield token
+        self._remember(key, user_input, context, "".join(parts), started)
+
+    async def arun(self, user_input: str, context: RetrievalContext) -> str:
+        """Like run(), but awaits the LLM with ainvoke; retrieval must already be done."""
+        key, cached = self._cached(user_input, context)
+        if cached is not None:
+            return cached
+        started = time.perf_counter()
+        with span("chain.llm"):
+            response = await self.chain.ainvoke({"context": context.text, "question": user_input})
+        response = response.content if hasattr(response, "content") else str(response)
+        self._remember(key, user_input, context, response, started)
+        return response
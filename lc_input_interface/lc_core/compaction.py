@@ -0,0 +1,369 @@
+# lc_core/compaction.py
+
+import fcntl
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+from uuid import uuid4
+
+import numpy as np
+from langchain_core.documents import Document
+
+from .hybrid_retrieval import FactMemory, normalize
+from .config import (
+    COMPACTION_ARCHIVE_PATH,
+    COMPACTION_GROUP_SIZE,
+    COMPACTION_KEEP_RECENT,
+    COMPACTION_MIN_AGE,
+    COMPACTION_WINDOW,
+    USE_DISK_PERSISTENCE,
+)
+
+Triple = Tuple[str, str, str]
+# turn texts -> (summary, (subject, predicate, object) facts)
+Summarizer = Callable[[List[str]], Tuple[str, List[Triple]]]
+
+MIN_GROUP = 2             # a single turn is not worth a summary
+SUMMARY_PREFIX = "Summary of earlier conversation: "
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+_SPEAKER = re.compile(r"^(User|AI):\s*")
+_FACT_LINE = re.compile(r"^\s*FACT:\s*(.+?)\s*\|\s*(.+?)\s*\|\s*(.+?)\s*$", re.IGNORECASE)
+_CLAIM = re.compile(
+    r"^(?:The\s+)?([A-Z][\w'-]*(?:\s+[A-Z][\w'-]*){0,3})\s+"
+    r"(is|are|was|were|has|have|had|carries|owns|lives in|rules|serves|seeks)\s+"
+    r"((?:\S+\s+){0,7}?\S+?)[.!]?$"
+)
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from had has have he her his i if in is it its me my no not of on "
+    "or our she so that the their them they this to was we were what when where which who will with you your".split()
+)
+
+
+# --- Summarisers ---
+
+class ExtractiveSummarizer:
+    """
+    Offline summariser: keeps the `max_sentences` sentences whose content
+    words recur most across the group (questions skipped), in their
+    original order, and reads simple "Name is/has/carries ..." claims as
+    facts. No model needed.
+    """
+
+    def __init__(self, max_sentences: int = 4):
+        self.max_sentences = max_sentences
+
+    def __call__(self, turns: List[str]) -> Tuple[str, List[Triple]]:
+        sentences = []
+        for turn in turns:
+            for line in turn.splitlines():
+                for sentence in _SENTENCE.split(_SPEAKER.sub("", line.strip())):
+                    sentence = sentence.strip()
+                    if sentence and not sentence.endswith("?") and sentence not in sentences:
+                        sentences.append(sentence)
+        words = [[w for w in normalize(s).split() if w not in _STOPWORDS] for s in sentences]
+        frequency = Counter(w for sentence_words in words for w in sentence_words)
+        scores = [sum(frequency[w] for w in sentence_words) / (len(sentence_words) + 1) for sentence_words in words]
+        best = sorted(sorted(range(len(sentences)), key=lambda i: -scores[i])[:self.max_sentences])
+        return " ".join(sentences[i] for i in best), extract_claims(sentences)
+
+
+def extract_claims(sentences: List[str]) -> List[Triple]:
+    triples = []
+    for sentence in sentences:
+        match = _CLAIM.match(sentence.strip())
+        if match:
+            triple = tuple(part.strip() for part in match.groups())
+            if triple not in triples:
+                triples.append(triple)
+    return triples
+
+
+SUMMARY_PROMPT = """
+Summarise these conversation turns for long-term memory in one short paragraph.
+Keep names, places, items, decisions and open questions; drop pleasantries.
+Then list lasting facts stated in the turns, one per line, as:
+FACT: subject | predicate | object
+
+Turns:
+{turns}
+""".strip()
+
+
+class LLMSummarizer:
+    """Summarises with an LLM `complete(prompt) -> str`; falls back to `fallback` if it fails or says nothing."""
+
+    def __init__(self, complete: Callable[[str], str], fallback: Optional[Summarizer] = None):
+        self.complete = complete
+        self.fallback = fallback or ExtractiveSummarizer()
+
+    def __call__(self, turns: List[str]) -> Tuple[str, List[Triple]]:
+        try:
+            text = self.complete(SUMMARY_PROMPT.format(turns="\n\n".join(turns)))
+        except Exception as e:
+            print(f"[!] LLM summary failed ({e}); using the extractive summary")
+            return self.fallback(turns)
+        summary, triples = [], []
+        for line in text.splitlines():
+            match = _FACT_LINE.match(line)
+            if match:
+                triples.append(match.groups())
+            elif line.strip():
+                summary.append(line.strip())
+        if not summary:
+            return self.fallback(turns)
+        return " ".join(summary), triples
+
+
+def make_summarizer(name: str, complete: Callable[[str], str]) -> Summarizer:
+    if name == "llm":
+        return LLMSummarizer(complete)
+    if name == "extractive":
+        return ExtractiveSummarizer()
+    raise ValueError(f"unknown summariser {name!r}; use 'llm' or 'extractive'")
+
+
+# --- Archive of replaced turns ---
+
+class CompactionArchive:
+    """
+    The turns each compaction run replaced, with their vectors, kept until
+    the run is rolled back. Stored as <path>/<quoted session_id>/<tag>.json
+    and .npy, or in memory when `path` is None.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._memory: Dict[Tuple[str, str], tuple] = {}
+
+    def _files(self, session_id: str, tag: str) -> Tuple[str, str]:
+        folder = os.path.join(self.path, quote(session_id, safe=""))
+        return os.path.join(folder, f"{tag}.json"), os.path.join(folder, f"{tag}.npy")
+
+    def save(self, session_id: str, tag: str, docs: List[Document], vectors: np.ndarray):
+        records = [{"id": doc.id, "text": doc.page_content, "metadata": doc.metadata} for doc in docs]
+        if self.path is None:
+            self._memory[(session_id, tag)] = (records, vectors)
+            return
+        docs_path, vectors_path = self._files(session_id, tag)
+        os.makedirs(os.path.dirname(docs_path), exist_ok=True)
+        np.save(vectors_path, np.ascontiguousarray(vectors, dtype=np.float32))
+        # The record file appears last and atomically: a listed tag can always be restored
+        with open(docs_path + ".tmp", "w") as f:
+            json.dump(records, f, default=str)
+        os.replace(docs_path + ".tmp", docs_path)
+
+    def load(self, session_id: str, tag: str) -> Tuple[List[dict], np.ndarray]:
+        if self.path is None:
+            if (session_id, tag) not in self._memory:
+                raise KeyError(f"no compaction {tag!r} for session {session_id!r}")
+            return self._memory[(session_id, tag)]
+        docs_path, vectors_path = self._files(session_id, tag)
+        if not os.path.exists(docs_path):
+            raise KeyError(f"no compaction {tag!r} for session {session_id!r}")
+        with open(docs_path) as f:
+            records = json.load(f)
+        return records, np.load(vectors_path)
+
+    def discard(self, session_id: str, tag: str):
+        if self.path is None:
+            self._memory.pop((session_id, tag), None)
+            return
+        for path in self._files(session_id, tag):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def tags(self, session_id: str) -> List[str]:
+        if self.path is None:
+            return sorted(tag for sid, tag in self._memory if sid == session_id)
+        folder = os.path.dirname(self._files(session_id, "")[0])
+        if not os.path.isdir(folder):
+            return []
+        return sorted(name[:-len(".json")] for name in os.listdir(folder) if name.endswith(".json"))
+
+
+# --- Compaction ---
+
+@dataclass
+class CompactionResult:
+    session_id: str
+    tag: str
+    turns: int
+    summaries: int
+    facts: int
+
+
+def is_turn(doc: Document) -> bool:
+    """A stored conversation turn (as written by lc_core), as opposed to imports and summaries."""
+    kind = doc.metadata.get("kind")
+    if kind is not None:
+        return kind == "turn"
+    # Turns written before they were tagged
+    return doc.page_content.startswith("User: ") and "\nAI: " in doc.page_content and "chunk" not in doc.metadata
+
+
+class Compactor:
+    """
+    Replaces a session's old conversation turns with summaries. Turns are
+    taken oldest first, grouped by `window` seconds of their `created_at`
+    (untimestamped turns count as oldest and group by position), at most
+    `group_size` to a group. Each group becomes one summary document tagged
+    with the run's provenance tag, and the summariser's facts go into the
+    session's fact store under the same tag. The replaced turns are
+    archived, so rollback(session_id, tag) can put them back.
+
+    Runs are serialised; searches and writes carry on meanwhile. With
+    `lock_path` set they are also serialised across processes (workers
+    sharing an index service), and each run plans under the lock, so a
+    group already replaced by another worker is not compacted twice. The
+    summaries are written before the turns are removed, so a search never
+    finds neither. Restored turns are left alone for `min_age` seconds
+    after a rollback, then compacted like any other.
+    """
+
+    def __init__(self, memory, facts: Optional[FactMemory], summarizer: Summarizer,
+                 archive: Optional[CompactionArchive] = None, window: float = COMPACTION_WINDOW,
+                 group_size: int = COMPACTION_GROUP_SIZE, keep_recent: int = COMPACTION_KEEP_RECENT,
+                 min_age: float = COMPACTION_MIN_AGE, lock_path: Optional[str] = None):
+        self.memory = memory
+        self.facts = facts
+        self.summarizer = summarizer
+        self.archive = archive or CompactionArchive(COMPACTION_ARCHIVE_PATH if USE_DISK_PERSISTENCE else None)
+        self.window = window
+        self.group_size = group_size
+        self.keep_recent = keep_recent
+        self.min_age = min_age
+        self.lock_path = lock_path
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @contextmanager
+    def _exclusive(self):
+        with self._lock:
+            if self.lock_path is None:
+                yield
+                return
+            os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+            with open(self.lock_path, "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def plan(self, session_id: str, now: Optional[float] = None) -> List[List[Document]]:
+        """The groups of turns the next run would replace."""
+        now = time.time() if now is None else now
+        docs = self.memory.documents(session_id)
+        turns = [(doc.metadata.get("created_at") or 0.0, row, doc) for row, doc in enumerate(docs)
+                 if is_turn(doc) and now - doc.metadata.get("restored_at", 0.0) >= self.min_age]
+        turns.sort(key=lambda item: item[:2])
+        old = turns[:max(0, len(turns) - self.keep_recent)]
+
+        groups, current, current_window = [], [], None
+        for created_at, _, doc in old:
+            if now - created_at < self.min_age:
+                break
+            window = int(created_at // self.window) if created_at else None
+            if current and (window != current_window or len(current) >= self.group_size):
+                groups.append(current)
+                current = []
+            current.append(doc)
+            current_window = window
+        if current:
+            groups.append(current)
+        return [group for group in groups if len(group) >= MIN_GROUP]
+
+    def compact(self, session_id: str, now: Optional[float] = None) -> Optional[CompactionResult]:
+        """Run one compaction of a session; None if there was nothing old enough to compact."""
+        with self._exclusive():
+            groups = self.plan(session_id, now)
+            if not groups:
+                return None
+            tag = f"compaction-{time.strftime('%Y%m%dT%H%M%S')}-{uuid4().hex[:8]}"
+            summaries = [self.summarizer([doc.page_content for doc in group]) for group in groups]
+
+            originals = [doc for group in groups for doc in group]
+            vectors = self.memory.vectors(session_id, [doc.id for doc in originals])
+            if vectors is None:
+                # The index cannot reconstruct its rows (IVF); these are embedding cache hits
+                vectors = self.memory.model.encode([doc.page_content for doc in originals])
+            self.archive.save(session_id, tag, originals, vectors)
+
+            texts, metadatas = [], []
+            for group, (summary, _) in zip(groups, summaries):
+                stamps = [doc.metadata["created_at"] for doc in group if doc.metadata.get("created_at")]
+                metadata = {"kind": "summary", "provenance": tag, "turns": len(group)}
+                if stamps:
+                    metadata.update(created_at=min(stamps), until=max(stamps))
+                texts.append(SUMMARY_PREFIX + summary)
+                metadatas.append(metadata)
+            # Not deduplicated: a merge into an existing document would tie it to this run's rollback
+            self.memory.add(texts, session_id, metadatas=metadatas, dedup=False)
+
+            triples = [triple for _, found in summaries for triple in found]
+            if triples and self.facts is not None:
+                self.facts.get(session_id).add_facts(
+                    [(s, p, o, {"source": "compaction", "provenance": tag}) for s, p, o in triples]
+                )
+            self.memory.delete_documents(session_id, [doc.id for doc in originals])
+            print(f"[✓] Compacted {len(originals)} turns of session {session_id} into {len(groups)} "
+                  f"summaries and {len(triples)} facts ({tag})")
+            return CompactionResult(session_id, tag, len(originals), len(groups), len(triples))
+
+    def rollback(self, session_id: str, tag: str) -> int:
+        """Undo a compaction run: remove its summaries and facts and restore its turns. Returns turns restored."""
+        with self._exclusive():
+            records, vectors = self.archive.load(session_id, tag)
+            summary_ids = [doc.id for doc in self.memory.documents(session_id)
+                           if doc.metadata.get("provenance") == tag]
+            if summary_ids:
+                self.memory.delete_documents(session_id, summary_ids)
+            if self.facts is not None:
+                self.facts.get(session_id).delete_facts_by_provenance(tag)
+            if records:
+                # Later runs leave them alone until they are min_age old again
+                restored = {"restored_from": tag, "restored_at": time.time()}
+                self.memory.add([record["text"] for record in records], session_id,
+                                metadatas=[{**record["metadata"], **restored} for record in records],
+                                vectors=vectors, dedup=False)
+            self.archive.discard(session_id, tag)
+            print(f"[✓] Rolled back {tag}: restored {len(records)} turns of session {session_id}")
+            return len(records)
+
+    def run_once(self) -> List[CompactionResult]:
+        results = []
+        for session_id in self.memory.list_sessions():
+            try:
+                result = self.compact(session_id)
+            except Exception as e:
+                print(f"[!] Compaction of session {session_id} failed: {e}")
+                continue
+            if result is not None:
+                results.append(result)
+        return results
+
+    def start(self, interval: float):
+        """Compact every session every `interval` seconds on a daemon thread."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(interval,), name="lc_core-compaction", daemon=True)
+            self._thread.start()
+
+    def _run(self, interval: float):
+        while not self._stop.wait(interval):
+            self.run_once()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
@@ -3,19 +3,136 @@
 # Add your OpenAI API Key and rename to config.py
 OPENAI_API_KEY = "<INSERT_YOUR_API_KEY_HERE>"
 
+# Optional OpenAI-compatible endpoint (None uses api.openai.com), e.g. a local
+# stub server for load tests: "http://127.0.0.1:8001/v1"
+OPENAI_BASE_URL = None
+
 # Default session ID (used when no session ID is provided at runtime)
 DEFAULT_SESSION_ID = "test_session_01"
 
 # Embedding model name (Hugging Face)
 EMBEDDING_MODEL_NAME = "BAAI/bge-large-en-v1.5"
 
+# Embedding batching: texts per forward pass, and whether to L2-normalise vectors
+EMBEDDING_BATCH_SIZE = 32
+EMBEDDING_NORMALIZE = False
+
+# Embedding cache: in-memory LRU entries (0 disables) and optional on-disk tier (None disables)
+EMBEDDING_CACHE_SIZE = 50000
+EMBEDDING_CACHE_PATH = "lc_core/vectorstore/embedding_cache"
+
 # FAISS index path for optional persistence
 FAISS_INDEX_PATH = "lc_core/vectorstore/index.faiss"
 FAISS_DOCSTORE_PATH = "lc_core/vectorstore/docstore.pkl"
 FAISS_INDEX_METADATA_PATH = "lc_core/vectorstore/index_metadata.pkl"
 
+# FAISS index type for new session shards, as a faiss.index_factory string:
+# "Flat" (exact), "HNSW32", "SQ8", "IVF1024,PQ64", ...
+FAISS_INDEX_FACTORY = "Flat"
+
+# Trainable types (IVF/PQ/SQ) buffer vectors in a flat index until this many
+# have been added, then train and switch over (IVF wants ~40x nlist)
+FAISS_TRAIN_MIN_VECTORS = 50000
+
+# Query-time knobs: IVF lists probed, HNSW search breadth
+FAISS_NPROBE = 16
+FAISS_HNSW_EF_SEARCH = 64
+
+# Serve saved indexes read-only from memory-mapped files so several worker
+# processes share pages; adds, deletes and saves are refused
+FAISS_MMAP_READ_ONLY = False
+
+# Structured facts (lc_memory.SQLiteFactStore), one SQLite file for all sessions
+FACT_STORE_PATH = "lc_core/vectorstore/facts.db"
+
+# Retrieval: vector hits fetched per turn, and the token budget that facts and
+# hits are trimmed to before they go into the prompt
+RETRIEVAL_CANDIDATES = 8
+CONTEXT_TOKEN_BUDGET = 1500
+
+# Reranking between search and merge: RERANK_POOL hits are fetched and MMR
+# (RERANK_MMR_LAMBDA: 1.0 = relevance only, 0.0 = diversity only) keeps
+# RETRIEVAL_CANDIDATES of them, dropping near-duplicates. With a cross-encoder
+# model named (e.g. "cross-encoder/ms-marco-MiniLM-L-6-v2") the survivors are
+# then reordered by it. Stages whose estimated cost would push retrieval past
+# RERANK_LATENCY_BUDGET seconds are skipped. A pool no larger than
+# RETRIEVAL_CANDIDATES and no model disables reranking
+RERANK_POOL = 24
+RERANK_MMR_LAMBDA = 0.5
+RERANK_MODEL_NAME = None
+RERANK_DEVICE = "cpu"
+RERANK_BATCH_SIZE = 32
+RERANK_LATENCY_BUDGET = 0.15
+
+# Async pipeline: threads for embedding, FAISS search and memory write-back
+PIPELINE_WORKERS = 4
+
+# Write-behind memory ingestion: a batch is embedded and indexed once this many
+# turns are queued or the oldest has waited INGEST_MAX_DELAY seconds; writers
+# block while INGEST_MAX_PENDING turns are queued
+INGEST_BATCH_SIZE = 32
+INGEST_MAX_DELAY = 0.05
+INGEST_MAX_PENDING = 1024
+
+# Response cache for the chain, keyed by template, question and the IDs of the
+# retrieved documents and facts: in-memory entries (0 disables), seconds an
+# entry stays valid (None = until evicted), optional SQLite file (None disables)
+RESPONSE_CACHE_SIZE = 1000
+RESPONSE_CACHE_TTL = 3600
+RESPONSE_CACHE_PATH = "lc_core/vectorstore/response_cache.db"
+
+# Ingest dedup: a text is not added when it repeats a document of its session.
+# Exact repeats (whitespace ignored) are caught against the whole shard; near
+# repeats against the last DEDUP_WINDOW documents, by SimHash Hamming distance
+# (bits out of 64) or by embedding cosine similarity. None disables either
+# near-repeat check. The skipped text's metadata is merged into the original
+DEDUP_ENABLED = True
+DEDUP_WINDOW = 256
+DEDUP_SIMHASH_DISTANCE = 4
+DEDUP_SIMILARITY = 0.97
+
+# Compaction of old conversation turns: per session, turns are grouped by
+# COMPACTION_WINDOW seconds (at most COMPACTION_GROUP_SIZE per group) and each
+# group is replaced by one summary document plus facts for the fact store.
+# The newest COMPACTION_KEEP_RECENT turns, and turns younger than
+# COMPACTION_MIN_AGE seconds, are kept. "llm" summarises with the chain's LLM
+# (falling back to "extractive", which needs no model, on errors). Replaced
+# turns are archived under COMPACTION_ARCHIVE_PATH so a run can be rolled
+# back. COMPACTION_INTERVAL: seconds between background runs (None = off)
+COMPACTION_SUMMARIZER = "llm"
+COMPACTION_WINDOW = 3600
+COMPACTION_GROUP_SIZE = 20
+COMPACTION_KEEP_RECENT = 50
+COMPACTION_MIN_AGE = 3600
+COMPACTION_INTERVAL = None
+COMPACTION_ARCHIVE_PATH = "lc_core/vectorstore/compaction"
+
+# Bulk import: chunks embedded and added per batch
+IMPORT_BATCH_SIZE = 256
+
+# Multi-process serving: with an address set, lc_core talks to a single index
+# service process (python -m lc_core.index_service) over this Unix socket
+# instead of loading the model and shards itself. Query encodes from all
+# workers are batched up to INDEX_SERVICE_BATCH_SIZE texts, waiting at most
+# INDEX_SERVICE_BATCH_DELAY seconds. Set a private authkey (bytes).
+INDEX_SERVICE_ADDRESS = None    # e.g. "/tmp/lc_core_index.sock"
+INDEX_SERVICE_AUTHKEY = b"<INSERT_A_RANDOM_SECRET_HERE>"
+INDEX_SERVICE_BATCH_SIZE = 64
+INDEX_SERVICE_BATCH_DELAY = 0.002
+INDEX_SERVICE_CONNECT_TIMEOUT = 30.0
+
+# Instrumentation: span timings, batch sizes and cache counters served at
+# /metrics (Prometheus text format). The sampling profiler behind
+# /debug/profile stays off unless enabled; it inspects every thread's stack
+METRICS_ENABLED = True
+PROFILER_ENABLED = False
+
 # Optional: Set to True to enable save/load of vectorstore
 USE_DISK_PERSISTENCE = True
 
+# Saves append to a per-session write-ahead log; the log is folded into a new
+# checkpoint once it holds more than this many entries
+WAL_COMPACT_ENTRIES = 1000
+
 
  
\ No newline at end of file
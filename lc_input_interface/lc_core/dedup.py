@@ -0,0 +1,199 @@
+# lc_core/dedup.py
+
+from hashlib import blake2b
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .hybrid_retrieval import normalize
+from .config import DEDUP_SIMHASH_DISTANCE, DEDUP_SIMILARITY, DEDUP_WINDOW
+
+if TYPE_CHECKING:
+    from langchain_community.vectorstores.faiss import FAISS
+
+SHINGLE_WORDS = 3
+MAX_CACHED_WORDS = 200_000
+
+_BITS = np.arange(64, dtype=np.uint64)
+_MIX = (np.uint64(0x9E3779B97F4A7C15), np.uint64(0xBF58476D1CE4E5B9), np.uint64(0x94D049BB133111EB))
+_word_hashes: Dict[str, int] = {}
+
+
+def content_hash(text: str) -> bytes:
+    """Hash of the text with whitespace collapsed; equal hashes mean the same content."""
+    return blake2b(" ".join(text.split()).encode("utf-8"), digest_size=16).digest()
+
+
+def _word_hash(word: str) -> int:
+    h = _word_hashes.get(word)
+    if h is None:
+        if len(_word_hashes) >= MAX_CACHED_WORDS:
+            _word_hashes.clear()
+        h = _word_hashes[word] = int.from_bytes(blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+    return h
+
+
+def simhashes(texts: Sequence[str]) -> np.ndarray:
+    """
+    64-bit SimHash of each text over word 3-shingles, ignoring case and
+    punctuation. Texts sharing most shingles land a few bits apart,
+    unrelated texts about 32. Words are hashed once (and cached); shingle
+    hashing and bit voting run over the whole batch in numpy.
+    """
+    words, lengths = [], []
+    for text in texts:
+        tokens = normalize(text).split()
+        tokens += [""] * (SHINGLE_WORDS - len(tokens))   # short texts still get one shingle
+        words.extend(tokens)
+        lengths.append(len(tokens))
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+    cached = _word_hashes.get
+    hashes = np.array([cached(word) or _word_hash(word) for word in words], dtype=np.uint64)
+    owner = np.repeat(np.arange(len(lengths)), lengths)
+
+    # Combine each run of SHINGLE_WORDS word hashes, keeping runs within one text
+    span = len(hashes) - SHINGLE_WORDS + 1
+    shingles = np.zeros(span, dtype=np.uint64)
+    for offset in range(SHINGLE_WORDS):
+        shingles = (shingles ^ hashes[offset:offset + span]) * _MIX[0]
+    shingles = shingles[owner[:span] == owner[SHINGLE_WORDS - 1:]]
+    # splitmix64 finalizer, so every output bit depends on every input bit
+    shingles ^= shingles >> np.uint64(30)
+    shingles *= _MIX[1]
+    shingles ^= shingles >> np.uint64(27)
+    shingles *= _MIX[2]
+    shingles ^= shingles >> np.uint64(31)
+
+    counts = np.asarray(lengths) - SHINGLE_WORDS + 1
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    # Per text and bit, how many shingles set it; a bit of the SimHash is set when most do
+    bits = np.unpackbits(shingles.astype("<u8").view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    ones = np.add.reduceat(bits.T.astype(np.int32), starts, axis=1)
+    return ((ones * 2 > counts).astype(np.uint64) << _BITS[:, None]).sum(axis=0, dtype=np.uint64)
+
+
+class Deduplicator:
+    """
+    Ingest-time duplicate check for one session shard. A text duplicates
+    an existing document when:
+
+    - its content hash matches any document in the shard ("exact"),
+    - its SimHash is within `simhash_distance` bits of one of the last
+      `window` documents ("simhash"), or
+    - its vector's cosine similarity to one of the last `window` vectors
+      added in this process is at least `similarity` ("embedding").
+
+    `None` disables the SimHash or embedding check. Not thread-safe: use
+    under the session's write lock.
+    """
+
+    def __init__(self, window: int = DEDUP_WINDOW, simhash_distance: Optional[int] = DEDUP_SIMHASH_DISTANCE,
+                 similarity: Optional[float] = DEDUP_SIMILARITY):
+        self.window = window
+        self.simhash_distance = simhash_distance
+        self.similarity = similarity
+        self.hashes: Dict[bytes, str] = {}
+        # Ring buffers over the most recent documents; slots without a vector stay zero and never match
+        self._ids: List[Optional[str]] = [None] * window
+        self._simhashes = np.zeros(window, dtype=np.uint64)
+        self._vectors: Optional[np.ndarray] = None
+        self._next = 0
+        self._filled = 0
+
+    @classmethod
+    def from_store(cls, store: "FAISS", **kwargs) -> "Deduplicator":
+        """Index a shard's documents: every content hash, and SimHashes of the newest."""
+        dedup = cls(**kwargs)
+        docs = []
+        for _, doc_id in sorted(store.index_to_docstore_id.items()):
+            doc = store.docstore.search(doc_id)
+            if not isinstance(doc, str):   # a str is a docstore miss
+                docs.append(doc)
+        for doc in docs:
+            dedup.hashes[content_hash(doc.page_content)] = doc.id
+        recent = docs[-dedup.window:]
+        if recent and dedup.simhash_distance is not None:
+            sims = simhashes([doc.page_content for doc in recent])
+            for doc, sim in zip(recent, sims):
+                dedup._push(doc.id, sim, None)
+        return dedup
+
+    def check(self, texts: List[str], vectors: Optional[np.ndarray], ids: List[str]) -> List[Optional[Tuple[str, str]]]:
+        """
+        For each text, the (existing document ID, reason) it duplicates, or
+        None. Texts that are not duplicates are remembered under their
+        `ids`, so a repeat later in the same batch is caught as well.
+        """
+        n = len(texts)
+        digests = [content_hash(text) for text in texts]
+        filled = self._filled
+        window_ids = self._ids[:filled]
+        # Scores against the window and within the batch, one matrix each; higher is closer.
+        # For SimHash the score is minus the Hamming distance
+        checks = []
+        if self.simhash_distance is not None:
+            sims = simhashes(texts)
+            checks.append(("simhash", -self.simhash_distance,
+                           -np.bitwise_count(sims[:, None] ^ self._simhashes[None, :filled]).astype(np.int16),
+                           -np.bitwise_count(sims[:, None] ^ sims[None, :]).astype(np.int16)))
+        else:
+            sims = None
+        units = None
+        if vectors is not None and self.similarity is not None and n:
+            units = np.asarray(vectors, dtype=np.float32)
+            units = units / np.maximum(np.linalg.norm(units, axis=1, keepdims=True), 1e-12)
+            window = self._vectors[:filled] if self._vectors is not None else np.zeros((0, units.shape[1]), np.float32)
+            checks.append(("embedding", self.similarity, units @ window.T, units @ units.T))
+
+        kept = np.zeros(n, dtype=bool)
+        results: List[Optional[Tuple[str, str]]] = []
+        for i in range(n):
+            found = None
+            doc_id = self.hashes.get(digests[i])
+            if doc_id is not None:
+                found = doc_id, "exact"
+            earlier = np.flatnonzero(kept[:i]) if checks and found is None else None
+            for reason, threshold, window_scores, batch_scores in checks:
+                if found is not None:
+                    break
+                row = window_scores[i]
+                if len(row) and row.max() >= threshold:
+                    found = window_ids[int(np.argmax(row))], reason
+                    break
+                row = batch_scores[i, earlier]
+                if len(row) and row.max() >= threshold:
+                    found = ids[earlier[int(np.argmax(row))]], reason
+            results.append(found)
+            if found is None:
+                kept[i] = True
+                self.hashes[digests[i]] = ids[i]
+                self._push(ids[i], sims[i] if sims is not None else None, units[i] if units is not None else None)
+        return results
+
+    def _push(self, doc_id: str, sim, unit: Optional[np.ndarray]):
+        slot = self._next
+        self._ids[slot] = doc_id
+        self._simhashes[slot] = sim if sim is not None else 0
+        if unit is not None and self._vectors is None:
+            self._vectors = np.zeros((self.window, len(unit)), dtype=np.float32)
+        if self._vectors is not None:
+            self._vectors[slot] = unit if unit is not None else 0.0
+        self._next = (slot + 1) % self.window
+        self._filled = min(self._filled + 1, self.window)
+
+
+def merge_metadata(existing: dict, incoming: dict) -> dict:
+    """
+    Metadata for a document that has been added again: keys it lacked are
+    taken from `incoming`, list values are unioned, and `duplicates`
+    counts the merges.
+    """
+    merged = dict(existing)
+    for key, value in incoming.items():
+        if key not in merged:
+            merged[key] = value
+        elif isinstance(merged[key], list) and isinstance(value, list):
+            merged[key] = merged[key] + [item for item in value if item not in merged[key]]
+    merged["duplicates"] = existing.get("duplicates", 0) + 1
+    return merged
@@ -0,0 +1,249 @@
+# lc_core/embedding_cache.py
+
+import fcntl
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+KEY_SIZE = 20  # sha1 digest length
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def cache_key(model_name: str, text: str, normalize: bool = False) -> bytes:
+    # Normalised and raw vectors of the same text are different entries
+    return hashlib.sha1(f"{model_name}\0{int(normalize)}\0{normalize_text(text)}".encode("utf-8")).digest()
+
+
+class DiskEmbeddingStore:
+    """
+    Append-only on-disk tier: `keys.bin` holds fixed-size digests, `vectors.f32`
+    the matching float32 rows, read back through a memory map.
+
+    Several processes may share the directory. Appends and the open-time
+    repair run under an exclusive lock on `lock`. Row numbers are taken
+    from the files as they stand under that lock, never from this process's
+    view of them.
+    """
+
+    def __init__(self, path: str, dimension: int):
+        self.path = path
+        self.dimension = dimension
+        self.keys_path = os.path.join(path, "keys.bin")
+        self.vectors_path = os.path.join(path, "vectors.f32")
+        self.lock_path = os.path.join(path, "lock")
+        self.rows: Dict[bytes, int] = {}
+        self._loaded = 0   # key rows read into self.rows so far
+        self._mmap = None
+        os.makedirs(path, exist_ok=True)
+        self._check_meta()
+        with self._locked():
+            self._repair()
+            self._read_keys()
+
+    def _check_meta(self):
+        meta_path = os.path.join(self.path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                stored = json.load(f)["dimension"]
+            if stored != self.dimension:
+                raise ValueError(f"Embedding cache at {self.path} has dimension {stored}, expected {self.dimension}")
+        else:
+            with open(meta_path, "w") as f:
+                json.dump({"dimension": self.dimension}, f)
+
+    @contextmanager
+    def _locked(self):
+        with open(self.lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _size(self, path: str) -> int:
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+    def _repair(self) -> int:
+        """
+        Cut both files back to the rows complete in both (dropping a torn
+        trailing write), so the next append lines keys up with vectors.
+        Returns the row count. Call with the lock held.
+        """
+        row_bytes = self.dimension * 4
+        key_bytes, vector_bytes = self._size(self.keys_path), self._size(self.vectors_path)
+        count = min(key_bytes // KEY_SIZE, vector_bytes // row_bytes)
+        if key_bytes != count * KEY_SIZE:
+            os.truncate(self.keys_path, count * KEY_SIZE)
+        if vector_bytes != count * row_bytes:
+            os.truncate(self.vectors_path, count * row_bytes)
+        return count
+
+    def _read_keys(self):
+        """Index keys appended (by any process) since the last read. Call with the lock held."""
+        count = self._size(self.keys_path) // KEY_SIZE
+        if count <= self._loaded:
+            return
+        with open(self.keys_path, "rb") as f:
+            f.seek(self._loaded * KEY_SIZE)
+            data = f.read((count - self._loaded) * KEY_SIZE)
+        for offset in range(len(data) // KEY_SIZE):
+            self.rows.setdefault(data[offset * KEY_SIZE:(offset + 1) * KEY_SIZE], self._loaded + offset)
+        self._loaded = count
+
+    def _vectors(self, row: int):
+        if self._mmap is None or row >= len(self._mmap):
+            self._mmap = np.memmap(self.vectors_path, dtype=np.float32, mode="r").reshape(-1, self.dimension)
+        return self._mmap
+
+    def __len__(self):
+        return len(self.rows)
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        row = self.rows.get(key)
+        if row is None:
+            return None
+        return np.array(self._vectors(row)[row])
+
+    def put_many(self, keys: List[bytes], vectors: np.ndarray):
+        if all(key in self.rows for key in keys):
+            return
+        with self._locked():
+            # Another process may have appended, or crashed mid-append, since we last looked
+            start = self._repair()
+            self._read_keys()
+            new, seen = [], set()
+            for key, vector in zip(keys, vectors):
+                if key not in self.rows and key not in seen:
+                    seen.add(key)
+                    new.append((key, vector))
+            if not new:
+                return
+            block = np.ascontiguousarray([vector for _, vector in new], dtype=np.float32)
+            # Vectors first, so a key on disk never points past the end of the vector file
+            with open(self.vectors_path, "ab") as f:
+                f.write(block.tobytes())
+            with open(self.keys_path, "ab") as f:
+                f.write(b"".join(key for key, _ in new))
+            for offset, (key, _) in enumerate(new):
+                self.rows[key] = start + offset
+            self._loaded = start + len(new)
+
+
+class CachedEmbedding(Embeddings):
+    """
+    Content-addressed cache in front of an embedding model.
+
+    Keys are sha1(model_name, normalize flag, whitespace-normalised text).
+    Lookups go to a bounded in-memory LRU, then the optional disk tier, then
+    the model. Queries and documents share entries, which assumes the
+    wrapped model embeds both the same way (true for BGEEmbedding).
+    """
+
+    def __init__(self, base: Embeddings, max_entries: int = 50_000, disk_path: Optional[str] = None):
+        self.base = base
+        self.model_name = getattr(base, "model_name", type(base).__name__)
+        self.normalize = getattr(base, "normalize", False)
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self._lru: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._disk: Optional[DiskEmbeddingStore] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @property
+    def dimension(self) -> int:
+        return self.base.dimension
+
+    @property
+    def disk(self) -> Optional[DiskEmbeddingStore]:
+        if self._disk is None and self.disk_path:
+            self._disk = DiskEmbeddingStore(self.disk_path, self.dimension)
+        return self._disk
+
+    def _remember(self, key: bytes, vector: np.ndarray):
+        if self.max_entries <= 0:
+            return
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def _lookup(self, key: bytes) -> Optional[np.ndarray]:
+        vector = self._lru.get(key)
+        if vector is not None:
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return vector
+        disk = self.disk
+        if disk is not None:
+            vector = disk.get(key)
+            if vector is not None:
+                self._remember(key, vector)
+                self.disk_hits += 1
+                return vector
+        return None
+
+    def _encode_base(self, texts: List[str]) -> np.ndarray:
+        if hasattr(self.base, "encode"):
+            return self.base.encode(texts)
+        return np.asarray(self.base.embed_documents(texts), dtype=np.float32)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Return a contiguous (n, dimension) float32 array, encoding only cache misses."""
+        texts = list(texts)
+        keys = [cache_key(self.model_name, text, self.normalize) for text in texts]
+        vectors = np.empty((len(texts), self.dimension), dtype=np.float32)
+        pending: "OrderedDict[bytes, List[int]]" = OrderedDict()
+        with self._lock:
+            for row, key in enumerate(keys):
+                if key in pending:
+                    pending[key].append(row)
+                    continue
+                vector = self._lookup(key)
+                if vector is None:
+                    pending[key] = [row]
+                else:
+                    vectors[row] = vector
+
+        if pending:
+            # Encode outside the lock; duplicates within the batch are encoded once
+            encoded = self._encode_base([texts[rows[0]] for rows in pending.values()])
+            with self._lock:
+                self.misses += len(pending)
+                for (key, rows), vector in zip(pending.items(), encoded):
+                    vectors[rows] = vector
+                    # Copy so the LRU does not pin the whole encoded batch
+                    self._remember(key, vector.copy())
+                if self.disk is not None:
+                    self.disk.put_many(list(pending), encoded)
+
+        return vectors
+
+    def embed_documents(self, texts):
+        return self.encode(texts).tolist()
+
+    def embed_query(self, text):
+        return self.encode([text])[0].tolist()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_entries": len(self._lru),
+            "disk_entries": len(self._disk) if self._disk is not None else 0,
+        }
@@ -0,0 +1,163 @@
+# lc_core/hybrid_retrieval.py
+
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from langchain_core.documents import Document
+from lc_memory import FactStore, SQLiteFactStore
+from lc_memory.schema import Fact
+
+from .retrieval import fact_text
+from .config import FACT_STORE_PATH, USE_DISK_PERSISTENCE
+
+CHARS_PER_TOKEN = 4       # rough English average for OpenAI tokenizers
+RRF_K = 60                # reciprocal-rank fusion constant
+MAX_ENTITY_WORDS = 4      # longest subject/predicate phrase looked for in a question
+MAX_FACTS = 20            # fact candidates passed to the merge
+
+_WORD = re.compile(r"[\w'-]+")
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def normalize(text: str) -> str:
+    return " ".join(_WORD.findall(text.lower()))
+
+
+class EntityMatcher:
+    """Finds known names (subjects or predicates) mentioned in free text by n-gram lookup."""
+
+    def __init__(self, names: Iterable[str]):
+        self.names: Dict[str, str] = {}
+        for name in names:
+            key = normalize(name)
+            if key:
+                self.names.setdefault(key, name)
+        self.max_words = min(MAX_ENTITY_WORDS, max((k.count(" ") + 1 for k in self.names), default=0))
+
+    def find(self, text: str) -> List[str]:
+        words = normalize(text).split()
+        found = []
+        for n in range(self.max_words, 0, -1):
+            for i in range(len(words) - n + 1):
+                name = self.names.get(" ".join(words[i:i + n]))
+                if name is not None and name not in found:
+                    found.append(name)
+        return found
+
+
+class FactMemory:
+    """
+    Per-session fact stores, created on first use. Backed by one SQLite file
+    (with an in-memory cache per session) when disk persistence is on,
+    otherwise by plain in-memory FactStores.
+    """
+
+    def __init__(self, path: Optional[str] = FACT_STORE_PATH):
+        self.path = path if USE_DISK_PERSISTENCE else None
+        self._stores: Dict[str, Union[FactStore, SQLiteFactStore]] = {}
+        # session_id -> (fact store version, subject matcher, predicate matcher)
+        self._matchers: Dict[str, Tuple[tuple, EntityMatcher, EntityMatcher]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Union[FactStore, SQLiteFactStore]:
+        with self._lock:
+            store = self._stores.get(session_id)
+            if store is None:
+                if self.path:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    store = SQLiteFactStore(session_id, self.path)
+                else:
+                    store = FactStore(session_id)
+                self._stores[session_id] = store
+            return store
+
+    def close(self):
+        with self._lock:
+            for store in self._stores.values():
+                if isinstance(store, SQLiteFactStore):
+                    store.close()
+            self._stores.clear()
+            self._matchers.clear()
+
+    def _index(self, session_id: str) -> FactStore:
+        store = self.get(session_id)
+        if isinstance(store, SQLiteFactStore):
+            store.refresh()
+            return store.cache
+        return store
+
+    def extract_entities(self, question: str, session_id: str) -> Tuple[List[str], List[str]]:
+        """Subjects and predicates of the session's facts that the question mentions, longest first."""
+        index = self._index(session_id)
+        by_subject, by_predicate = index.by_subject, index.by_predicate
+        # Rebuilt only after the store changed since the matchers were built
+        cached = self._matchers.get(session_id)
+        if cached is None or cached[0] != index.version:
+            cached = self._matchers[session_id] = (index.version, EntityMatcher(by_subject), EntityMatcher(by_predicate))
+        return cached[1].find(question), cached[2].find(question)
+
+    def find_facts(self, question: str, session_id: str, limit: int = MAX_FACTS) -> List[Fact]:
+        """
+        Active facts about the entities a question mentions, best first:
+        facts matching more of the question (subject, predicate, object)
+        rank higher, then newer facts.
+        """
+        subjects, predicates = self.extract_entities(question, session_id)
+        if not subjects and not predicates:
+            return []
+        index = self._index(session_id)
+        candidates: Dict = {}
+        for subject in subjects:
+            for fact in index.get_facts(subject=subject, state="active"):
+                candidates[fact.id] = fact
+        if not subjects:
+            for predicate in predicates:
+                for fact in index.get_facts(predicate=predicate, state="active"):
+                    candidates[fact.id] = fact
+
+        question_text = f" {normalize(question)} "
+        subject_set, predicate_set = set(subjects), set(predicates)
+
+        def score(fact: Fact):
+            matches = (fact.subject in subject_set) + (fact.predicate in predicate_set) \
+                + (f" {normalize(fact.object)} " in question_text)
+            return matches, fact.valid_from
+
+        return sorted(candidates.values(), key=score, reverse=True)[:limit]
+
+
+def merge_context(facts: List[Fact], docs: List[Document], token_budget: int) -> Tuple[List[Fact], List[Document]]:
+    """
+    Rank facts and vector hits together by reciprocal-rank fusion, drop
+    duplicates (and facts a retrieved chunk already states), and keep the
+    best items that fit in `token_budget` tokens.
+    """
+    doc_texts = [normalize(doc.page_content) for doc in docs]
+    candidates = []
+    for rank, fact in enumerate(facts):
+        text = fact_text(fact)
+        key = normalize(text)
+        if any(key in doc for doc in doc_texts):
+            continue
+        candidates.append((1.0 / (RRF_K + rank), 0, key, text, fact))
+    for rank, (doc, key) in enumerate(zip(docs, doc_texts)):
+        candidates.append((1.0 / (RRF_K + rank), 1, key, doc.page_content, doc))
+    # Facts win ties: they carry the same information in fewer tokens
+    candidates.sort(key=lambda c: (-c[0], c[1]))
+
+    kept_facts, kept_docs, seen, used = [], [], set(), 0
+    for _, kind, key, text, item in candidates:
+        if key in seen:
+            continue
+        cost = estimate_tokens(text)
+        if used + cost > token_budget:
+            continue
+        seen.add(key)
+        used += cost
+        (kept_facts if kind == 0 else kept_docs).append(item)
+    return kept_facts, kept_docs
@@ -0,0 +1,123 @@
+# lc_core/index_factory.py
+
+from functools import lru_cache
+
+import faiss
+import numpy as np
+
+from .config import (
+    FAISS_HNSW_EF_SEARCH,
+    FAISS_INDEX_FACTORY,
+    FAISS_NPROBE,
+    FAISS_TRAIN_MIN_VECTORS,
+)
+
+
+def build_index(dimension: int, factory: str = FAISS_INDEX_FACTORY):
+    """Create an empty index from a faiss.index_factory string ("Flat", "IVF1024,PQ64", "HNSW32", "SQ8", ...)."""
+    return configure_search(faiss.index_factory(dimension, factory))
+
+
+@lru_cache(maxsize=None)
+def requires_training(dimension: int, factory: str = FAISS_INDEX_FACTORY) -> bool:
+    return not faiss.index_factory(dimension, factory).is_trained
+
+
+def configure_search(index, nprobe: int = FAISS_NPROBE, ef_search: int = FAISS_HNSW_EF_SEARCH):
+    """Apply query-time knobs (nprobe / efSearch) to IVF and HNSW indexes."""
+    try:
+        faiss.extract_index_ivf(index).nprobe = nprobe
+    except (RuntimeError, ValueError):
+        pass
+    hnsw = getattr(faiss.downcast_index(index), "hnsw", None)
+    if hnsw is not None:
+        hnsw.efSearch = ef_search
+    return index
+
+
+def initial_index(dimension: int, factory: str = FAISS_INDEX_FACTORY):
+    """
+    Index for a new shard. Trainable types (IVF, PQ, SQ) start as a flat
+    index that buffers vectors until there are enough to train on.
+    """
+    if requires_training(dimension, factory):
+        return faiss.IndexFlatL2(dimension)
+    return build_index(dimension, factory)
+
+
+def should_train(index, factory: str = FAISS_INDEX_FACTORY) -> bool:
+    return (
+        type(index) in (faiss.IndexFlat, faiss.IndexFlatL2)
+        and requires_training(index.d, factory)
+        and index.ntotal >= FAISS_TRAIN_MIN_VECTORS
+    )
+
+
+def train_from(index, factory: str = FAISS_INDEX_FACTORY):
+    """
+    Train a `factory` index on every vector buffered in a flat `index` and
+    re-add them in the same order, so row numbers (and the docstore mapping)
+    are unchanged.
+    """
+    vectors = index.reconstruct_n(0, index.ntotal)
+    trained = build_index(index.d, factory)
+    trained.train(vectors)
+    trained.add(vectors)
+    return trained
+
+
+def stored_vectors(index, rows):
+    """
+    The vectors stored at `rows` (approximate for compressed codes), or None
+    when the index cannot reconstruct them (IVF without a direct map).
+    """
+    if not len(rows):
+        return np.empty((0, index.d), dtype=np.float32)
+    try:
+        return index.reconstruct_batch(np.asarray(rows, dtype=np.int64))
+    except RuntimeError:
+        return None
+
+
+def rebuild_without(index, rows):
+    """
+    Rebuild `index` without the given row numbers, for index types that do
+    not implement remove_ids (HNSW). Requires reconstruct support.
+    """
+    drop = set(int(r) for r in rows)
+    keep = [r for r in range(index.ntotal) if r not in drop]
+    rebuilt = faiss.clone_index(index)
+    rebuilt.reset()
+    if keep:
+        rebuilt.add(np.vstack([index.reconstruct(r) for r in keep]))
+    return configure_search(rebuilt)
+
+
+def remove_rows(index, rows):
+    """
+    Remove the given row numbers and renumber the survivors 0..n-1 in their
+    old order, as the docstore mapping is renumbered. Flat indexes shift rows
+    themselves; IVF variants keep each vector's original id, so their inverted
+    lists are rewritten; types without remove_ids (HNSW) are rebuilt. Returns
+    the index to use from now on.
+    """
+    drop = np.unique(np.fromiter((int(r) for r in rows), dtype=np.int64))
+    try:
+        ivf = faiss.extract_index_ivf(index)
+    except (RuntimeError, ValueError):
+        ivf = None
+    try:
+        index.remove_ids(drop)
+    except RuntimeError:
+        return rebuild_without(index, drop)
+    if ivf is not None:
+        invlists = ivf.invlists
+        for list_no in range(ivf.nlist):
+            size = invlists.list_size(list_no)
+            if not size:
+                continue
+            ids = faiss.rev_swig_ptr(invlists.get_ids(list_no), size).copy()
+            codes = faiss.rev_swig_ptr(invlists.get_codes(list_no), size * invlists.code_size).copy()
+            ids -= np.searchsorted(drop, ids)
+            invlists.update_entries(list_no, 0, size, faiss.swig_ptr(ids), faiss.swig_ptr(codes))
+    return index
@@ -0,0 +1,438 @@
+# lc_core/index_service.py
+#
+# One process owns the embedding model and the FAISS shards; request workers
+# (gunicorn/uvicorn processes) reach it over a Unix socket, so the weights and
+# indexes are loaded once however many workers run:
+#
+#   python -m lc_core.index_service            # listens on INDEX_SERVICE_ADDRESS
+#
+# and set INDEX_SERVICE_ADDRESS in each worker's lc_core/config.py.
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import AuthenticationError, Client, Listener
+from typing import Callable, Dict, List, Optional
+
+import faiss
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from .index_factory import configure_search
+from .memory_manager import VectorStoreMemory
+from .retrieval import RetrievalContext
+from .config import (
+    INDEX_SERVICE_ADDRESS,
+    INDEX_SERVICE_AUTHKEY,
+    INDEX_SERVICE_BATCH_SIZE,
+    INDEX_SERVICE_BATCH_DELAY,
+    INDEX_SERVICE_CONNECT_TIMEOUT,
+)
+
+
+class EncodeBatcher:
+    """
+    Coalesces encode requests from all connected workers: a request waits
+    at most `max_delay` seconds for others to join it, then up to
+    `max_batch` texts go through the model in one call.
+    """
+
+    def __init__(self, encode: Callable[[List[str]], np.ndarray], max_batch: int = 64, max_delay: float = 0.002):
+        self._encode = encode
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="lc_core-encode", daemon=True)
+        self._worker.start()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        future = Future()
+        self._queue.put((list(texts), future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            count = len(batch[0][0])
+            deadline = time.monotonic() + self.max_delay
+            while count < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                batch.append(item)
+                count += len(item[0])
+            try:
+                vectors = self._encode([text for texts, _ in batch for text in texts])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            start = 0
+            for texts, future in batch:
+                future.set_result(vectors[start:start + len(texts)])
+                start += len(texts)
+
+
+class IndexServer:
+    """
+    Serves a VectorStoreMemory to other processes. Each connection gets a
+    thread; calls are (method, args, kwargs) tuples answered with (ok,
+    result, forget sequence). Query encoding is batched across connections,
+    memory writes go through the memory's write-behind queue (already
+    batched across sessions), and the memory's per-session locks let
+    searches from different workers run in parallel.
+
+    Every delete bumps the forget sequence, so a client seeing a new one
+    asks forgotten_since() which sessions lost documents and runs its own
+    on_forget callbacks, whichever worker made the delete.
+    """
+
+    def __init__(self, memory: Optional[VectorStoreMemory] = None, address: str = INDEX_SERVICE_ADDRESS,
+                 authkey: bytes = INDEX_SERVICE_AUTHKEY):
+        self.memory = memory or VectorStoreMemory()
+        self.address = address
+        self.authkey = authkey
+        self.batcher = EncodeBatcher(lambda texts: self.memory.model.encode(texts),
+                                     INDEX_SERVICE_BATCH_SIZE, INDEX_SERVICE_BATCH_DELAY)
+        self.handlers: Dict[str, Callable] = {
+            "ping": lambda: True,
+            "load": self.memory.load,
+            "is_loaded": lambda: self.memory.is_loaded,
+            "dimension": lambda: self.memory.model.dimension,
+            "encode": self.batcher.encode,
+            "retrieve": self._retrieve,
+            "search": self._search,
+            "search_by_vector": self.memory.search_by_vector,
+            "add": self._add,
+            "import_batch": self._import_batch,
+            "enqueue": self._enqueue,
+            "flush": self.memory.ingest.flush,
+            "delete_documents": self.memory.delete_documents,
+            "delete": self.memory.delete,
+            "save": self.memory.save,
+            "compact": self.memory.compact,
+            "list_sessions": self.memory.list_sessions,
+            "documents": self.memory.documents,
+            "vectors": self.memory.vectors,
+            "size": self.memory.size,
+            "store_snapshot": self._store_snapshot,
+            "forgotten_since": self._forgotten_since,
+        }
+        self._listener = None
+        self._forget_lock = threading.Lock()
+        self._forget_seq = 0
+        self._forgotten: Dict[str, int] = {}   # session_id -> sequence number of its latest delete
+        self.memory.on_forget.append(self._record_forget)
+
+    def _record_forget(self, session_id: str):
+        with self._forget_lock:
+            self._forget_seq += 1
+            self._forgotten[session_id] = self._forget_seq
+
+    def _forgotten_since(self, seq: int):
+        """(current sequence, sessions deleted from after `seq`), read together."""
+        with self._forget_lock:
+            return self._forget_seq, [session_id for session_id, forgotten in self._forgotten.items() if forgotten > seq]
+
+    def _store_snapshot(self, session_id: str, create: bool = True):
+        """(serialized index, docstore dict, index_to_docstore_id) of a shard, or None if it does not exist."""
+        self.memory.ingest.flush(session_id)
+        store = self.memory.get_store(session_id, create)
+        if store is None:
+            return None
+        with self.memory.locks.read(session_id):
+            return faiss.serialize_index(store.index), dict(store.docstore._dict), dict(store.index_to_docstore_id)
+
+    def _retrieve(self, query: str, k: int, session_id: str) -> RetrievalContext:
+        ctx = RetrievalContext(query=query, session_id=session_id, k=k)
+        with ctx.timed("embed"):
+            ctx.vector = self.batcher.encode([query])[0]
+        with ctx.timed("search"):
+            ctx.docs, ctx.vectors = self.memory.search_with_vectors(ctx.vector, k=k, session_id=session_id)
+        return ctx
+
+    def _search(self, query: str, k: int, session_id: str):
+        return self.memory.search_by_vector(self.batcher.encode([query])[0], k=k, session_id=session_id)
+
+    def _add(self, texts, session_id: str, metadatas=None, vectors=None, dedup: bool = True,
+             dedup_embeddings: bool = False):
+        texts = list(texts)
+        if vectors is None:
+            vectors = self.batcher.encode(texts)
+        return self.memory.add(texts, session_id, metadatas=metadatas, vectors=vectors, dedup=dedup,
+                               dedup_embeddings=dedup_embeddings)
+
+    def _import_batch(self, texts: List[str], session_id: str, metadata: dict, first_chunk: int = 0):
+        self.memory.import_batch(texts, session_id, metadata, first_chunk, vectors=self.batcher.encode(texts))
+
+    def _enqueue(self, session_id: str, text: str, metadata: Optional[dict] = None):
+        # Returns once queued (blocking only under backpressure); the write lands in the next batch
+        self.memory.enqueue(session_id, text, metadata)
+
+    def serve_forever(self):
+        if os.path.exists(self.address):
+            os.unlink(self.address)  # stale socket from a previous run
+        self._listener = Listener(self.address, family="AF_UNIX", authkey=self.authkey)
+        os.chmod(self.address, 0o600)
+        print(f"[*] Index service listening on {self.address}")
+        try:
+            while True:
+                try:
+                    conn = self._listener.accept()
+                except AuthenticationError:
+                    continue
+                except OSError:
+                    if self._listener is None:
+                        return  # closed by shutdown()
+                    raise
+                threading.Thread(target=self._serve, args=(conn,), name="lc_core-index-conn", daemon=True).start()
+        finally:
+            self.shutdown()
+
+    def _serve(self, conn):
+        try:
+            while True:
+                method, args, kwargs = conn.recv()
+                handler = self.handlers.get(method)
+                try:
+                    if handler is None:
+                        raise AttributeError(f"index service has no method {method!r}")
+                    result = handler(*args, **kwargs)
+                except Exception as e:
+                    conn.send((False, e, self._forget_seq))
+                else:
+                    conn.send((True, result, self._forget_seq))
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+    def shutdown(self):
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.close()
+            self.memory.ingest.close()
+
+
+class _RemoteIngest:
+    """Stands in for VectorStoreMemory.ingest: flushes the service's write-behind queue."""
+
+    def __init__(self, remote: "RemoteMemory"):
+        self.remote = remote
+
+    def flush(self, session_id: Optional[str] = None):
+        self.remote._call("flush", session_id)
+
+    def close(self, timeout: Optional[float] = None):
+        pass  # queued writes belong to the service, which flushes them when it shuts down
+
+
+class _RemoteEmbedding(Embeddings):
+    """Embeddings interface over the service's batched encoder."""
+
+    def __init__(self, remote: "RemoteMemory"):
+        self.remote = remote
+        self._dimension = None
+
+    @property
+    def dimension(self) -> int:
+        if self._dimension is None:
+            self._dimension = self.remote._call("dimension")
+        return self._dimension
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return self.remote._call("encode", list(texts))
+
+    def embed_documents(self, texts):
+        return self.encode(texts).tolist()
+
+    def embed_query(self, text):
+        return self.encode([text])[0].tolist()
+
+
+class RemoteMemory:
+    """
+    VectorStoreMemory's interface, served by an IndexServer in another
+    process. Each thread keeps its own connection. A write queued by any
+    worker is visible to every worker's next search of that session, since
+    the service flushes a session's queue before searching it.
+
+    on_forget callbacks fire for deletes made by any worker: each reply
+    carries the service's forget sequence, and the first call after it moves
+    runs the callbacks for the sessions forgotten since (before returning).
+
+    Differences from the in-process memory: enqueue()'s Future resolves
+    (to None) once the service has queued the write; get_store() returns a
+    read-only snapshot of the shard, so writes to it never reach the service.
+    """
+
+    def __init__(self, address: str = INDEX_SERVICE_ADDRESS, authkey: bytes = INDEX_SERVICE_AUTHKEY,
+                 connect_timeout: float = INDEX_SERVICE_CONNECT_TIMEOUT):
+        self.address = address
+        self.authkey = authkey
+        self.connect_timeout = connect_timeout
+        self._local = threading.local()
+        self.model = _RemoteEmbedding(self)
+        self.ingest = _RemoteIngest(self)
+        self.on_forget: List[Callable[[str], None]] = []
+        self._loaded = False
+        self._forget_lock = threading.Lock()
+        self._forget_seq = 0   # service's forget sequence as of our last sync
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # The service may still be starting (loading the model); keep trying until the timeout
+            deadline = time.monotonic() + self.connect_timeout
+            while True:
+                try:
+                    conn = Client(self.address, family="AF_UNIX", authkey=self.authkey)
+                    break
+                except (FileNotFoundError, ConnectionRefusedError):
+                    if time.monotonic() >= deadline:
+                        raise
+                    time.sleep(0.1)
+            self._local.conn = conn
+        return conn
+
+    def _request(self, method: str, *args, **kwargs):
+        conn = self._connection()
+        try:
+            conn.send((method, args, kwargs))
+            ok, result, forget_seq = conn.recv()
+        except (EOFError, OSError):
+            # Not retried: the call may have been applied. The next call reconnects
+            self._local.conn = None
+            conn.close()
+            raise
+        return ok, result, forget_seq
+
+    def _call(self, method: str, *args, **kwargs):
+        ok, result, forget_seq = self._request(method, *args, **kwargs)
+        if forget_seq != self._forget_seq:
+            self._sync_forgets(forget_seq)
+        if not ok:
+            raise result
+        return result
+
+    def _sync_forgets(self, forget_seq: int):
+        """Run on_forget for every session any worker deleted from since the last sync."""
+        with self._forget_lock:
+            if forget_seq == self._forget_seq:
+                return
+            # A lower sequence means the service restarted and counts from zero again
+            since = self._forget_seq if forget_seq > self._forget_seq else 0
+            ok, result, _ = self._request("forgotten_since", since)
+            if not ok:
+                raise result
+            latest, sessions = result
+            for session_id in sessions:
+                self._forgot(session_id)
+            self._forget_seq = latest
+
+    # --- VectorStoreMemory interface ---
+
+    @property
+    def is_loaded(self) -> bool:
+        if not self._loaded:
+            try:
+                self._loaded = self._call("is_loaded")
+            except OSError:
+                return False
+        return self._loaded
+
+    def load(self):
+        self._call("load")
+        self._loaded = True
+
+    def get_store(self, session_id: str, create: bool = True, writable: bool = False):
+        """A read-only snapshot of the session shard; add to the session with add() instead."""
+        if writable:
+            raise RuntimeError("Shards are owned by the index service; write with add() or delete_documents()")
+        from langchain_community.docstore.in_memory import InMemoryDocstore
+        from langchain_community.vectorstores.faiss import FAISS
+
+        snapshot = self._call("store_snapshot", session_id, create)
+        if snapshot is None:
+            return None
+        index, docs, index_to_docstore_id = snapshot
+        return FAISS(
+            embedding_function=self.model,
+            index=configure_search(faiss.deserialize_index(index)),
+            docstore=InMemoryDocstore(docs),
+            index_to_docstore_id=index_to_docstore_id,
+        )
+
+    def list_sessions(self) -> List[str]:
+        return self._call("list_sessions")
+
+    def documents(self, session_id: str):
+        return self._call("documents", session_id)
+
+    def vectors(self, session_id: str, doc_ids: List[str]) -> Optional[np.ndarray]:
+        return self._call("vectors", session_id, list(doc_ids))
+
+    def size(self, session_id: Optional[str] = None) -> int:
+        return self._call("size", session_id)
+
+    def add(self, texts, session_id: str, metadatas: Optional[List[dict]] = None, vectors=None,
+            dedup: bool = True, dedup_embeddings: bool = False) -> List[str]:
+        return self._call("add", list(texts), session_id, metadatas=metadatas, vectors=vectors, dedup=dedup,
+                          dedup_embeddings=dedup_embeddings)
+
+    import_texts = VectorStoreMemory.import_texts
+
+    def import_batch(self, texts: List[str], session_id: str, metadata: dict, first_chunk: int = 0):
+        self._call("import_batch", list(texts), session_id, metadata, first_chunk)
+
+    def enqueue(self, session_id: str, text: str, metadata: Optional[dict] = None) -> Future:
+        self._call("enqueue", session_id, text, metadata)
+        future = Future()
+        future.set_result(None)
+        return future
+
+    # The service's forget sequence moves with these, so _call runs on_forget before returning
+
+    def delete_documents(self, session_id: str, ids: List[str]) -> int:
+        return self._call("delete_documents", session_id, ids)
+
+    def delete(self, session_id: str) -> bool:
+        return self._call("delete", session_id)
+
+    def _forgot(self, session_id: str):
+        for callback in self.on_forget:
+            callback(session_id)
+
+    def search(self, query: str, k: int, session_id: str):
+        return self._call("search", query, k, session_id)
+
+    def search_by_vector(self, vector, k: int, session_id: str):
+        return self._call("search_by_vector", np.asarray(vector, dtype=np.float32), k, session_id)
+
+    def retrieve(self, query: str, k: int, session_id: str) -> RetrievalContext:
+        return self._call("retrieve", query, k, session_id)
+
+    def save(self):
+        self._call("save")
+
+    def compact(self, session_id: Optional[str] = None):
+        self._call("compact", session_id)
+
+
+def main():
+    server = IndexServer()
+    print("[*] Loading embedding model and session shards...")
+    server.memory.load()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.memory.save()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# lc_core/ingest_queue.py
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+# session_id -> [(text, metadata), ...]  ->  session_id -> [doc_id, ...]
+Sink = Callable[[Dict[str, List[Tuple[str, dict]]]], Dict[str, List[str]]]
+
+
+class IngestQueue:
+    """
+    Write-behind buffer for memory writes.
+
+    submit() returns at once with a Future for the new document ID. A
+    background worker hands pending writes to `sink` in micro-batches, as
+    soon as `max_batch` texts are waiting or the oldest has waited
+    `max_delay` seconds. Producers block (backpressure) while `max_pending`
+    writes are queued. flush(session_id) writes a session's pending texts
+    synchronously, so a reader sees its own session's latest turns.
+    """
+
+    def __init__(self, sink: Sink, max_batch: int = 32, max_delay: float = 0.05, max_pending: int = 1024):
+        self.sink = sink
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+
+        # session_id -> [(text, metadata, future, queued_at), ...], oldest first
+        self._pending: Dict[str, List[Tuple[str, dict, Future, float]]] = {}
+        self._count = 0
+        self._oldest: Optional[float] = None
+        self._inflight = set()                 # sessions inside a running sink call
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()    # one sink call at a time, in submission order
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+
+    def __len__(self):
+        return self._count
+
+    def submit(self, session_id: str, text: str, metadata: Optional[dict] = None,
+               timeout: Optional[float] = None) -> Future:
+        """Queue a write; blocks while the queue is full, raising queue.Full after `timeout`."""
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("ingest queue is closed")
+            if not self._cond.wait_for(lambda: self._count < self.max_pending, timeout=timeout):
+                raise queue.Full(f"{self._count} memory writes pending")
+            now = time.monotonic()
+            self._pending.setdefault(session_id, []).append((text, metadata or {}, future, now))
+            self._count += 1
+            if self._oldest is None:
+                self._oldest = now
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="lc_core-ingest", daemon=True)
+                self._worker.start()
+            self._cond.notify_all()
+        return future
+
+    def has_pending(self, session_id: str) -> bool:
+        return session_id in self._pending or session_id in self._inflight
+
+    def flush(self, session_id: Optional[str] = None):
+        """Write pending texts now: one session's, or everything when session_id is None."""
+        if session_id is not None and not self.has_pending(session_id):
+            return
+        with self._flush_lock:
+            # Holding the flush lock means any in-flight batch has been written
+            if session_id is not None:
+                self._write(self._take(session_id))
+                return
+            while True:
+                batch = self._take(limit=self.max_batch)
+                if not batch:
+                    return
+                self._write(batch)
+
+    def close(self, timeout: Optional[float] = None):
+        """Stop accepting writes, flush what is queued and stop the worker."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout)
+        self.flush()
+
+    # --- Worker ---
+
+    def _take(self, session_id: Optional[str] = None, limit: Optional[int] = None) -> Dict[str, list]:
+        """
+        Remove and return one session's pending writes, or up to `limit`
+        writes (all when None) across sessions, oldest session first.
+        """
+        with self._cond:
+            if session_id is not None:
+                batch = {session_id: self._pending.pop(session_id)} if session_id in self._pending else {}
+            elif limit is None:
+                batch, self._pending = self._pending, {}
+            else:
+                batch, room = {}, limit
+                for sid in list(self._pending):
+                    if not room:
+                        break
+                    items = self._pending[sid]
+                    batch[sid], rest = items[:room], items[room:]
+                    room -= len(batch[sid])
+                    if rest:
+                        self._pending[sid] = rest
+                    else:
+                        del self._pending[sid]
+            self._count -= sum(len(items) for items in batch.values())
+            # What is left keeps its own age, so it is not held back a full max_delay again
+            self._oldest = min((items[0][3] for items in self._pending.values()), default=None)
+            self._inflight.update(batch)
+            self._cond.notify_all()
+        return batch
+
+    def _write(self, batch: Dict[str, list]):
+        if not batch:
+            return
+        try:
+            ids = self.sink({sid: [(text, metadata) for text, metadata, _, _ in items] for sid, items in batch.items()})
+        except Exception as e:
+            print(f"[!] Memory write-back failed: {e}")
+            for items in batch.values():
+                for _, _, future, _ in items:
+                    future.set_exception(e)
+        else:
+            for sid, items in batch.items():
+                for (_, _, future, _), doc_id in zip(items, ids.get(sid, [])):
+                    future.set_result(doc_id)
+        finally:
+            with self._cond:
+                self._inflight.difference_update(batch)
+
+    def _due(self) -> Optional[float]:
+        """Seconds until the next batch is due (0 = now), or None when idle."""
+        if not self._count:
+            return None
+        if self._count >= self.max_batch or self._closed:
+            return 0.0
+        return max(0.0, self._oldest + self.max_delay - time.monotonic())
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    due = self._due()
+                    if due == 0.0:
+                        break
+                    if due is None and self._closed:
+                        return
+                    self._cond.wait(due)
+            with self._flush_lock:
+                self._write(self._take(limit=self.max_batch))
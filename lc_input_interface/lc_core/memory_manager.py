@@ -1,55 +1,547 @@
 # lc_core/memory_manager.py
 
 import os
-import faiss
-from langchain_community.vectorstores.faiss import FAISS
+import shutil
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional
+from urllib.parse import quote, unquote
+from uuid import uuid4
+
+import numpy as np
 from langchain_core.documents import Document
 from .bge_embedding import BGEEmbedding
+from .dedup import Deduplicator, merge_metadata
+from .embedding_cache import CachedEmbedding
+from .index_factory import initial_index, should_train, stored_vectors, train_from
+from .ingest_queue import IngestQueue
+from .metrics import METRICS, span
+from .persistence import SessionStorage, apply_entry, writable_index
+from .retrieval import RetrievalContext
+from .session_registry import SessionRegistry
 from .config import (
+    DEDUP_ENABLED,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_SIZE,
     EMBEDDING_MODEL_NAME,
+    EMBEDDING_NORMALIZE,
+    FAISS_INDEX_FACTORY,
     FAISS_INDEX_PATH,
+    FAISS_MMAP_READ_ONLY,
+    IMPORT_BATCH_SIZE,
+    INGEST_BATCH_SIZE,
+    INGEST_MAX_DELAY,
+    INGEST_MAX_PENDING,
     USE_DISK_PERSISTENCE,
+    WAL_COMPACT_ENTRIES,
 )
 
+if TYPE_CHECKING:
+    from langchain_community.vectorstores.faiss import FAISS
+
+# Per-session shards live under <vectorstore dir>/sessions/<quoted session_id>/
+SESSIONS_DIRNAME = "sessions"
+
+_dedup_skipped = METRICS.counter("lc_core_dedup_skipped_total", "Texts not added because they duplicate a stored document")
+
+
 class VectorStoreMemory:
+    """
+    Session-partitioned vector memory.
+
+    Each session_id gets its own FAISS index, so a search only ever scans the
+    vectors belonging to the session being queried. Each shard is guarded by
+    its own reader-writer lock (see SessionRegistry): searches of a session
+    run in parallel, writes to it are exclusive, and sessions do not contend.
+
+    Construction is cheap: the embedding model and the saved shards are
+    loaded on first use (or by load(), e.g. from a warm-up thread).
+    """
+
     def __init__(self):
-        self.model = BGEEmbedding(EMBEDDING_MODEL_NAME)
-
-        if USE_DISK_PERSISTENCE and os.path.exists(FAISS_INDEX_PATH):
-            self.vectorstore = FAISS.load_local(
-                folder_path=os.path.dirname(FAISS_INDEX_PATH),
-                embeddings=self.model,
-                index_name=os.path.basename(FAISS_INDEX_PATH).split(".")[0],
-                allow_dangerous_deserialization=True
-            )
+        self.root = os.path.dirname(FAISS_INDEX_PATH)
+        self.index_name = os.path.basename(FAISS_INDEX_PATH).split(".")[0]
+        self._model: Optional[CachedEmbedding] = None
+        self._sessions: Optional[Dict[str, "FAISS"]] = None
+        self._load_lock = threading.RLock()
+        # Per-session reader-writer locks around FAISS search and mutation; encoding runs outside them
+        self.locks = SessionRegistry()
+        self._save_lock = threading.Lock()
+        self._storages: Dict[str, SessionStorage] = {}
+        self._pending: Dict[str, list] = {}      # unsaved (entry, vectors) per session
+        self._rows: Dict[str, int] = {}          # ntotal as of the last journaled change
+        self._mapped = set()                     # sessions still backed by a read-only mmap
+        self._checkpoint_needed = set()
+        self._deleted = set()
+        self._dedup: Dict[str, Deduplicator] = {}   # built per session on its first add
+        # Called with a session ID after documents are removed from it (e.g. to drop cached answers)
+        self.on_forget: List[Callable[[str], None]] = []
+        # Write-behind queue for enqueue(); flushed before reads and saves of the same session
+        self.ingest = IngestQueue(
+            self._ingest_batches,
+            max_batch=INGEST_BATCH_SIZE,
+            max_delay=INGEST_MAX_DELAY,
+            max_pending=INGEST_MAX_PENDING,
+        )
+
+    # --- Lazy loading ---
+
+    @property
+    def model(self) -> CachedEmbedding:
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    self._model = CachedEmbedding(
+                        BGEEmbedding(EMBEDDING_MODEL_NAME, batch_size=EMBEDDING_BATCH_SIZE, normalize=EMBEDDING_NORMALIZE),
+                        max_entries=EMBEDDING_CACHE_SIZE,
+                        disk_path=EMBEDDING_CACHE_PATH,
+                    )
+        return self._model
+
+    @property
+    def sessions(self) -> Dict[str, "FAISS"]:
+        if self._sessions is None:
+            with self._load_lock:
+                if self._sessions is None:
+                    sessions: Dict[str, "FAISS"] = {}
+                    if USE_DISK_PERSISTENCE:
+                        if os.path.isdir(self._sessions_dir()):
+                            self._load_sessions(sessions)
+                        elif os.path.exists(FAISS_INDEX_PATH):
+                            self._migrate_global_index(sessions)
+                    self._sessions = sessions
+        return self._sessions
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None and self._sessions is not None
+
+    def load(self):
+        """Load the embedding model and all saved session shards now."""
+        self.model
+        self.sessions
+
+    # --- Session shards ---
+
+    def _sessions_dir(self) -> str:
+        return os.path.join(self.root, SESSIONS_DIRNAME)
+
+    def _session_dir(self, session_id: str) -> str:
+        return os.path.join(self._sessions_dir(), quote(session_id, safe=""))
+
+    def _new_store(self) -> "FAISS":
+        from langchain_community.docstore.in_memory import InMemoryDocstore
+        from langchain_community.vectorstores.faiss import FAISS
+
+        return FAISS(
+            embedding_function=self.model,
+            index=initial_index(self.model.dimension),
+            docstore=InMemoryDocstore(),
+            index_to_docstore_id={},
+        )
+
+    def _storage(self, session_id: str) -> SessionStorage:
+        storage = self._storages.get(session_id)
+        if storage is None:
+            storage = self._storages[session_id] = SessionStorage(self._session_dir(session_id), self.index_name)
+        return storage
+
+    def _writable(self, session_id: str) -> "FAISS":
+        """
+        Return the session shard, first copying a memory-mapped base into
+        owned memory. Call with the session's write lock held.
+        """
+        if FAISS_MMAP_READ_ONLY:
+            raise RuntimeError("Vectorstore is opened read-only (FAISS_MMAP_READ_ONLY); writes are disabled")
+        store = self.sessions[session_id]
+        if session_id in self._mapped:
+            store.index = writable_index(store.index)
+            self._mapped.discard(session_id)
+        return store
+
+    def get_store(self, session_id: str, create: bool = True, writable: bool = False) -> Optional["FAISS"]:
+        """
+        Return a session shard, creating it if `create`. A saved shard is
+        handed out as loaded, possibly still memory-mapped: pass `writable`
+        to write to it directly (then call mark_dirty()), which copies a
+        mapped index into owned memory and is refused with FAISS_MMAP_READ_ONLY.
+        """
+        if session_id not in self.sessions:
+            if not create:
+                return None
+            if FAISS_MMAP_READ_ONLY:
+                raise RuntimeError("Vectorstore is opened read-only (FAISS_MMAP_READ_ONLY); cannot create sessions")
+            with self._load_lock:
+                # Checked again so two threads creating the same session share one shard
+                if session_id not in self.sessions:
+                    # A deleted session's directory stays queued for removal: save() wipes it
+                    # before checkpointing the new shard, so none of the old data comes back
+                    self.sessions[session_id] = self._new_store()
+                    self._rows[session_id] = 0
+        if writable:
+            with self.locks.write(session_id):
+                return self._writable(session_id)
+        with self.locks.read(session_id):
+            return self.sessions.get(session_id)
+
+    def list_sessions(self) -> List[str]:
+        return sorted(self.sessions)
+
+    def size(self, session_id: Optional[str] = None) -> int:
+        if session_id is not None:
+            store = self.sessions.get(session_id)
+            return store.index.ntotal if store else 0
+        return sum(store.index.ntotal for store in list(self.sessions.values()))
+
+    # --- Public API ---
+
+    def add(self, texts, session_id: str, metadatas: Optional[List[dict]] = None, vectors=None,
+            dedup: bool = True, dedup_embeddings: bool = False) -> List[str]:
+        """
+        Embed and add `texts`, returning a document ID per text. With
+        DEDUP_ENABLED (and `dedup`), a text that duplicates a document of the
+        session (see Deduplicator) is skipped: its metadata is merged into
+        that document, whose ID is returned in its place. Only exact and
+        SimHash repeats count unless `dedup_embeddings` is set (as by
+        import_texts): short conversation turns such as "I attack again"
+        are legitimately close in embedding space.
+        """
+        texts = list(texts)
+        with span("memory.add", size=len(texts)):
+            print(f"[+] Adding {len(texts)} texts to vectorstore for session: {session_id}")
+            self.get_store(session_id)
+            if vectors is None:
+                vectors = self.model.encode(texts)
+            vectors = np.asarray(vectors, dtype=np.float32)
+            metadatas = [{**metadata, "session_id": session_id} for metadata in metadatas or [{} for _ in texts]]
+            with self.locks.write(session_id):
+                store = self._writable(session_id)
+                ids, keep, duplicates = self._dedupe(session_id, store, texts, vectors if dedup_embeddings else None,
+                                                     metadatas, dedup)
+                if keep:
+                    entry = {
+                        "op": "add",
+                        "ids": [ids[i] for i in keep],
+                        "texts": [texts[i] for i in keep],
+                        "metadatas": [metadatas[i] for i in keep],
+                    }
+                    kept = vectors if len(keep) == len(texts) else vectors[keep]
+                    # Pre-computed float32 vectors go straight into the FAISS index, no list round trip
+                    apply_entry(store, entry, kept)
+                    self._journal(session_id, entry, kept)
+                    if should_train(store.index):
+                        # Train-on-ingest: enough vectors buffered to train the configured index type
+                        print(f"[*] Training {FAISS_INDEX_FACTORY} index for session {session_id} on {store.index.ntotal} vectors")
+                        store.index = train_from(store.index)
+                        self._checkpoint_needed.add(session_id)
+                if duplicates:
+                    self._merge_duplicates(session_id, store, duplicates)
+            if duplicates:
+                print(f"[=] Skipped {len(duplicates)} duplicate texts; metadata merged into the stored entries")
+            print(f"[✓] Added to vectorstore. Session total: {store.index.ntotal}")
+            return ids
+
+    def _dedupe(self, session_id: str, store: "FAISS", texts: List[str], vectors: Optional[np.ndarray],
+                metadatas: List[dict], dedup_enabled: bool = True):
+        """
+        Assign IDs; returns (ids, positions to add, (existing ID, metadata) per
+        duplicate). Without `vectors` the embedding check is skipped.
+        """
+        ids = [str(uuid4()) for _ in texts]
+        if not DEDUP_ENABLED or not dedup_enabled:
+            self._dedup.pop(session_id, None)   # unchecked texts; rebuilt from the shard on the next add
+            return ids, list(range(len(texts))), []
+        dedup = self._dedup.get(session_id)
+        if dedup is None:
+            dedup = self._dedup[session_id] = Deduplicator.from_store(store)
+        keep, duplicates = [], []
+        for i, found in enumerate(dedup.check(texts, vectors, ids)):
+            if found is None:
+                keep.append(i)
+            else:
+                ids[i] = found[0]
+                duplicates.append((found[0], metadatas[i]))
+                _dedup_skipped.inc(reason=found[1])
+        return ids, keep, duplicates
+
+    def _merge_duplicates(self, session_id: str, store: "FAISS", duplicates: List[tuple]):
+        merged: Dict[str, dict] = {}
+        for doc_id, metadata in duplicates:
+            if doc_id not in merged:
+                merged[doc_id] = store.docstore.search(doc_id).metadata
+            merged[doc_id] = merge_metadata(merged[doc_id], metadata)
+        entry = {"op": "merge", "ids": list(merged), "metadatas": list(merged.values())}
+        apply_entry(store, entry, None)
+        self._journal(session_id, entry, None)
+
+    def import_texts(self, texts: Iterable[str], session_id: str, metadata: Optional[dict] = None,
+                     batch_size: int = IMPORT_BATCH_SIZE, progress: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Embed and add a stream of texts in batches of `batch_size`, holding
+        one batch at a time. Bypasses the ingest queue. Each batch is written
+        to the session's log as soon as it is added, so unsaved vectors never
+        pile up. Each text gets `metadata` plus its position as "chunk".
+        `progress` is called with the running count after every batch.
+        Returns the number added.
+        """
+        metadata = metadata or {}
+        batch, added = [], 0
+        for text in texts:
+            batch.append(text)
+            if len(batch) >= batch_size:
+                self.import_batch(batch, session_id, metadata, added)
+                added += len(batch)
+                batch = []
+                if progress:
+                    progress(added)
+        if batch:
+            self.import_batch(batch, session_id, metadata, added)
+            added += len(batch)
+            if progress:
+                progress(added)
+        return added
+
+    def import_batch(self, texts: List[str], session_id: str, metadata: dict, first_chunk: int = 0, vectors=None):
+        """Add one import_texts() batch, numbering chunks from `first_chunk`, and write it to the log."""
+        self.add(texts, session_id, metadatas=[{**metadata, "chunk": first_chunk + i} for i in range(len(texts))],
+                 vectors=vectors, dedup_embeddings=True)
+        if USE_DISK_PERSISTENCE and not FAISS_MMAP_READ_ONLY:
+            with self._save_lock:
+                self._save_session(session_id)
         else:
-            # Bootstrap vectorstore using dummy doc, then remove it by ID
-            dummy_doc = Document(
-                page_content="bootstrap",
-                metadata={"session_id": "__bootstrap__"}
+            # Nothing will ever be saved
+            self._pending.pop(session_id, None)
+
+    def enqueue(self, session_id: str, text: str, metadata: Optional[dict] = None):
+        """Queue a text for write-behind ingestion; returns a Future for its document ID."""
+        return self.ingest.submit(session_id, text, metadata)
+
+    def _ingest_batches(self, batches: Dict[str, list]) -> Dict[str, List[str]]:
+        # One encode call for every queued text, whichever session it belongs to
+        texts = [text for items in batches.values() for text, _ in items]
+        vectors = self.model.encode(texts)
+        ids, start = {}, 0
+        for session_id, items in batches.items():
+            end = start + len(items)
+            ids[session_id] = self.add(
+                [text for text, _ in items], session_id,
+                metadatas=[metadata for _, metadata in items],
+                vectors=vectors[start:end],
             )
-            self.vectorstore = FAISS.from_documents([dummy_doc], embedding=self.model)
-            ids = self.vectorstore.add_documents([dummy_doc])
-            self.vectorstore.delete(ids)
+            start = end
+        return ids
+
+    def delete_documents(self, session_id: str, ids: List[str]) -> int:
+        """Remove individual documents from a session shard; returns how many were removed."""
+        self.ingest.flush(session_id)
+        if session_id not in self.sessions:
+            return 0
+        with self.locks.write(session_id):
+            store = self._writable(session_id)
+            live = set(store.index_to_docstore_id.values())
+            entry = {"op": "delete", "ids": [doc_id for doc_id in ids if doc_id in live]}
+            if not entry["ids"]:
+                return 0
+            apply_entry(store, entry, None)
+            self._journal(session_id, entry, None)
+            self._dedup.pop(session_id, None)   # rebuilt from what is left on the next add
+        self._forgot(session_id)
+        return len(entry["ids"])
 
-    def add(self, texts, session_id: str):
-        print(f"[+] Adding {len(texts)} texts to vectorstore for session: {session_id}")
-        docs = [Document(page_content=text, metadata={"session_id": session_id}) for text in texts]
-        self.vectorstore.add_documents(docs)
-        print(f"[✓] Added to vectorstore. Current total: {self.vectorstore.index.ntotal}")
+    def _forgot(self, session_id: str):
+        for callback in self.on_forget:
+            callback(session_id)
 
+    def _journal(self, session_id: str, entry: dict, vectors):
+        self._pending.setdefault(session_id, []).append((entry, vectors))
+        self._rows[session_id] = self.sessions[session_id].index.ntotal
 
+    def documents(self, session_id: str) -> List[Document]:
+        """The session's documents, oldest first."""
+        self.ingest.flush(session_id)
+        store = self.sessions.get(session_id)
+        if store is None:
+            return []
+        with self.locks.read(session_id):
+            docs = [store.docstore.search(doc_id) for _, doc_id in sorted(store.index_to_docstore_id.items())]
+        return [doc for doc in docs if isinstance(doc, Document)]
+
+    def vectors(self, session_id: str, doc_ids: List[str]) -> Optional[np.ndarray]:
+        """
+        The stored vectors of documents, in `doc_ids` order (approximate for
+        compressed codes); None if one is gone or the index cannot
+        reconstruct its rows.
+        """
+        self.ingest.flush(session_id)
+        store = self.sessions.get(session_id)
+        if store is None:
+            return None
+        with self.locks.read(session_id):
+            rows = {doc_id: row for row, doc_id in store.index_to_docstore_id.items()}
+            if any(doc_id not in rows for doc_id in doc_ids):
+                return None
+            return stored_vectors(store.index, [rows[doc_id] for doc_id in doc_ids])
+
+    @span("memory.search")
     def search(self, query: str, k: int, session_id: str):
-        return self.vectorstore.similarity_search(query, k=k, filter={"session_id": session_id})
+        self.ingest.flush(session_id)
+        store = self.sessions.get(session_id)
+        if store is None or store.index.ntotal == 0:
+            return []
+        vector = self.model.encode([query])[0]
+        with self.locks.read(session_id):
+            return store.similarity_search_by_vector(vector, k=k)
+
+    @span("memory.search")
+    def search_by_vector(self, vector, k: int, session_id: str):
+        self.ingest.flush(session_id)
+        store = self.sessions.get(session_id)
+        if store is None or store.index.ntotal == 0:
+            return []
+        with self.locks.read(session_id):
+            return store.similarity_search_by_vector(vector, k=k)
+
+    @span("memory.search")
+    def search_with_vectors(self, vector, k: int, session_id: str):
+        """
+        search_by_vector() plus the hits' vectors, read back from the index
+        rather than re-encoded: (docs, (len(docs), d) array or None).
+        """
+        self.ingest.flush(session_id)
+        store = self.sessions.get(session_id)
+        if store is None or store.index.ntotal == 0:
+            return [], None
+        with self.locks.read(session_id):
+            _, found = store.index.search(np.asarray([vector], dtype=np.float32), k)
+            rows = [int(row) for row in found[0] if row in store.index_to_docstore_id]
+            docs = [store.docstore.search(store.index_to_docstore_id[row]) for row in rows]
+            return docs, stored_vectors(store.index, rows)
+
+    def retrieve(self, query: str, k: int, session_id: str) -> RetrievalContext:
+        """Embed `query` once and search the session shard, recording stage timings."""
+        ctx = RetrievalContext(query=query, session_id=session_id, k=k)
+        with ctx.timed("embed"):
+            ctx.vector = self.model.encode([query])[0]
+        with ctx.timed("search"):
+            ctx.docs, ctx.vectors = self.search_with_vectors(ctx.vector, k=k, session_id=session_id)
+        return ctx
+
+    def mark_dirty(self, session_id: str):
+        """Flag a session shard as modified by a caller writing to get_store(writable=True) directly."""
+        self._checkpoint_needed.add(session_id)
 
-    def delete(self, session_id: str):
-        # No-op until we wire in proper ID tracking
-        # Can implement if/when we need to clear sessions programmatically
-        pass
+    def delete(self, session_id: str) -> bool:
+        self.ingest.flush(session_id)
+        with self._save_lock, self.locks.write(session_id):
+            store = self.sessions.pop(session_id, None)
+            self._pending.pop(session_id, None)
+            self._checkpoint_needed.discard(session_id)
+            self._mapped.discard(session_id)
+            self._rows.pop(session_id, None)
+            self._storages.pop(session_id, None)
+            self._dedup.pop(session_id, None)
+            on_disk = USE_DISK_PERSISTENCE and os.path.isdir(self._session_dir(session_id))
+            if on_disk:
+                # Removed from disk on the next save(), in line with explicit persistence
+                self._deleted.add(session_id)
+        self._forgot(session_id)
+        return on_disk or store is not None
 
+    @span("memory.save")
     def save(self):
-        if not USE_DISK_PERSISTENCE:
+        """
+        Persist changes since the last save. New adds/deletes are appended to
+        each session's write-ahead log; a session is checkpointed (rewritten
+        and atomically swapped in) when its log exceeds WAL_COMPACT_ENTRIES,
+        when it is new, or when it was written to outside add()/delete_documents().
+        """
+        if not USE_DISK_PERSISTENCE or FAISS_MMAP_READ_ONLY:
             return
-        print(f"[*] Vectorstore index size: {self.vectorstore.index.ntotal} entries")
-        self.vectorstore.save_local(folder_path=os.path.dirname(FAISS_INDEX_PATH))
+        self.ingest.flush()
+        with self._save_lock:
+            self._save()
+
+    def _save(self):
+        print(f"[*] Vectorstore index size: {self.size()} entries across {len(self.sessions)} sessions")
+        for session_id in self._deleted:
+            shutil.rmtree(self._session_dir(session_id), ignore_errors=True)
+        self._deleted.clear()
+
+        for session_id in list(self.sessions):
+            self._save_session(session_id)
         print("[✓] Save complete.")
+
+    def _save_session(self, session_id: str):
+        """Append a session's unsaved changes to its log, or checkpoint it. Call with the save lock held."""
+        if session_id in self._deleted:
+            shutil.rmtree(self._session_dir(session_id), ignore_errors=True)
+            self._deleted.discard(session_id)
+        # A read lock: searches of the session carry on while it is written out, writes wait
+        with self.locks.read(session_id):
+            store = self.sessions.get(session_id)
+            if store is None:
+                return
+            storage = self._storage(session_id)
+            pending = self._pending.pop(session_id, [])
+            out_of_band = store.index.ntotal != self._rows.get(session_id, store.index.ntotal)
+            if (session_id in self._checkpoint_needed or out_of_band
+                    or storage.wal_entries + len(pending) > WAL_COMPACT_ENTRIES
+                    or not storage.exists()):
+                storage.checkpoint(store)
+            elif pending:
+                storage.append(pending)
+            self._rows[session_id] = store.index.ntotal
+            self._checkpoint_needed.discard(session_id)
+
+    def compact(self, session_id: Optional[str] = None):
+        """Fold the write-ahead log into a fresh checkpoint for one or all sessions."""
+        if not USE_DISK_PERSISTENCE:
+            return
+        self._checkpoint_needed.update([session_id] if session_id else self.sessions)
+        self.save()
+
+    # --- Loading ---
+
+    def _load_sessions(self, sessions: Dict[str, "FAISS"]):
+        for entry in sorted(os.listdir(self._sessions_dir())):
+            session_id = unquote(entry)
+            storage = self._storage(session_id)
+            if not storage.exists():
+                continue
+            store = sessions[session_id] = storage.load(self.model)
+            if storage.wal_entries == 0:
+                # Untouched checkpoint stays memory-mapped until the first write
+                self._mapped.add(session_id)
+            self._rows[session_id] = store.index.ntotal
+
+    def _migrate_global_index(self, sessions: Dict[str, "FAISS"]):
+        """Split a pre-partitioning global index into per-session shards."""
+        from langchain_community.vectorstores.faiss import FAISS
+
+        legacy = FAISS.load_local(
+            folder_path=self.root,
+            embeddings=self.model,
+            index_name=self.index_name,
+            allow_dangerous_deserialization=True
+        )
+        vectors = legacy.index.reconstruct_n(0, legacy.index.ntotal)
+        grouped: Dict[str, list] = {}
+        for row, doc_id in legacy.index_to_docstore_id.items():
+            doc = legacy.docstore.search(doc_id)
+            if not isinstance(doc, Document):
+                continue
+            session_id = doc.metadata.get("session_id")
+            if session_id is None or session_id == "__bootstrap__":
+                continue
+            grouped.setdefault(session_id, []).append((doc_id, doc, vectors[row]))
+
+        for session_id, rows in grouped.items():
+            store = sessions[session_id] = self._new_store()
+            store.add_embeddings(
+                [(doc.page_content, vector) for _, doc, vector in rows],
+                metadatas=[doc.metadata for _, doc, _ in rows],
+                ids=[doc_id for doc_id, _, _ in rows],
+            )
+            self._rows[session_id] = store.index.ntotal
+            self._checkpoint_needed.add(session_id)
+        print(f"[*] Migrated global index into {len(grouped)} session shards")
@@ -0,0 +1,161 @@
+# lc_core/metrics.py
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096)
+
+Labels = Tuple[Tuple[str, str], ...]
+# A collector returns (name, type, help, [(labels, value), ...]) families, read at scrape time
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Tuple[dict, float]]]]]
+
+
+def _labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            lines.extend(f"{self.name}{_labels(key)} {value}" for key, value in sorted(self._values.items()))
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect and three additions under a lock."""
+
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self._series: Dict[Labels, list] = {}   # labels -> [per-bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+        for key, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_labels(key, le)} {cumulative}")
+            cumulative += series[len(self.buckets)]
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_labels(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(key)} {series[-1]}")
+            lines.append(f"{self.name}_count{_labels(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms updated in-process, plus collectors that read
+    existing state (index size, cache stats) only when scraped. render()
+    produces the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self._metrics: Dict[str, object] = {}
+        self._collectors: List[Collector] = []
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._get(name, lambda: Counter(name, help))
+
+    def histogram(self, name: str, help: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._get(name, lambda: Histogram(name, help, buckets))
+
+    def _get(self, name: str, make):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(name, make())
+        return metric
+
+    def add_collector(self, collector: Collector):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                lines.append(f"# collector failed: {e}")
+                continue
+            for name, kind, help, samples in families:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(f"{name}{_labels(tuple(sorted(labels.items())))} {value}" for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+_spans = METRICS.histogram("lc_core_span_seconds", "Wall-clock seconds per traced operation")
+_sizes = METRICS.histogram("lc_core_batch_size", "Items per batched operation", SIZE_BUCKETS)
+_errors = METRICS.counter("lc_core_span_errors_total", "Traced operations that raised")
+_turns = METRICS.counter("lc_core_turns_total", "Completed turns, by whether the response came from the cache")
+
+
+@contextmanager
+def span(name: str, size: Optional[int] = None):
+    """Time a block as `name`; `size` also records the batch size it handled."""
+    if not METRICS.enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        _errors.inc(span=name)
+        raise
+    finally:
+        _spans.observe(time.perf_counter() - start, span=name)
+        if size is not None:
+            _sizes.observe(size, span=name)
+
+
+def observe_turn(ctx):
+    """Record a finished turn's RetrievalContext: per-stage timings, time to first token, cache use."""
+    if not METRICS.enabled:
+        return
+    for stage, seconds in ctx.timings.items():
+        _spans.observe(seconds, span=f"turn.{stage}")
+    if ctx.first_token is not None:
+        _spans.observe(ctx.first_token, span="turn.first_token")
+    _turns.inc(cached=str(ctx.cached).lower())
@@ -0,0 +1,217 @@
+# lc_core/persistence.py
+
+import json
+import os
+import pickle
+import shutil
+from typing import TYPE_CHECKING, List, Optional
+
+import faiss
+import numpy as np
+
+from .index_factory import configure_search, remove_rows
+
+if TYPE_CHECKING:
+    from langchain_community.vectorstores.faiss import FAISS
+
+CURRENT_FILE = "CURRENT"
+
+# IO_FLAG_MMAP_IFC maps flat and IVF codes in place (newer FAISS builds); plain
+# IO_FLAG_MMAP only applies to indexes written with on-disk inverted lists
+MMAP_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+
+
+def _fsync_dir(path: str):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _append(path: str, data: bytes):
+    with open(path, "ab") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class SessionStorage:
+    """
+    On-disk layout for one session shard:
+
+        CURRENT            name of the live checkpoint, swapped by atomic rename
+        base-000001/       LangChain save_local output (index.faiss + index.pkl)
+        wal-000001.jsonl   append-only log of adds/deletes/merges since that checkpoint
+        wal-000001.f32     float32 vectors for the logged adds, in log order
+
+    A save appends only new entries to the log. A checkpoint writes a new
+    base, flips CURRENT, then removes the old base and its log, so a crash at
+    any point leaves either the old or the new checkpoint intact.
+    """
+
+    def __init__(self, folder: str, index_name: str = "index"):
+        self.folder = folder
+        self.index_name = index_name
+        self.wal_entries = 0  # entries in the live log, maintained by load/append/checkpoint
+
+    # --- Layout ---
+
+    def _current(self) -> Optional[str]:
+        path = os.path.join(self.folder, CURRENT_FILE)
+        if os.path.exists(path):
+            with open(path) as f:
+                return f.read().strip()
+        # Layout written before WAL support: a bare save_local in the session folder
+        if os.path.exists(os.path.join(self.folder, f"{self.index_name}.faiss")):
+            return ""
+        return None
+
+    def _generation(self, base: str) -> int:
+        return int(base.split("-")[1]) if base else 0
+
+    def _wal_paths(self, base: Optional[str]):
+        suffix = f"{self._generation(base or ''):06d}"
+        return (
+            os.path.join(self.folder, f"wal-{suffix}.jsonl"),
+            os.path.join(self.folder, f"wal-{suffix}.f32"),
+        )
+
+    def exists(self) -> bool:
+        return self._current() is not None
+
+    # --- Load ---
+
+    def load(self, embeddings) -> "FAISS":
+        """Open the checkpoint memory-mapped and replay the log on top of it."""
+        from langchain_community.vectorstores.faiss import FAISS
+
+        base = self._current()
+        base_dir = os.path.join(self.folder, base)
+        index = configure_search(faiss.read_index(os.path.join(base_dir, f"{self.index_name}.faiss"), MMAP_FLAGS))
+        with open(os.path.join(base_dir, f"{self.index_name}.pkl"), "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        store = FAISS(embeddings, index, docstore, index_to_docstore_id)
+
+        entries = self._read_wal(base, index.d)
+        self.wal_entries = len(entries)
+        if entries:
+            store.index = writable_index(store.index)
+            for entry, vectors in entries:
+                apply_entry(store, entry, vectors)
+        return store
+
+    def _read_wal(self, base: str, dimension: int):
+        docs_path, vectors_path = self._wal_paths(base)
+        if not os.path.exists(docs_path):
+            return []
+        complete_rows = os.path.getsize(vectors_path) // (dimension * 4) if os.path.exists(vectors_path) else 0
+        vectors = np.fromfile(vectors_path, dtype=np.float32, count=complete_rows * dimension) \
+            .reshape(-1, dimension) if complete_rows else np.empty((0, dimension), dtype=np.float32)
+
+        entries, good_bytes, rows = [], 0, 0
+        with open(docs_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn tail from a crash mid-append
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                count = len(entry["ids"]) if entry["op"] == "add" else 0
+                if rows + count > len(vectors):
+                    break
+                entries.append((entry, vectors[rows:rows + count]))
+                rows += count
+                good_bytes += len(line)
+
+        # Drop anything past the last complete entry so later appends line up
+        if good_bytes != os.path.getsize(docs_path):
+            os.truncate(docs_path, good_bytes)
+        if os.path.exists(vectors_path) and rows * dimension * 4 != os.path.getsize(vectors_path):
+            os.truncate(vectors_path, rows * dimension * 4)
+        return entries
+
+    # --- Write ---
+
+    def append(self, entries: List[tuple]):
+        """Append (entry, vectors) pairs to the log; O(new data)."""
+        base = self._current()
+        docs_path, vectors_path = self._wal_paths(base)
+        for entry, vectors in entries:
+            if vectors is not None and len(vectors):
+                # Vectors first, so a logged add never points past the vector file
+                _append(vectors_path, np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            _append(docs_path, (json.dumps(entry, default=str) + "\n").encode("utf-8"))
+            self.wal_entries += 1
+
+    def checkpoint(self, store: "FAISS"):
+        """Write a fresh base from `store` and atomically make it current."""
+        old = self._current()
+        base = f"base-{self._generation(old or '') + 1:06d}"
+        os.makedirs(self.folder, exist_ok=True)
+        store.save_local(folder_path=os.path.join(self.folder, base), index_name=self.index_name)
+        _fsync_dir(os.path.join(self.folder, base))
+
+        tmp = os.path.join(self.folder, CURRENT_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            f.write(base)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(self.folder, CURRENT_FILE))
+        _fsync_dir(self.folder)
+
+        self._remove_generation(old)
+        self.wal_entries = 0
+
+    def _remove_generation(self, base: Optional[str]):
+        if base is None:
+            return
+        if base:
+            shutil.rmtree(os.path.join(self.folder, base), ignore_errors=True)
+        else:
+            for ext in ("faiss", "pkl"):
+                path = os.path.join(self.folder, f"{self.index_name}.{ext}")
+                if os.path.exists(path):
+                    os.remove(path)
+        for path in self._wal_paths(base):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def writable_index(index):
+    """Return an owned, writable copy of a memory-mapped index (mapped views abort on add)."""
+    return configure_search(faiss.deserialize_index(faiss.serialize_index(index)))
+
+
+def apply_entry(store: "FAISS", entry: dict, vectors: np.ndarray):
+    from langchain_core.documents import Document
+
+    if entry["op"] == "add":
+        docs = [
+            Document(id=doc_id, page_content=text, metadata=metadata)
+            for doc_id, text, metadata in zip(entry["ids"], entry["texts"], entry["metadatas"])
+        ]
+        start = store.index.ntotal
+        store.index.add(np.ascontiguousarray(vectors, dtype=np.float32))
+        store.docstore.add({doc.id: doc for doc in docs})
+        store.index_to_docstore_id.update({start + i: doc.id for i, doc in enumerate(docs)})
+    elif entry["op"] == "delete":
+        live = set(store.index_to_docstore_id.values())
+        ids = [doc_id for doc_id in entry["ids"] if doc_id in live]
+        if not ids:
+            return
+        drop = set(ids)
+        rows = {row for row, doc_id in store.index_to_docstore_id.items() if doc_id in drop}
+        store.index = remove_rows(store.index, rows)
+        store.docstore.delete(ids)
+        remaining = [doc_id for row, doc_id in sorted(store.index_to_docstore_id.items()) if row not in rows]
+        store.index_to_docstore_id = dict(enumerate(remaining))
+    elif entry["op"] == "merge":
+        # Metadata replaced wholesale (the log holds the merged result), so replay is idempotent
+        for doc_id, metadata in zip(entry["ids"], entry["metadatas"]):
+            doc = store.docstore.search(doc_id)
+            if isinstance(doc, str):
+                continue  # deleted since
+            store.docstore.delete([doc_id])
+            store.docstore.add({doc_id: Document(id=doc_id, page_content=doc.page_content, metadata=metadata)})
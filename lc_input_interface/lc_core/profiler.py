@@ -0,0 +1,75 @@
+# lc_core/profiler.py
+
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+
+class SamplingProfiler:
+    """
+    Samples every thread's Python stack every `interval` seconds from a
+    background thread. No tracing hooks are installed, so the profiled code
+    runs at full speed; the cost is one walk of each stack per interval.
+    collapsed() returns "frame;frame;frame count" lines, the input format
+    of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None:
+            raise RuntimeError("profiler already running")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="lc_core-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()) + "\n"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+_profile_lock = threading.Lock()
+
+
+def profile_for(seconds: float, interval: float = 0.005) -> str:
+    """Sample the whole process for `seconds` and return collapsed stacks; one run at a time."""
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("a profile is already being taken")
+    try:
+        with SamplingProfiler(interval) as profiler:
+            time.sleep(seconds)
+        return profiler.collapsed()
+    finally:
+        _profile_lock.release()
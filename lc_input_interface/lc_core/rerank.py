@@ -0,0 +1,140 @@
+# lc_core/rerank.py
+
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+from .metrics import METRICS
+from .retrieval import RetrievalContext
+from .config import (
+    RERANK_BATCH_SIZE,
+    RERANK_DEVICE,
+    RERANK_LATENCY_BUDGET,
+    RERANK_MMR_LAMBDA,
+    RERANK_MODEL_NAME,
+)
+
+COST_SMOOTHING = 0.2      # weight of the newest sample in a stage's running cost per candidate
+
+_skipped = METRICS.counter("lc_core_rerank_skipped_total", "Rerank stages skipped to stay within the latency budget")
+
+
+def mmr(query: np.ndarray, candidates: np.ndarray, k: int, lambda_mult: float = 0.5) -> List[int]:
+    """
+    Maximal marginal relevance over cosine similarity: greedily pick the
+    candidate most similar to the query and least similar to those already
+    picked. Returns up to `k` row indices, best first. One (n, n) similarity
+    matrix is computed up front; each pick is then O(n).
+    """
+    n = len(candidates)
+    if n == 0 or k <= 0:
+        return []
+    unit = candidates / np.maximum(np.linalg.norm(candidates, axis=1, keepdims=True), 1e-12)
+    relevance = unit @ (query / max(float(np.linalg.norm(query)), 1e-12))
+    similarity = unit @ unit.T
+
+    picked = [int(np.argmax(relevance))]
+    redundancy = similarity[picked[0]].copy()
+    while len(picked) < min(k, n):
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * redundancy
+        scores[picked] = -np.inf
+        best = int(np.argmax(scores))
+        picked.append(best)
+        np.maximum(redundancy, similarity[best], out=redundancy)
+    return picked
+
+
+class CrossEncoderReranker:
+    """Scores (query, passage) pairs with a sentence-transformers CrossEncoder, in batches."""
+
+    def __init__(self, model_name: str, device: str = "cpu", batch_size: int = 32):
+        self.model_name = model_name
+        self.device = device
+        self.batch_size = batch_size
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    # Imported here so that importing lc_core does not pull in torch
+                    from sentence_transformers import CrossEncoder
+                    self._model = CrossEncoder(self.model_name, device=self.device)
+        return self._model
+
+    def scores(self, query: str, texts: List[str]) -> np.ndarray:
+        pairs = [(query, text) for text in texts]
+        return np.asarray(self.model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False),
+                          dtype=np.float32)
+
+
+class Reranker:
+    """
+    Post-retrieval stage between the FAISS search and the context merge:
+    MMR drops near-duplicate hits from a wide candidate pool, then an
+    optional cross-encoder reorders what is left.
+
+    Each stage keeps a running cost per candidate. A stage runs only if its
+    estimated cost fits what is left of `budget` seconds, counted from the
+    start of retrieval (the query embedding and search count against it);
+    a skipped stage leaves the hits in search order.
+    """
+
+    def __init__(self, embed, lambda_mult: float = RERANK_MMR_LAMBDA,
+                 cross_encoder: Optional[CrossEncoderReranker] = None, budget: float = RERANK_LATENCY_BUDGET):
+        self.embed = embed          # texts -> (n, d) array; the memory's cached embedding model
+        self.lambda_mult = lambda_mult
+        self.cross_encoder = cross_encoder
+        self.budget = budget
+        self._cost = {"mmr": 0.0, "cross_encoder": 0.0}
+
+    @classmethod
+    def from_config(cls, embed) -> "Reranker":
+        cross_encoder = None
+        if RERANK_MODEL_NAME:
+            cross_encoder = CrossEncoderReranker(RERANK_MODEL_NAME, RERANK_DEVICE, RERANK_BATCH_SIZE)
+        return cls(embed, cross_encoder=cross_encoder)
+
+    def load(self):
+        if self.cross_encoder is not None:
+            self.cross_encoder.model
+
+    def _fits(self, stage: str, ctx: RetrievalContext, n: int, budget: float) -> bool:
+        if ctx.total_time + self._cost[stage] * n <= budget:
+            return True
+        _skipped.inc(stage=stage)
+        return False
+
+    def _observe(self, stage: str, seconds: float, n: int):
+        per_item = seconds / max(n, 1)
+        cost = self._cost[stage]
+        self._cost[stage] = per_item if cost == 0.0 else cost + COST_SMOOTHING * (per_item - cost)
+
+    def rerank(self, ctx: RetrievalContext, k: int, budget: Optional[float] = None) -> List[Document]:
+        """Reduce ctx.docs (the candidate pool) to at most `k` documents, best first."""
+        budget = self.budget if budget is None else budget
+        docs = ctx.docs
+        if len(docs) > k and ctx.vector is not None and self._fits("mmr", ctx, len(docs), budget):
+            start = time.perf_counter()
+            with ctx.timed("mmr"):
+                vectors = ctx.vectors
+                if vectors is None or len(vectors) != len(docs):
+                    # The index cannot give them back; stored chunks are embedding cache hits
+                    vectors = self.embed([doc.page_content for doc in docs])
+                docs = [docs[i] for i in mmr(ctx.vector, vectors, k, self.lambda_mult)]
+            self._observe("mmr", time.perf_counter() - start, len(ctx.docs))
+        docs = docs[:k]
+
+        if self.cross_encoder is not None and len(docs) > 1 and self._fits("cross_encoder", ctx, len(docs), budget):
+            self.cross_encoder.model  # loading is not part of the stage's cost
+            start = time.perf_counter()
+            with ctx.timed("cross_encoder"):
+                scores = self.cross_encoder.scores(ctx.query, [doc.page_content for doc in docs])
+                docs = [docs[i] for i in np.argsort(-scores, kind="stable")]
+            self._observe("cross_encoder", time.perf_counter() - start, len(docs))
+        return docs
@@ -0,0 +1,203 @@
+# lc_core/response_cache.py
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from .retrieval import RetrievalContext
+
+
+def context_fingerprint(template: str, question: str, ctx: "RetrievalContext") -> str:
+    """
+    Key for a chain response: the prompt template, the whitespace-normalised
+    question and the IDs of the documents and facts that went into the
+    prompt. Documents and facts are never edited in place (a change gets a
+    new ID), so equal fingerprints mean equal prompts.
+    """
+    parts = [template, " ".join(question.split()), ctx.session_id]
+    parts.extend(doc.id or doc.page_content for doc in ctx.docs)
+    parts.append("")
+    parts.extend(str(fact.id) for fact in ctx.facts)
+    return hashlib.sha1("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedResponse:
+    session_id: str
+    response: str
+    created: float
+    latency: float   # seconds the original LLM call took
+    tokens: int      # estimated prompt + completion tokens
+
+
+class _SQLiteTier:
+    """Persistent tier: one row per entry, pruned to the newest `max_entries`."""
+
+    def __init__(self, path: str, max_entries: int):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, session_id TEXT NOT NULL, response TEXT NOT NULL,"
+            " created REAL NOT NULL, latency REAL NOT NULL, tokens INTEGER NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_session ON responses (session_id)")
+        self._puts = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        row = self.conn.execute(
+            "SELECT session_id, response, created, latency, tokens FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        return CachedResponse(*row) if row else None
+
+    def put(self, key: str, entry: CachedResponse):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+            (key, entry.session_id, entry.response, entry.created, entry.latency, entry.tokens),
+        )
+        self._puts += 1
+        if self._puts % 100 == 0:
+            self.conn.execute(
+                "DELETE FROM responses WHERE key NOT IN"
+                " (SELECT key FROM responses ORDER BY created DESC LIMIT ?)", (self.max_entries,)
+            )
+
+    def delete(self, key: str):
+        self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def delete_session(self, session_id: str):
+        self.conn.execute("DELETE FROM responses WHERE session_id = ?", (session_id,))
+
+    def delete_expired(self, before: float):
+        self.conn.execute("DELETE FROM responses WHERE created < ?", (before,))
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+class ResponseCache:
+    """
+    Chain responses keyed by context_fingerprint().
+
+    Lookups go to a bounded in-memory LRU, then the optional SQLite tier.
+    Entries expire `ttl` seconds after they were written (None keeps them
+    until evicted). invalidate(session_id) drops a session's entries; it
+    is called when documents are deleted, so forgotten text is never
+    served again. Appends need no invalidation: a new document that is
+    retrieved changes the fingerprint.
+
+    stats() reports hits and misses along with the LLM time and tokens
+    that hits saved.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: Optional[float] = 3600, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self._lru: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._disk: Optional[_SQLiteTier] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self.saved_tokens = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @property
+    def disk(self) -> Optional[_SQLiteTier]:
+        if self._disk is None and self.path:
+            self._disk = _SQLiteTier(self.path, self.max_entries)
+        return self._disk
+
+    def _expired(self, entry: CachedResponse) -> bool:
+        return self.ttl is not None and time.time() - entry.created > self.ttl
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is None and self.disk is not None:
+                entry = self.disk.get(key)
+            if entry is not None and self._expired(entry):
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._remember(key, entry)
+            self.hits += 1
+            self.saved_seconds += entry.latency
+            self.saved_tokens += entry.tokens
+            return entry.response
+
+    def put(self, key: str, session_id: str, response: str, latency: float = 0.0, tokens: int = 0):
+        if not self.enabled:
+            return
+        entry = CachedResponse(session_id, response, time.time(), latency, tokens)
+        with self._lock:
+            self._remember(key, entry)
+            if self.disk is not None:
+                self.disk.put(key, entry)
+
+    def invalidate(self, session_id: str):
+        """Drop every entry for a session."""
+        with self._lock:
+            for key in [key for key, entry in self._lru.items() if entry.session_id == session_id]:
+                del self._lru[key]
+            if self.disk is not None:
+                self.disk.delete_session(session_id)
+
+    def clear_expired(self):
+        if self.ttl is None:
+            return
+        before = time.time() - self.ttl
+        with self._lock:
+            for key in [key for key, entry in self._lru.items() if entry.created < before]:
+                del self._lru[key]
+            if self.disk is not None:
+                self.disk.delete_expired(before)
+
+    def _remember(self, key: str, entry: CachedResponse):
+        self._lru[key] = entry
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def _drop(self, key: str):
+        self._lru.pop(key, None)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_seconds": self.saved_seconds,
+            "saved_tokens": self.saved_tokens,
+            "memory_entries": len(self._lru),
+            "disk_entries": len(self._disk) if self._disk is not None else 0,
+        }
@@ -0,0 +1,65 @@
+# lc_core/retrieval.py
+
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+if TYPE_CHECKING:
+    from lc_memory.schema import Fact
+
+
+def fact_text(fact: "Fact") -> str:
+    return f"{fact.subject} {fact.predicate} {fact.object}"
+
+
+@dataclass
+class RetrievalContext:
+    """
+    Request-scoped state for one turn: the query is embedded once and the
+    vector and hits are shared by the prompt, the memory write-back and any
+    later reranking. `vectors` holds the hits' stored vectors in search
+    order, when the index can reconstruct them. `facts` holds structured facts selected alongside the
+    vector hits. `cached` is set when the response came from the response
+    cache. Per-stage wall-clock timings (seconds) land in `timings`; when the
+    response is streamed, `first_token` is the time to its first token,
+    retrieval included.
+    """
+    query: str
+    session_id: str
+    k: int = 5
+    vector: Optional[np.ndarray] = None
+    docs: List[Document] = field(default_factory=list)
+    vectors: Optional[np.ndarray] = None
+    facts: List["Fact"] = field(default_factory=list)
+    response: Optional[str] = None
+    cached: bool = False
+    first_token: Optional[float] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @contextmanager
+    def timed(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[stage] = self.timings.get(stage, 0.0) + time.perf_counter() - start
+
+    @property
+    def text(self) -> str:
+        parts = []
+        if self.facts:
+            parts.append("Known facts:\n" + "\n".join(f"- {fact_text(fact)}" for fact in self.facts))
+        parts.extend(doc.page_content for doc in self.docs)
+        return "\n\n".join(parts)
+
+    @property
+    def doc_ids(self) -> List[str]:
+        return [doc.id for doc in self.docs if doc.id]
+
+    @property
+    def total_time(self) -> float:
+        return sum(self.timings.values())
@@ -0,0 +1,95 @@
+# lc_core/session_registry.py
+
+import threading
+from contextlib import contextmanager
+from typing import Dict
+
+
+class RWLock:
+    """
+    Many readers or one writer. Writer-preferring: once a writer is waiting,
+    new readers queue behind it, so a steady stream of searches cannot starve
+    adds. Not reentrant.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    def acquire_read(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            try:
+                while self._writer or self._readers:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+    @contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class SessionRegistry:
+    """
+    One RWLock per session, created on first use. Searches of a session
+    share its read lock, while adds, deletes and training take its write
+    lock, so sessions never wait on each other. Locks are kept for the
+    life of the registry: dropping one that a thread still holds would
+    let a second lock for the same session appear.
+    """
+
+    def __init__(self):
+        self._locks: Dict[str, RWLock] = {}
+        self._mutex = threading.Lock()
+
+    def lock(self, session_id: str) -> RWLock:
+        lock = self._locks.get(session_id)
+        if lock is None:
+            with self._mutex:
+                lock = self._locks.setdefault(session_id, RWLock())
+        return lock
+
+    def read(self, session_id: str):
+        return self.lock(session_id).read()
+
+    def write(self, session_id: str):
+        return self.lock(session_id).write()
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._locks
+
+    def __len__(self):
+        return len(self._locks)
@@ -1,4 +1,5 @@
 # lc_memory/__init__.py
 from .schema import Fact
 from .fact_store import FactStore
-
+from .sqlite_store import SQLiteFactStore
+from .memory_store import store_memory, retrieve_context
@@ -1,101 +1,564 @@
 # lc_memory/fact_store.py
 
-from typing import Dict, List, Set, Optional
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional, Set
 from uuid import uuid4, UUID
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
+from lc_memory.interval_index import IntervalIndex
+from lc_memory.lineage import LineageIndex
 from lc_memory.schema import Fact
 
+STATES = ("active", "superseded", "contradicted", "uncertain")
+STATE_CODES = {state: code for code, state in enumerate(STATES)}
+DELETED = -1
+
+NO_PROVENANCE = -1
+OPEN_ENDED = 2 ** 63 - 1  # valid_until of a fact that is still valid
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Fact IDs are minted as <store prefix:64><RFC 4122 variant:2><row:62>, so a
+# UUID maps back to its row without a dictionary. Facts loaded with IDs from
+# elsewhere fall back to a small side table. A store given a persisted prefix
+# (see SQLiteFactStore) puts reloaded facts back on the rows their IDs name.
+_ROW_BITS = 62
+_ROW_MASK = (1 << _ROW_BITS) - 1
+_VARIANT = 0b10 << _ROW_BITS
+
+
+def to_micros(value: datetime) -> int:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    delta = value - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def from_micros(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=value)
+
+
+def _intersect(smallest: array, other: array) -> array:
+    """Intersect two sorted posting lists by probing the larger one."""
+    out = array("I")
+    hi = len(other)
+    for row in smallest:
+        i = bisect_left(other, row, 0, hi)
+        if i < hi and other[i] == row:
+            out.append(row)
+    return out
+
+
+class StringTable:
+    """Interns strings to dense integer IDs."""
+
+    __slots__ = ("ids", "strings")
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def intern(self, value: str) -> int:
+        sid = self.ids.get(value)
+        if sid is None:
+            sid = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return sid
+
+    def lookup(self, value: str) -> Optional[int]:
+        return self.ids.get(value)
+
+    def __getitem__(self, sid: int) -> str:
+        return self.strings[sid]
+
+    def __len__(self):
+        return len(self.strings)
+
+
+class _FactView(Mapping):
+    """Read-only UUID -> Fact mapping over the columns; facts are built on access."""
+
+    __slots__ = ("_store",)
+
+    def __init__(self, store: "FactStore"):
+        self._store = store
+
+    def __getitem__(self, fact_id) -> Fact:
+        return self._store._materialize(self._store._row(fact_id))
+
+    def __contains__(self, fact_id) -> bool:
+        return self._store._find_row(fact_id) is not None
+
+    def __iter__(self):
+        store = self._store
+        return (store._uuid(row) for row in store._live_rows())
+
+    def __len__(self):
+        return self._store._live
+
+
+class _PostingView(Mapping):
+    """Read-only key -> set of fact UUIDs view over one posting index."""
+
+    __slots__ = ("_store", "_postings")
+
+    def __init__(self, store: "FactStore", postings: Dict[int, array]):
+        self._store = store
+        self._postings = postings
+
+    def __getitem__(self, key: str) -> Set[UUID]:
+        sid = self._store._strings.lookup(key)
+        if sid is None or sid not in self._postings:
+            raise KeyError(key)
+        store = self._store
+        return {store._uuid(row) for row in self._postings[sid] if store._state[row] != DELETED}
+
+    def __iter__(self):
+        strings = self._store._strings
+        return (strings[sid] for sid in self._postings)
+
+    def __len__(self):
+        return len(self._postings)
+
 
 class FactStore:
-    def __init__(self, session_id: str):
+    """
+    Columnar in-memory fact store.
+
+    Each fact is a row across array-backed columns; subjects, predicates,
+    objects, sources and provenance tags are interned to integer IDs. Rows
+    are appended in order, so the per-subject/predicate/provenance posting
+    lists stay sorted and queries intersect them smallest-first. Fact models
+    are only built for the rows a caller actually gets back, so mutating a
+    returned Fact does not change the store.
+    """
+
+    __slots__ = (
+        "session_id", "version", "_prefix", "_strings", "_size", "_live",
+        "_subject", "_predicate", "_object", "_source", "_provenance",
+        "_state", "_valid_from", "_valid_until",
+        "_justification", "_lineage", "_current_by_subject",
+        "_foreign_rows", "_foreign_ids",
+        "_by_subject", "_by_predicate", "_by_provenance",
+        "_timeline", "_timeline_by_subject",
+    )
+
+    def __init__(self, session_id: str, id_prefix: Optional[int] = None):
         self.session_id = session_id
-        self.facts: Dict[UUID, Fact] = {}
-        self.by_subject: Dict[str, Set[UUID]] = {}
-        self.by_provenance: Dict[str, Set[UUID]] = {}
-        self.by_state: Dict[str, Set[UUID]] = {}
-        self.by_predicate: Dict[str, Set[UUID]] = {}
+        self._prefix = uuid4().int >> 64 if id_prefix is None else id_prefix
+        self._strings = StringTable()
+        self._size = 0
+        self._live = 0
+        # Bumped by every mutation, so derived caches can tell they are stale
+        self.version = 0
+
+        self._subject = array("I")
+        self._predicate = array("I")
+        self._object = array("I")
+        self._source = array("I")
+        self._provenance = array("i")
+        self._state = array("b")
+        self._valid_from = array("q")
+        self._valid_until = array("q")
+
+        # Sparse column: most facts have no justification
+        self._justification: Dict[int, str] = {}
+        self._lineage = LineageIndex()
+        # Per subject, rows that were not superseded when added; pruned as they are
+        self._current_by_subject: Dict[int, array] = {}
+
+        self._foreign_rows: Dict[UUID, int] = {}
+        self._foreign_ids: Dict[int, UUID] = {}
+
+        self._by_subject: Dict[int, array] = {}
+        self._by_predicate: Dict[int, array] = {}
+        self._by_provenance: Dict[int, array] = {}
+
+        # Validity intervals, store-wide and per subject
+        self._timeline = IntervalIndex(self._valid_from, self._valid_until)
+        self._timeline_by_subject: Dict[int, IntervalIndex] = {}
+
+    # --- Row addressing ---
+
+    def _uuid(self, row: int) -> UUID:
+        foreign = self._foreign_ids.get(row)
+        if foreign is not None:
+            return foreign
+        return UUID(int=(self._prefix << 64) | _VARIANT | row)
+
+    def _find_row(self, fact_id) -> Optional[int]:
+        if not isinstance(fact_id, UUID):
+            return None
+        value = fact_id.int
+        if value >> 64 == self._prefix:
+            row = value & _ROW_MASK
+        else:
+            row = self._foreign_rows.get(fact_id)
+            if row is None:
+                return None
+        if row < self._size and self._state[row] != DELETED:
+            return row
+        return None
+
+    def _row(self, fact_id) -> int:
+        row = self._find_row(fact_id)
+        if row is None:
+            raise KeyError(fact_id)
+        return row
+
+    def next_ids(self, count: int) -> List[UUID]:
+        """The IDs the next `count` added facts will get, e.g. to persist them first."""
+        return [UUID(int=(self._prefix << 64) | _VARIANT | row) for row in range(self._size, self._size + count)]
+
+    def _live_rows(self):
+        state = self._state
+        return (row for row in range(self._size) if state[row] != DELETED)
+
+    # --- Views kept for callers of the old dict-of-sets layout ---
+
+    @property
+    def facts(self) -> Mapping:
+        return _FactView(self)
+
+    @property
+    def by_subject(self) -> Mapping:
+        return _PostingView(self, self._by_subject)
+
+    @property
+    def by_predicate(self) -> Mapping:
+        return _PostingView(self, self._by_predicate)
+
+    @property
+    def by_provenance(self) -> Mapping:
+        return _PostingView(self, self._by_provenance)
+
+    def __len__(self):
+        return self._live
+
+    # --- Writes ---
+
+    def _append_row(self, subject: str, predicate: str, object: str, state: str = "active",
+                    valid_from: Optional[datetime] = None, valid_until: Optional[datetime] = None,
+                    source: str = "FactStore", provenance: Optional[str] = None,
+                    justification: Optional[str] = None, fact_id: Optional[UUID] = None) -> int:
+        for field, value in (("subject", subject), ("predicate", predicate), ("object", object)):
+            if not isinstance(value, str) or not value.strip():
+                raise ValueError(f"{field} must be a non-empty string")
+
+        row = self._size
+        strings = self._strings
+        subject_id = strings.intern(subject)
+        predicate_id = strings.intern(predicate)
+        provenance_id = strings.intern(provenance) if provenance else NO_PROVENANCE
+        start = to_micros(valid_from) if valid_from is not None else to_micros(datetime.utcnow())
+        end = to_micros(valid_until) if valid_until is not None else OPEN_ENDED
+        if end < start:
+            raise ValueError("valid_until must be after or equal to valid_from")
+
+        self._subject.append(subject_id)
+        self._predicate.append(predicate_id)
+        self._object.append(strings.intern(object))
+        self._source.append(strings.intern(source))
+        self._provenance.append(provenance_id)
+        self._state.append(STATE_CODES[state])
+        self._valid_from.append(start)
+        self._valid_until.append(end)
+        if justification:
+            self._justification[row] = justification
+
+        if fact_id is not None and fact_id.int != ((self._prefix << 64) | _VARIANT | row):
+            self._foreign_rows[fact_id] = row
+            self._foreign_ids[row] = fact_id
+
+        self._by_subject.setdefault(subject_id, array("I")).append(row)
+        self._by_predicate.setdefault(predicate_id, array("I")).append(row)
+        if provenance_id != NO_PROVENANCE:
+            self._by_provenance.setdefault(provenance_id, array("I")).append(row)
+        self._lineage.append(row)
+        if state != "superseded":
+            self._current_by_subject.setdefault(subject_id, array("I")).append(row)
+        self._timeline.add(row)
+        timeline = self._timeline_by_subject.get(subject_id)
+        if timeline is None:
+            timeline = self._timeline_by_subject[subject_id] = IntervalIndex(self._valid_from, self._valid_until)
+        timeline.add(row)
+
+        self._size += 1
+        self._live += 1
+        self.version += 1
+        return row
+
+    def _pad_to(self, row: int):
+        """Append deleted placeholder rows up to `row`, so a reloaded ID lands on the row it names."""
+        while self._size < row:
+            for column in (self._subject, self._predicate, self._object, self._source):
+                column.append(0)
+            self._provenance.append(NO_PROVENANCE)
+            self._state.append(DELETED)
+            self._valid_from.append(0)
+            self._valid_until.append(OPEN_ENDED)
+            self._lineage.append(self._size)
+            self._size += 1
 
     def add_fact(self, subject, predicate, object, **metadata) -> UUID:
-        fact_id = uuid4()
-        valid_from = metadata.get("valid_from", datetime.utcnow())
-        provenance = metadata.get("provenance")
-        source = metadata.get("source", "FactStore")
-
-        fact = Fact(
-            id=fact_id,
-            subject=subject,
-            predicate=predicate,
-            object=object,
-            state="active",
-            session_id=self.session_id,
-            valid_from=valid_from,
-            source=source,
-            provenance=provenance,
-            replaces=[],
-            replaced_by=[],
-            metadata=metadata
+        row = self._append_row(
+            subject, predicate, object,
+            valid_from=metadata.get("valid_from"),
+            valid_until=metadata.get("valid_until"),
+            source=metadata.get("source", "FactStore"),
+            provenance=metadata.get("provenance"),
+            justification=metadata.get("justification"),
         )
+        return self._uuid(row)
 
-        self.facts[fact_id] = fact
-        self.by_subject.setdefault(subject, set()).add(fact_id)
-        if provenance:
-            self.by_provenance.setdefault(provenance, set()).add(fact_id)
-        self.by_state.setdefault(fact.state, set()).add(fact_id)
-        self.by_predicate.setdefault(predicate, set()).add(fact_id)
-        return fact_id
-
-    def get_facts(self, subject=None, predicate=None, state=None, provenance=None) -> List[Fact]:
-        result_ids = set(self.facts.keys())
-        if subject:
-            result_ids &= self.by_subject.get(subject, set())
-        if predicate:
-            result_ids &= self.by_predicate.get(predicate, set())
-        if state:
-            result_ids &= self.by_state.get(state, set())
-        if provenance:
-            result_ids &= self.by_provenance.get(provenance, set())
-        return [self.facts[fid] for fid in result_ids]
+    def add_facts(self, facts: Iterable) -> List[UUID]:
+        """
+        Bulk insert. Each item is (subject, predicate, object), optionally
+        followed by a metadata dict, or a dict with those keys.
+        """
+        ids = []
+        for item in facts:
+            if isinstance(item, dict):
+                item = dict(item)
+                ids.append(self.add_fact(item.pop("subject"), item.pop("predicate"), item.pop("object"), **item))
+            elif len(item) == 4:
+                ids.append(self.add_fact(item[0], item[1], item[2], **item[3]))
+            else:
+                ids.append(self.add_fact(*item))
+        return ids
 
-    def overwrite_fact(self, old_id, subject, predicate, object, justification, **metadata):
-        new_id = self.add_fact(subject, predicate, object, **metadata)
-        new_fact = self.facts[new_id]
+    def load_facts(self, facts: Iterable[Fact]) -> int:
+        """
+        Insert Fact models as they are (IDs, states, validity, justification
+        and lineage), e.g. the output of export_session. Returns the count.
+        """
+        facts = list(facts)
+        rows = {}
+        for fact in facts:
+            if self._find_row(fact.id) is not None:
+                raise ValueError(f"fact {fact.id} already exists")
+            value = fact.id.int
+            if value >> 64 == self._prefix and value & ~_ROW_MASK & ((1 << 64) - 1) == _VARIANT:
+                # Minted by this store's prefix: gaps left by deleted facts stay gaps
+                self._pad_to(value & _ROW_MASK)
+            rows[fact.id] = self._append_row(
+                fact.subject, fact.predicate, fact.object, state=fact.state,
+                valid_from=fact.valid_from, valid_until=fact.valid_until,
+                source=fact.source, provenance=fact.provenance,
+                justification=fact.justification, fact_id=fact.id,
+            )
+        # Second pass: lineage may point at facts later in the batch
+        for fact in facts:
+            row = rows[fact.id]
+            for old_id in fact.replaces:
+                old_row = self._find_row(old_id)
+                if old_row is not None:
+                    self._lineage.link(old_row, row)
+            for new_id in fact.replaced_by:
+                new_row = self._find_row(new_id)
+                if new_row is not None:
+                    self._lineage.link(row, new_row)
+        return len(facts)
+
+    def _set_state(self, row: int, state: str):
+        self._state[row] = STATE_CODES[state]
+        self.version += 1
 
-        old_fact = self.facts[old_id]
-        old_fact.state = "superseded"
-        old_fact.replaced_by.append(new_id)
-        new_fact.replaces.append(old_id)
+    def _close(self, row: int, at: int):
+        """End a fact's validity at `at` (never before it started) and refresh the interval indexes."""
+        if self._valid_until[row] != OPEN_ENDED:
+            return
+        self._valid_until[row] = max(at, self._valid_from[row])
+        self.version += 1
+        self._timeline.update(row)
+        self._timeline_by_subject[self._subject[row]].update(row)
 
-        self.by_state["active"].discard(old_id)
-        self.by_state.setdefault("superseded", set()).add(old_id)
+    def overwrite_fact(self, old_id, subject, predicate, object, justification, **metadata):
+        old_row = self._row(old_id)
+        new_id = self.add_fact(subject, predicate, object, justification=justification, **metadata)
+        new_row = self._row(new_id)
+
+        self._set_state(old_row, "superseded")
+        self._close(old_row, self._valid_from[new_row])
+        self._lineage.link(old_row, new_row)
         return new_id
 
+    def delete_facts_by_provenance(self, provenance_tag: str):
+        provenance_id = self._strings.lookup(provenance_tag)
+        if provenance_id is None:
+            return
+        rows = self._by_provenance.pop(provenance_id, array("I"))
+        dropped_by_subject, touched_predicates = {}, set()
+        for row in rows:
+            if self._state[row] == DELETED:
+                continue
+            self._state[row] = DELETED
+            self._live -= 1
+            dropped_by_subject.setdefault(self._subject[row], []).append(row)
+            touched_predicates.add(self._predicate[row])
+        touched_subjects = dropped_by_subject.keys()
+        self.version += 1
+        # Keep the other posting lists and interval indexes free of dead rows
+        for key, dropped in dropped_by_subject.items():
+            self._timeline.discard(dropped)
+            self._timeline_by_subject[key].discard(dropped)
+            if not self._timeline_by_subject[key]:
+                del self._timeline_by_subject[key]
+        for postings, keys in ((self._by_subject, touched_subjects), (self._by_predicate, touched_predicates)):
+            for key in keys:
+                kept = array("I", (row for row in postings[key] if self._state[row] != DELETED))
+                if kept:
+                    postings[key] = kept
+                else:
+                    del postings[key]
+
+    # --- Reads ---
+
+    def _materialize(self, row: int) -> Fact:
+        strings = self._strings
+        provenance_id = self._provenance[row]
+        valid_until = self._valid_until[row]
+        return Fact.model_construct(
+            id=self._uuid(row),
+            subject=strings[self._subject[row]],
+            predicate=strings[self._predicate[row]],
+            object=strings[self._object[row]],
+            state=STATES[self._state[row]],
+            session_id=self.session_id,
+            valid_from=from_micros(self._valid_from[row]),
+            valid_until=None if valid_until == OPEN_ENDED else from_micros(valid_until),
+            source=strings[self._source[row]],
+            provenance=strings[provenance_id] if provenance_id != NO_PROVENANCE else None,
+            justification=self._justification.get(row),
+            replaces=[self._uuid(r) for r in self._lineage.replaces.get(row, ())],
+            replaced_by=[self._uuid(r) for r in self._lineage.replaced_by.get(row, ())],
+        )
+
+    def get_fact(self, fact_id) -> Fact:
+        return self._materialize(self._row(fact_id))
+
+    def _time_rows(self, subject_id: Optional[int], as_of=None, between=None) -> array:
+        """Sorted rows valid at `as_of` or overlapping the `between` (start, end) window."""
+        timeline = self._timeline if subject_id is None else self._timeline_by_subject[subject_id]
+        if as_of is not None:
+            rows = timeline.stab(to_micros(as_of))
+        else:
+            start, end = between
+            if end < start:
+                raise ValueError("between must be a (start, end) pair with start <= end")
+            rows = timeline.overlapping(to_micros(start), to_micros(end))
+        return array("I", sorted(rows))
+
+    def _query_rows(self, subject=None, predicate=None, state=None, provenance=None,
+                    as_of=None, between=None) -> Iterable[int]:
+        if as_of is not None and between is not None:
+            raise ValueError("pass either as_of or between, not both")
+        postings = []
+        for value, index in ((subject, self._by_subject), (predicate, self._by_predicate),
+                             (provenance, self._by_provenance)):
+            if value:
+                sid = self._strings.lookup(value)
+                if sid is None or sid not in index:
+                    return []
+                postings.append(index[sid])
+
+        if as_of is not None or between is not None:
+            # Within one subject the interval index replaces its posting list
+            subject_id = self._strings.lookup(subject) if subject else None
+            if subject:
+                postings.pop(0)
+            postings.append(self._time_rows(subject_id, as_of, between))
+
+        if postings:
+            postings.sort(key=len)
+            rows = postings[0]
+            for other in postings[1:]:
+                if not rows:
+                    break
+                rows = _intersect(rows, other)
+        else:
+            rows = range(self._size)
+
+        state_column = self._state
+        if state:
+            code = STATE_CODES.get(state)
+            if code is None:
+                return []
+            return [row for row in rows if state_column[row] == code]
+        return [row for row in rows if state_column[row] != DELETED]
+
+    def get_facts(self, subject=None, predicate=None, state=None, provenance=None,
+                  as_of: Optional[datetime] = None, between: Optional[tuple] = None) -> List[Fact]:
+        """
+        Facts matching every given filter. `as_of` keeps facts whose validity
+        contains that instant (valid_from <= as_of < valid_until); `between`
+        keeps facts whose validity overlaps the (start, end) window. Both
+        include facts that have since been superseded.
+        """
+        rows = self._query_rows(subject, predicate, state, provenance, as_of, between)
+        return [self._materialize(row) for row in rows]
+
+    def count_facts(self, subject=None, predicate=None, state=None, provenance=None,
+                    as_of: Optional[datetime] = None, between: Optional[tuple] = None) -> int:
+        return len(self._query_rows(subject, predicate, state, provenance, as_of, between))
+
     def get_lineage(self, fact_id) -> Dict:
-        fact = self.facts[fact_id]
+        row = self._row(fact_id)
+        head = self._lineage.head(row, self._alive)
         return {
-            "replaces": fact.replaces,
-            "replaced_by": fact.replaced_by,
-            "state": fact.state
+            "replaces": [self._uuid(r) for r in self._lineage.replaces.get(row, ())],
+            "replaced_by": [self._uuid(r) for r in self._lineage.replaced_by.get(row, ())],
+            "state": STATES[self._state[row]],
+            "head": self._uuid(head) if head is not None else None,
         }
 
-    def resolve_contradictions(self, subject, predicate=None) -> List[Fact]:
-        candidates = self.get_facts(subject=subject)
-        if predicate:
-            candidates = [f for f in candidates if f.predicate == predicate]
-        return [f for f in candidates if f.state != "superseded"]
+    # --- Lineage ---
 
-    def delete_facts_by_provenance(self, provenance_tag: str):
-        ids_to_delete = self.by_provenance.get(provenance_tag, set()).copy()
-        for fid in ids_to_delete:
-            fact = self.facts.pop(fid, None)
-            if not fact:
-                continue
-            self.by_subject.get(fact.subject, set()).discard(fid)
-            self.by_state.get(fact.state, set()).discard(fid)
-            self.by_predicate.get(fact.predicate, set()).discard(fid)
-        self.by_provenance.pop(provenance_tag, None)
+    def _alive(self, row: int) -> bool:
+        return self._state[row] != DELETED
+
+    def get_chain(self, fact_id) -> List[Fact]:
+        """Every live revision linked to this fact by overwrites, oldest write first."""
+        row = self._row(fact_id)
+        return [self._materialize(r) for r in self._lineage.members(row) if self._alive(r)]
+
+    def current_head(self, fact_id) -> Fact:
+        """The latest revision of the fact's chain."""
+        return self._materialize(self._lineage.head(self._row(fact_id), self._alive))
+
+    def history(self, subject, predicate=None) -> List[List[Fact]]:
+        """Chains with a live fact about `subject` (and `predicate`), each oldest write first."""
+        chains, seen = [], set()
+        for row in self._query_rows(subject=subject, predicate=predicate):
+            chain = self._lineage.chain_id(row)
+            if chain not in seen:
+                seen.add(chain)
+                chains.append([self._materialize(r) for r in self._lineage.members(row) if self._alive(r)])
+        return chains
+
+    def resolve_contradictions(self, subject, predicate=None) -> List[Fact]:
+        """Facts about `subject` that have not been superseded."""
+        subject_id = self._strings.lookup(subject)
+        current = self._current_by_subject.get(subject_id)
+        if current is None:
+            return []
+        state, superseded = self._state, STATE_CODES["superseded"]
+        current = array("I", (row for row in current if state[row] not in (superseded, DELETED)))
+        if current:
+            self._current_by_subject[subject_id] = current
+        else:
+            del self._current_by_subject[subject_id]
+        predicate_id = self._strings.lookup(predicate) if predicate else None
+        if predicate and predicate_id is None:
+            return []
+        return [
+            self._materialize(row) for row in current
+            if predicate_id is None or self._predicate[row] == predicate_id
+        ]
 
     def export_session(self, session_id) -> List[Fact]:
         if session_id != self.session_id:
             return []
-        return list(self.facts.values())
+        return [self._materialize(row) for row in self._live_rows()]
@@ -0,0 +1,149 @@
+# lc_memory/interval_index.py
+
+from array import array
+from bisect import bisect_right
+from math import isqrt
+from typing import Iterable, List, Optional
+
+# Writes since the last build are scanned linearly until they outnumber
+# max(REBUILD_MIN, sqrt(n)); then the next query rebuilds
+REBUILD_MIN = 64
+
+
+class IntervalIndex:
+    """
+    Stabbing and overlap queries over half-open [start, end) intervals.
+
+    Intervals are FactStore rows; their endpoints are read from the store's
+    valid_from/valid_until columns. A centered interval tree and a
+    start-sorted array cover the rows present at the last build. Rows added
+    since, or whose endpoints changed (update()), sit in a small overflow
+    buffer that queries scan directly, and their stale tree entries are
+    skipped. The tree is rebuilt only once the buffer outgrows
+    max(REBUILD_MIN, sqrt(n)), so queries cost O(log n + k + sqrt(n)) and
+    a write costs O(sqrt(n) log n) amortized, however writes and queries
+    interleave.
+    """
+
+    __slots__ = ("_starts", "_ends", "_rows", "_size", "_tree", "_sorted_starts", "_sorted_rows",
+                 "_pending", "_stale", "_removed")
+
+    def __init__(self, starts: array, ends: array):
+        self._starts = starts
+        self._ends = ends
+        self._rows = array("I")
+        self._size = 0
+        self._tree = None
+        self._sorted_starts: Optional[array] = None
+        self._sorted_rows: Optional[array] = None
+        self._pending = {}      # row -> None; insertion-ordered set of rows not in the tree as-is
+        self._stale = set()     # rows whose tree entry is outdated
+        self._removed = set()   # discarded rows still in _rows until the next build
+
+    def __len__(self):
+        return self._size
+
+    def add(self, row: int):
+        self._rows.append(row)
+        self._size += 1
+        self._pending[row] = None
+
+    def update(self, row: int):
+        """row's endpoints changed (e.g. its fact was closed)."""
+        if self._sorted_starts is not None:
+            self._stale.add(row)
+        self._pending[row] = None
+
+    def discard(self, rows: Iterable[int]):
+        """Drop member rows; they are filtered from queries and compacted away on the next build."""
+        for row in rows:
+            if row in self._removed:
+                continue
+            self._removed.add(row)
+            self._stale.add(row)
+            self._pending.pop(row, None)
+            self._size -= 1
+
+    # --- Build ---
+
+    def _current(self):
+        """Build on first use, or once the overflow buffer has grown too large to scan."""
+        if self._sorted_starts is None or len(self._pending) + len(self._stale) > max(REBUILD_MIN, isqrt(self._size)):
+            self._build()
+
+    def _build(self):
+        starts, ends, removed = self._starts, self._ends, self._removed
+        if removed:
+            self._rows = array("I", (row for row in self._rows if row not in removed))
+            removed.clear()
+        self._pending.clear()
+        self._stale.clear()
+        order = sorted(self._rows, key=starts.__getitem__)
+        self._sorted_rows = array("I", order)
+        self._sorted_starts = array("q", (starts[row] for row in order))
+        # Empty intervals contain no instant; leaving them out of the tree
+        # guarantees the median interval lands in its node
+        self._tree = self._node([row for row in order if ends[row] > starts[row]])
+
+    def _node(self, rows: List[int]):
+        """rows are sorted by start; returns (center, here_by_start, here_by_end, left, right)."""
+        if not rows:
+            return None
+        starts, ends = self._starts, self._ends
+        center = starts[rows[len(rows) // 2]]
+        left, here, right = [], [], []
+        for row in rows:
+            if ends[row] <= center:
+                left.append(row)
+            elif starts[row] > center:
+                right.append(row)
+            else:
+                here.append(row)
+        by_end = sorted(here, key=ends.__getitem__, reverse=True)
+        return (
+            center,
+            [(starts[row], row) for row in here],
+            [(ends[row], row) for row in by_end],
+            self._node(left),
+            self._node(right),
+        )
+
+    # --- Queries ---
+
+    def stab(self, t: int) -> List[int]:
+        """Rows whose interval contains t (start <= t < end)."""
+        self._current()
+        out, node = [], self._tree
+        while node is not None:
+            center, by_start, by_end, left, right = node
+            if t < center:
+                # Every interval here ends after center > t
+                for start, row in by_start:
+                    if start > t:
+                        break
+                    out.append(row)
+                node = left
+            else:
+                # Every interval here starts at or before center <= t
+                for end, row in by_end:
+                    if end <= t:
+                        break
+                    out.append(row)
+                node = right
+        starts, ends, stale = self._starts, self._ends, self._stale
+        if stale:
+            out = [row for row in out if row not in stale]
+        out.extend(row for row in self._pending if starts[row] <= t < ends[row])
+        return out
+
+    def overlapping(self, lo: int, hi: int) -> List[int]:
+        """Rows whose interval overlaps [lo, hi): those containing lo, plus those starting inside."""
+        out = self.stab(lo)
+        if hi > lo:
+            starts, ends, stale = self._starts, self._ends, self._stale
+            first = bisect_right(self._sorted_starts, lo)
+            last = bisect_right(self._sorted_starts, hi - 1)
+            out.extend(row for row in self._sorted_rows[first:last]
+                       if ends[row] > starts[row] and row not in stale)
+            out.extend(row for row in self._pending if lo < starts[row] < hi and ends[row] > starts[row])
+        return out
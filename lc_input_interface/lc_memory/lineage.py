@@ -0,0 +1,96 @@
+# lc_memory/lineage.py
+
+from array import array
+from heapq import merge
+from typing import Callable, Dict, List, Optional, Sequence
+
+
+class LineageCycleError(ValueError):
+    """Raised when a replaces/replaced_by link would make a fact its own ancestor."""
+
+
+class LineageIndex:
+    """
+    Supersession links between FactStore rows, grouped into chains.
+
+    Every row belongs to exactly one chain: a set of facts connected by
+    overwrites. Chain IDs are kept per row and merged smaller-into-larger
+    when two chains are linked, so chain_id() is O(1) and members() returns
+    the chain in row (write) order. Each chain also keeps its head, the
+    most recently written revision, so head() is O(1) unless that row has
+    been deleted.
+    """
+
+    __slots__ = ("_chain", "_members", "_heads", "replaces", "replaced_by")
+
+    def __init__(self):
+        self._chain = array("I")
+        self._members: Dict[int, array] = {}  # only chains with more than one row
+        self._heads: Dict[int, int] = {}
+        self.replaces: Dict[int, List[int]] = {}
+        self.replaced_by: Dict[int, List[int]] = {}
+
+    def append(self, row: int):
+        """Register a new row as a chain of its own."""
+        self._chain.append(row)
+
+    def chain_id(self, row: int) -> int:
+        return self._chain[row]
+
+    def members(self, row: int) -> Sequence[int]:
+        chain = self._chain[row]
+        return self._members.get(chain, (chain,))
+
+    def _head(self, chain: int) -> int:
+        return self._heads.get(chain, chain)
+
+    def _reaches(self, start: int, target: int) -> bool:
+        stack, seen = [start], {start}
+        while stack:
+            row = stack.pop()
+            if row == target:
+                return True
+            for successor in self.replaced_by.get(row, ()):
+                if successor not in seen:
+                    seen.add(successor)
+                    stack.append(successor)
+        return False
+
+    def link(self, old: int, new: int):
+        """Record that `new` replaces `old` and merge their chains."""
+        if new in self.replaced_by.get(old, ()):
+            return
+        if old == new or (self._chain[old] == self._chain[new] and self._reaches(new, old)):
+            raise LineageCycleError(f"row {new} already precedes row {old}")
+        self.replaced_by.setdefault(old, []).append(new)
+        self.replaces.setdefault(new, []).append(old)
+
+        head = self._head(self._chain[new])
+        chain = self._union(self._chain[old], self._chain[new])
+        self._heads[chain] = head
+
+    def _union(self, a: int, b: int) -> int:
+        if a == b:
+            return a
+        rows_a, rows_b = self._members.get(a, (a,)), self._members.get(b, (b,))
+        if len(rows_a) < len(rows_b):
+            a, b, rows_a, rows_b = b, a, rows_b, rows_a
+        for row in rows_b:
+            self._chain[row] = a
+        self._members[a] = array("I", merge(rows_a, rows_b))
+        self._members.pop(b, None)
+        self._heads.pop(b, None)
+        return a
+
+    def head(self, row: int, alive: Callable[[int], bool]) -> Optional[int]:
+        """
+        Latest revision in the row's chain. If that row is gone, fall back
+        to the newest live row with no live successor.
+        """
+        head = self._head(self._chain[row])
+        if alive(head):
+            return head
+        for candidate in reversed(self.members(row)):
+            if alive(candidate) and not any(alive(r) for r in self.replaced_by.get(candidate, ())):
+                return candidate
+        return None
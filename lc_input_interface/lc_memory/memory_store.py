@@ -0,0 +1,29 @@
+# lc_memory/memory_store.py
+
+from typing import List, Optional
+from uuid import uuid4
+
+from langchain_core.documents import Document
+
+
+def store_memory(session_id: str, text: str, *, embedding_model, vectorstore, metadata: Optional[dict] = None) -> str:
+    """
+    Embed `text` with the injected model and add it to the injected vectorstore,
+    tagged with `session_id`. Returns the new document ID.
+    """
+    doc_id = str(uuid4())
+    vector = embedding_model.embed_documents([text])[0]
+    vectorstore.add_embeddings(
+        [(text, vector)],
+        metadatas=[{**(metadata or {}), "session_id": session_id}],
+        ids=[doc_id],
+    )
+    return doc_id
+
+
+def retrieve_context(session_id: str, query_text: str, k: int = 4, *, embedding_model, vectorstore) -> List[str]:
+    vector = embedding_model.embed_query(query_text)
+    docs: List[Document] = vectorstore.similarity_search_by_vector(
+        vector, k=k, filter={"session_id": session_id}
+    )
+    return [doc.page_content for doc in docs]
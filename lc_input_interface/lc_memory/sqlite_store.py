@@ -0,0 +1,460 @@
+# lc_memory/sqlite_store.py
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+from uuid import UUID, uuid4
+
+from lc_memory.fact_store import FactStore, from_micros, to_micros
+from lc_memory.schema import Fact
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS facts (
+    id            TEXT PRIMARY KEY,
+    session_id    TEXT NOT NULL,
+    subject       TEXT NOT NULL,
+    predicate     TEXT NOT NULL,
+    object        TEXT NOT NULL,
+    state         TEXT NOT NULL,
+    valid_from    INTEGER NOT NULL,
+    valid_until   INTEGER,
+    source        TEXT NOT NULL,
+    provenance    TEXT,
+    justification TEXT
+);
+CREATE INDEX IF NOT EXISTS facts_subject ON facts (session_id, subject, predicate);
+CREATE INDEX IF NOT EXISTS facts_predicate ON facts (session_id, predicate);
+CREATE INDEX IF NOT EXISTS facts_state ON facts (session_id, state);
+CREATE INDEX IF NOT EXISTS facts_provenance ON facts (session_id, provenance);
+CREATE INDEX IF NOT EXISTS facts_validity ON facts (session_id, subject, valid_from, valid_until);
+
+CREATE TABLE IF NOT EXISTS lineage (
+    old_id TEXT NOT NULL,
+    new_id TEXT NOT NULL,
+    PRIMARY KEY (old_id, new_id)
+);
+CREATE INDEX IF NOT EXISTS lineage_new ON lineage (new_id);
+
+CREATE TABLE IF NOT EXISTS id_prefixes (
+    session_id TEXT PRIMARY KEY,
+    prefix     TEXT NOT NULL
+);
+
+-- Bumped by writes that change or delete existing facts, so caches reload
+CREATE TABLE IF NOT EXISTS rewrites (
+    session_id TEXT PRIMARY KEY,
+    count      INTEGER NOT NULL
+);
+"""
+
+COLUMNS = ("id, subject, predicate, object, state, valid_from, valid_until, "
+           "source, provenance, justification")
+
+INSERT_FACT = f"INSERT INTO facts (session_id, {COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+
+class SQLiteFactStore:
+    """
+    FactStore persisted to SQLite (WAL mode), with the same surface as the
+    in-memory FactStore. One database file can hold any number of sessions.
+
+    With cache=True (default) an in-memory FactStore mirrors the session and
+    serves get_facts/get_fact/get_lineage; SQLite is the source of truth and
+    every write goes to both, the cache once the database has committed.
+    The cache mints fact IDs from a per-session prefix kept in the database,
+    so after a reopen every stored ID still maps straight to its cache row.
+    Writes run in an immediate transaction that first loads facts other
+    writers (e.g. other worker processes) added since, so IDs never clash.
+    Cached reads do the same once PRAGMA data_version shows another
+    connection committed; if it superseded or deleted facts of the session,
+    the cache is reloaded. iter_facts always streams from the database.
+    """
+
+    def __init__(self, session_id: str, path: str, cache: bool = True):
+        self.session_id = session_id
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=OFF")
+        self._conn.executescript(SCHEMA)
+
+        self.cache: Optional[FactStore] = None
+        self._seen_rowid = 0        # facts up to this rowid are in the cache
+        self._seen_rewrites = 0     # the session's rewrites count the cache reflects
+        self._data_version = None   # PRAGMA data_version when the cache last caught up
+        if cache:
+            self._prefix = self._id_prefix()
+            with self._lock, self._snapshot():
+                self._load_cache()
+
+    def _id_prefix(self) -> int:
+        with self._lock, self._conn:
+            # OR IGNORE: a concurrent opener of the same session may have stored one first
+            self._conn.execute(
+                "INSERT OR IGNORE INTO id_prefixes (session_id, prefix) VALUES (?, ?)",
+                (self.session_id, format(uuid4().int >> 64, "016x")),
+            )
+            row = self._conn.execute("SELECT prefix FROM id_prefixes WHERE session_id = ?", (self.session_id,)).fetchone()
+        return int(row[0], 16)
+
+    @contextmanager
+    def _write(self):
+        """
+        A write transaction, taken immediately so other connections wait.
+        The cache first catches up with what other writers committed, so
+        the IDs it mints next are free.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            with self._conn:
+                if self.cache is not None:
+                    self._catch_up()
+                yield
+                self._seen_rowid = self._conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM facts").fetchone()[0]
+                self._seen_rewrites = self._rewrites()
+
+    @contextmanager
+    def _snapshot(self):
+        """A read transaction, so a catch-up sees one consistent state; reuses an open transaction."""
+        if self._conn.in_transaction:
+            yield
+            return
+        self._conn.execute("BEGIN")
+        try:
+            yield
+        finally:
+            self._conn.execute("COMMIT")
+
+    def _data_version_now(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _rewrites(self) -> int:
+        row = self._conn.execute("SELECT count FROM rewrites WHERE session_id = ?", (self.session_id,)).fetchone()
+        return row[0] if row else 0
+
+    def _count_rewrite(self):
+        self._conn.execute("INSERT OR IGNORE INTO rewrites (session_id, count) VALUES (?, 0)", (self.session_id,))
+        self._conn.execute("UPDATE rewrites SET count = count + 1 WHERE session_id = ?", (self.session_id,))
+
+    def _load_cache(self):
+        """Rebuild the cache from the database. Call in a transaction with the lock held."""
+        cache = FactStore(self.session_id, id_prefix=self._prefix)
+        self._data_version = self._data_version_now()
+        self._seen_rowid = self._conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM facts").fetchone()[0]
+        self._seen_rewrites = self._rewrites()
+        cache.load_facts(self.iter_facts())
+        if self.cache is not None:
+            # Keep counting up, so matchers keyed on the version see the change
+            cache.version = self.cache.version + 1
+        self.cache = cache
+
+    def _catch_up(self):
+        """Bring the cache up to date with other connections' commits. Call in a transaction with the lock held."""
+        data_version = self._data_version_now()
+        if data_version == self._data_version:
+            return
+        if self._rewrites() != self._seen_rewrites:
+            self._load_cache()
+            return
+        self._data_version = data_version
+        rows = self._conn.execute(
+            f"SELECT {COLUMNS} FROM facts WHERE session_id = ? AND rowid > ? ORDER BY rowid",
+            (self.session_id, self._seen_rowid),
+        ).fetchall()
+        if rows:
+            self.cache.load_facts(self._materialize(rows, self._lineage([row[0] for row in rows])))
+        self._seen_rowid = self._conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM facts").fetchone()[0]
+
+    def refresh(self):
+        """
+        Catch the cache up with what other connections (e.g. other worker
+        processes) committed. A no-op without a cache, and cheap when no
+        other connection has written.
+        """
+        if self.cache is None:
+            return
+        with self._lock:
+            if self._data_version_now() == self._data_version:
+                return
+            with self._snapshot():
+                self._catch_up()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Writes ---
+
+    def _columns(self, subject, predicate, object, metadata: dict) -> tuple:
+        """Validate a fact and return its column values after session_id and id."""
+        for field, value in (("subject", subject), ("predicate", predicate), ("object", object)):
+            if not isinstance(value, str) or not value.strip():
+                raise ValueError(f"{field} must be a non-empty string")
+        valid_from = metadata.get("valid_from") or datetime.utcnow()
+        valid_until = metadata.get("valid_until")
+        if valid_until is not None and valid_until < valid_from:
+            raise ValueError("valid_until must be after or equal to valid_from")
+        return (
+            subject, predicate, object, "active",
+            to_micros(valid_from), to_micros(valid_until) if valid_until is not None else None,
+            metadata.get("source", "FactStore"), metadata.get("provenance"), metadata.get("justification"),
+        )
+
+    def add_fact(self, subject, predicate, object, **metadata) -> UUID:
+        return self.add_facts([(subject, predicate, object, metadata)])[0]
+
+    def add_facts(self, facts: Iterable) -> List[UUID]:
+        """Bulk insert in a single transaction; accepts the same item forms as FactStore.add_facts."""
+        parsed = []
+        for item in facts:
+            if isinstance(item, dict):
+                metadata = dict(item)
+                subject, predicate, object = (metadata.pop(k) for k in ("subject", "predicate", "object"))
+            elif len(item) == 4:
+                subject, predicate, object, metadata = item
+            else:
+                (subject, predicate, object), metadata = item, {}
+            # Validate the whole batch before anything is written
+            parsed.append((subject, predicate, object, metadata, self._columns(subject, predicate, object, metadata)))
+
+        with self._lock:
+            with self._write():
+                # The cache mints row-encoded IDs; without one, fall back to uuid4
+                ids = self.cache.next_ids(len(parsed)) if self.cache is not None else [uuid4() for _ in parsed]
+                rows = [(self.session_id, str(fact_id)) + columns for fact_id, (*_, columns) in zip(ids, parsed)]
+                self._conn.executemany(INSERT_FACT, rows)
+            # Only committed facts reach the cache; a failed insert leaves it untouched
+            if self.cache is not None:
+                self.cache.add_facts([(subject, predicate, object, metadata)
+                                      for subject, predicate, object, metadata, _ in parsed])
+        return ids
+
+    def overwrite_fact(self, old_id, subject, predicate, object, justification, **metadata):
+        columns = self._columns(subject, predicate, object, {**metadata, "justification": justification})
+        with self._lock:
+            with self._write():
+                if not self._exists(old_id):
+                    raise KeyError(old_id)
+                new_id = self.cache.next_ids(1)[0] if self.cache is not None else uuid4()
+                self._conn.execute(INSERT_FACT, (self.session_id, str(new_id)) + columns)
+                # Close the old fact's validity where the new one starts, as FactStore does
+                self._conn.execute(
+                    "UPDATE facts SET state = 'superseded', "
+                    "valid_until = COALESCE(valid_until, MAX(valid_from, ?)) WHERE id = ?",
+                    (columns[4], str(old_id)),
+                )
+                self._conn.execute("INSERT INTO lineage (old_id, new_id) VALUES (?, ?)", (str(old_id), str(new_id)))
+                self._count_rewrite()
+            if self.cache is not None:
+                self.cache.overwrite_fact(old_id, subject, predicate, object, justification, **metadata)
+        return new_id
+
+    def delete_facts_by_provenance(self, provenance_tag: str) -> int:
+        """Delete every fact with this provenance tag, and its lineage links, in one transaction."""
+        with self._lock:
+            with self._write():
+                tagged = "SELECT id FROM facts WHERE session_id = ? AND provenance = ?"
+                self._conn.execute(
+                    f"DELETE FROM lineage WHERE old_id IN ({tagged}) OR new_id IN ({tagged})",
+                    (self.session_id, provenance_tag) * 2,
+                )
+                deleted = self._conn.execute(
+                    "DELETE FROM facts WHERE session_id = ? AND provenance = ?",
+                    (self.session_id, provenance_tag),
+                ).rowcount
+                if deleted:
+                    self._count_rewrite()
+            if self.cache is not None:
+                self.cache.delete_facts_by_provenance(provenance_tag)
+        return deleted
+
+    # --- Reads ---
+
+    def _exists(self, fact_id) -> bool:
+        row = self._conn.execute(
+            "SELECT 1 FROM facts WHERE id = ? AND session_id = ?", (str(fact_id), self.session_id)
+        ).fetchone()
+        return row is not None
+
+    def _where(self, subject=None, predicate=None, state=None, provenance=None, as_of=None, between=None):
+        if as_of is not None and between is not None:
+            raise ValueError("pass either as_of or between, not both")
+        clauses, params = ["session_id = ?"], [self.session_id]
+        for column, value in (("subject", subject), ("predicate", predicate),
+                              ("state", state), ("provenance", provenance)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if as_of is not None:
+            clauses.append("valid_from <= ? AND (valid_until IS NULL OR valid_until > ?)")
+            params += [to_micros(as_of)] * 2
+        elif between is not None:
+            start, end = between
+            if end < start:
+                raise ValueError("between must be a (start, end) pair with start <= end")
+            # Same rule as IntervalIndex.overlapping: valid at start, or starting inside the window
+            clauses.append(
+                "((valid_from <= ? AND (valid_until IS NULL OR valid_until > ?)) OR "
+                "(valid_from > ? AND valid_from < ? AND (valid_until IS NULL OR valid_until > valid_from)))"
+            )
+            lo, hi = to_micros(start), to_micros(end)
+            params += [lo, lo, lo, hi]
+        return " AND ".join(clauses), params
+
+    def _lineage(self, ids: List[str]) -> Dict[str, Dict[str, List[UUID]]]:
+        links = {fact_id: {"replaces": [], "replaced_by": []} for fact_id in ids}
+        marks = ", ".join("?" * len(ids))
+        for old_id, new_id in self._conn.execute(
+            f"SELECT old_id, new_id FROM lineage WHERE old_id IN ({marks}) OR new_id IN ({marks}) ORDER BY rowid",
+            ids + ids,
+        ):
+            if new_id in links:
+                links[new_id]["replaces"].append(UUID(old_id))
+            if old_id in links:
+                links[old_id]["replaced_by"].append(UUID(new_id))
+        return links
+
+    def _materialize(self, rows, links) -> List[Fact]:
+        facts = []
+        for (fact_id, subject, predicate, object, state, valid_from, valid_until,
+             source, provenance, justification) in rows:
+            facts.append(Fact.model_construct(
+                id=UUID(fact_id),
+                subject=subject,
+                predicate=predicate,
+                object=object,
+                state=state,
+                session_id=self.session_id,
+                valid_from=from_micros(valid_from),
+                valid_until=from_micros(valid_until) if valid_until is not None else None,
+                source=source,
+                provenance=provenance,
+                justification=justification,
+                **links[fact_id],
+            ))
+        return facts
+
+    def iter_facts(self, subject=None, predicate=None, state=None, provenance=None,
+                   as_of: Optional[datetime] = None, between: Optional[tuple] = None,
+                   batch_size: int = 256) -> Iterator[Fact]:
+        """Stream matching facts from the database, batch_size rows at a time."""
+        where, params = self._where(subject, predicate, state, provenance, as_of, between)
+        with self._lock:
+            cursor = self._conn.execute(f"SELECT {COLUMNS} FROM facts WHERE {where} ORDER BY rowid", params)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                links = self._lineage([row[0] for row in rows])
+            yield from self._materialize(rows, links)
+
+    def get_facts(self, subject=None, predicate=None, state=None, provenance=None,
+                  as_of: Optional[datetime] = None, between: Optional[tuple] = None) -> List[Fact]:
+        if self.cache is not None:
+            self.refresh()
+            return self.cache.get_facts(subject, predicate, state, provenance, as_of, between)
+        return list(self.iter_facts(subject, predicate, state, provenance, as_of, between))
+
+    def count_facts(self, subject=None, predicate=None, state=None, provenance=None,
+                    as_of: Optional[datetime] = None, between: Optional[tuple] = None) -> int:
+        if self.cache is not None:
+            self.refresh()
+            return self.cache.count_facts(subject, predicate, state, provenance, as_of, between)
+        where, params = self._where(subject, predicate, state, provenance, as_of, between)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM facts WHERE {where}", params).fetchone()[0]
+
+    def get_fact(self, fact_id) -> Fact:
+        if self.cache is not None:
+            self.refresh()
+            return self.cache.get_fact(fact_id)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {COLUMNS} FROM facts WHERE id = ? AND session_id = ?", (str(fact_id), self.session_id)
+            ).fetchall()
+            if not rows:
+                raise KeyError(fact_id)
+            return self._materialize(rows, self._lineage([rows[0][0]]))[0]
+
+    def get_lineage(self, fact_id) -> Dict:
+        if self.cache is not None:
+            self.refresh()
+            return self.cache.get_lineage(fact_id)
+        fact = self.get_fact(fact_id)
+        head = self.current_head(fact_id)
+        return {"replaces": fact.replaces, "replaced_by": fact.replaced_by, "state": fact.state, "head": head.id}
+
+    # --- Lineage ---
+
+    def _chain_facts(self, fact_id) -> list:
+        """Every fact connected to fact_id by lineage links, in write order."""
+        # UNION (not UNION ALL) drops revisited IDs, so the walk terminates on cycles
+        with self._lock:
+            rows = self._conn.execute(f"""
+                WITH RECURSIVE chain(id) AS (
+                    SELECT ?
+                    UNION
+                    SELECT lineage.old_id FROM lineage JOIN chain ON lineage.new_id = chain.id
+                    UNION
+                    SELECT lineage.new_id FROM lineage JOIN chain ON lineage.old_id = chain.id
+                )
+                SELECT {COLUMNS} FROM facts WHERE session_id = ? AND id IN (SELECT id FROM chain)
+                ORDER BY rowid
+            """, (str(fact_id), self.session_id)).fetchall()
+            if not any(row[0] == str(fact_id) for row in rows):
+                raise KeyError(fact_id)
+            return self._materialize(rows, self._lineage([row[0] for row in rows]))
+
+    def get_chain(self, fact_id) -> List[Fact]:
+        """Every revision linked to this fact by overwrites, oldest write first."""
+        if self.cache is not None:
+            self.refresh()
+            return self.cache.get_chain(fact_id)
+        return self._chain_facts(fact_id)
+
+    def current_head(self, fact_id) -> Fact:
+        """The latest revision of the fact's chain."""
+        if self.cache is not None:
+            self.refresh()
+            return self.cache.current_head(fact_id)
+        chain = self._chain_facts(fact_id)
+        live = {fact.id for fact in chain}
+        return next(f for f in reversed(chain) if not any(r in live for r in f.replaced_by))
+
+    def history(self, subject, predicate=None) -> List[List[Fact]]:
+        """Chains with a fact about `subject` (and `predicate`), each oldest write first."""
+        if self.cache is not None:
+            self.refresh()
+            return self.cache.history(subject, predicate)
+        chains, seen = [], set()
+        for fact in self.iter_facts(subject=subject, predicate=predicate):
+            if fact.id not in seen:
+                chain = self._chain_facts(fact.id)
+                seen.update(f.id for f in chain)
+                chains.append(chain)
+        return chains
+
+    def resolve_contradictions(self, subject, predicate=None) -> List[Fact]:
+        if self.cache is not None:
+            self.refresh()
+            return self.cache.resolve_contradictions(subject, predicate)
+        return [f for f in self.iter_facts(subject=subject, predicate=predicate) if f.state != "superseded"]
+
+    def export_session(self, session_id) -> List[Fact]:
+        if session_id != self.session_id:
+            return []
+        return list(self.iter_facts())
+
+    def __len__(self):
+        return self.count_facts()
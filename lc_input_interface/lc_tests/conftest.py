@@ -0,0 +1,71 @@
+# conftest.py
+#
+# lc_core reads its settings from lc_core/config.py, which each deployment
+# creates from config_sample.py and which is not committed. Tests always run
+# against the sample, with its on-disk paths moved into a scratch directory,
+# so they neither depend on nor touch a local configuration.
+
+import importlib.util
+import os
+import sys
+import tempfile
+import zlib
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+
+_SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lc_core", "config_sample.py")
+_SCRATCH = tempfile.mkdtemp(prefix="lc_tests-")
+
+
+def _sample_config():
+    spec = importlib.util.spec_from_file_location("lc_core.config", _SAMPLE)
+    config = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(config)
+    for name, value in vars(config).items():
+        if isinstance(value, str) and value.startswith("lc_core/vectorstore"):
+            setattr(config, name, os.path.join(_SCRATCH, value[len("lc_core/"):]))
+    return config
+
+
+sys.modules["lc_core.config"] = _sample_config()
+
+
+class HashModel(Embeddings):
+    """
+    Stands in for BGEEmbedding so no model is downloaded: a hashed bag of
+    words, L2-normalised. Records every text it is asked to encode.
+    """
+
+    dimension = 256
+
+    def __init__(self, *args, **kwargs):
+        self.model_name = "hash"
+        self.encoded = []
+
+    def encode(self, texts):
+        self.encoded.extend(texts)
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, zlib.crc32(word.encode("utf-8")) % self.dimension] += 1.0
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    def embed_documents(self, texts):
+        return self.encode(texts).tolist()
+
+    def embed_query(self, text):
+        return self.encode([text])[0].tolist()
+
+
+@pytest.fixture
+def hash_memory(monkeypatch, tmp_path):
+    """A VectorStoreMemory on HashModel, persisting under tmp_path."""
+    from lc_core import memory_manager
+
+    monkeypatch.setattr(memory_manager, "BGEEmbedding", HashModel)
+    memory = memory_manager.VectorStoreMemory()
+    memory.root = str(tmp_path)
+    yield memory
+    memory.ingest.close()
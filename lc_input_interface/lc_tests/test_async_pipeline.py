@@ -0,0 +1,99 @@
+# test_async_pipeline.py
+
+import asyncio
+import time
+
+import pytest
+
+import lc_core
+from lc_core.chain_manager import ChainManager
+from lc_core.response_cache import ResponseCache
+
+LLM_DELAY = 0.2
+
+
+class SlowChain:
+    """Stands in for prompt | llm: answers after LLM_DELAY without holding a thread."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, inputs):
+        self.calls += 1
+        await asyncio.sleep(LLM_DELAY)
+        return f"answer to {inputs['question']}"
+
+    async def astream(self, inputs):
+        self.calls += 1
+        for word in f"answer to {inputs['question']}".split():
+            await asyncio.sleep(LLM_DELAY / 4)
+            yield word + " "
+
+
+@pytest.fixture
+def pipeline(hash_memory, monkeypatch):
+    chain_manager = ChainManager(hash_memory, cache=ResponseCache(100, None, None))
+    chain_manager._chain = SlowChain()
+    monkeypatch.setattr(lc_core, "_memory_manager", hash_memory)
+    monkeypatch.setattr(lc_core, "_chain_manager", chain_manager)
+    return hash_memory, chain_manager
+
+
+def test_concurrent_turns_overlap_their_llm_calls(pipeline):
+    memory, chain_manager = pipeline
+    memory.add(["the innkeeper is called Barliman"], "s0")
+
+    async def turns():
+        return await asyncio.gather(*(
+            lc_core.process_turn_async(f"who runs the inn {i}?", session_id=f"s{i}") for i in range(6)
+        ))
+
+    started = time.perf_counter()
+    results = asyncio.run(turns())
+    elapsed = time.perf_counter() - started
+
+    assert [ctx.response for ctx in results] == [f"answer to who runs the inn {i}?" for i in range(6)]
+    assert results[0].docs and results[0].docs[0].page_content == "the innkeeper is called Barliman"
+    assert all({"llm", "store"} <= set(ctx.timings) for ctx in results)
+    # Six awaited completions overlap instead of running back to back
+    assert elapsed < 6 * LLM_DELAY
+    lc_core.flush_writes()
+    assert [doc.page_content for doc in memory.search("who runs the inn", 5, "s3")] == \
+        ["User: who runs the inn 3?\nAI: answer to who runs the inn 3?"]
+
+
+def test_process_input_async_returns_the_response(pipeline):
+    memory, chain_manager = pipeline
+    assert asyncio.run(lc_core.process_input_async("where is the ring", session_id="s")) == \
+        "answer to where is the ring"
+    lc_core.flush_writes()
+    assert memory.size("s") == 1
+
+
+def test_stream_turn_async_yields_tokens_and_writes_the_turn(pipeline):
+    memory, chain_manager = pipeline
+
+    async def stream():
+        ctx, tokens = await lc_core.stream_turn_async("where is the ring", session_id="s")
+        return ctx, [token async for token in tokens]
+
+    ctx, tokens = asyncio.run(stream())
+    assert "".join(tokens).strip() == "answer to where is the ring"
+    assert ctx.response == "".join(tokens) and ctx.first_token is not None
+    lc_core.flush_writes()
+    assert memory.size("s") == 1
+
+
+def test_repeated_async_turn_is_served_from_the_cache(pipeline, monkeypatch):
+    memory, chain_manager = pipeline
+    # The first turn's write-back would change what the second retrieves (and so the cache key)
+    monkeypatch.setattr(lc_core, "_write_turn", lambda *args: None)
+
+    async def twice():
+        first = await lc_core.process_turn_async("what is the password", session_id="s")
+        second = await lc_core.process_turn_async("what is the password", session_id="s")
+        return first, second
+
+    first, second = asyncio.run(twice())
+    assert not first.cached and second.cached
+    assert second.response == first.response and chain_manager._chain.calls == 1
@@ -0,0 +1,29 @@
+# test_benchmark_suite.py
+
+import json
+import sys
+
+from benchmarks import suite
+
+
+def test_regressions_compare_each_metric_in_its_direction():
+    baseline = {"memory": {"docs": 1000, "add_docs_per_s": 100.0, "search_p95_ms": 2.0, "save_s": 1.0}}
+    results = {"memory": {"docs": 2000, "add_docs_per_s": 70.0, "search_p95_ms": 2.3, "save_s": 1.5}}
+    found = suite.regressions(results, baseline, tolerance=0.2)
+    assert [line.split(":")[0] for line in found] == ["memory.add_docs_per_s", "memory.save_s"]
+    assert suite.regressions(results, baseline, tolerance=0.6) == []
+
+
+def test_suite_runs_every_benchmark_at_a_small_scale(tmp_path, monkeypatch):
+    output = tmp_path / "results.json"
+    monkeypatch.setattr(sys, "argv", ["suite", "--scale", "200", "--embed-texts", "50", "--batch", "64",
+                                      "--queries", "5", "--turns", "3", "--dim", "64", "--output", str(output)])
+    suite.main()
+    report = json.loads(output.read_text())
+    assert set(report["results"]) == set(suite.BENCHMARKS)
+    assert report["results"]["memory"]["docs"] == 200 and report["meta"]["params"]["scale"] == 200
+
+    # The same numbers as a baseline pass the comparison
+    monkeypatch.setattr(sys, "argv", ["suite", "--scale", "200", "--only", "facts", "--baseline", str(output),
+                                      "--tolerance", "1000"])
+    suite.main()
@@ -0,0 +1,63 @@
+# test_bge_embedding.py
+
+import zlib
+
+import numpy as np
+
+from lc_core.bge_embedding import BGEEmbedding
+
+
+class FakeSentenceTransformer:
+    """Per-text deterministic vectors, so a text's row does not depend on its batch."""
+
+    def __init__(self, dimension=16):
+        self.dimension = dimension
+        self.batches = []
+
+    def tokenizer(self, texts, add_special_tokens=False):
+        return {"input_ids": [text.split() for text in texts]}
+
+    def get_sentence_embedding_dimension(self):
+        return self.dimension
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=False, show_progress_bar=False):
+        self.batches.append(list(texts))
+        vectors = np.stack([
+            np.random.default_rng(zlib.crc32(text.encode("utf-8"))).standard_normal(self.dimension)
+            for text in texts
+        ]).astype(np.float32)
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+
+def make_embedding(batch_size=4, normalize=False):
+    # Skips __init__, which would load a sentence-transformers model
+    embedding = BGEEmbedding.__new__(BGEEmbedding)
+    embedding.model_name = "fake"
+    embedding.batch_size = batch_size
+    embedding.normalize = normalize
+    embedding.model = FakeSentenceTransformer()
+    return embedding
+
+
+def test_bucketed_encode_matches_unbucketed_order_and_values():
+    texts = [" ".join(["word"] * n) + f" {i}" for i, n in enumerate([9, 1, 30, 4, 4, 17, 2, 12, 6, 1, 25])]
+    embedding = make_embedding(batch_size=4)
+
+    vectors = embedding.encode(texts)
+    expected = FakeSentenceTransformer().encode(texts)
+
+    assert vectors.dtype == np.float32 and vectors.flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(vectors, expected)
+    # Batches were formed from length-sorted texts
+    lengths = [[len(text.split()) for text in batch] for batch in embedding.model.batches]
+    assert [n for batch in lengths for n in batch] == sorted(len(text.split()) for text in texts)
+    assert all(len(batch) <= 4 for batch in lengths)
+
+
+def test_encode_normalizes_and_handles_empty_input():
+    embedding = make_embedding(normalize=True)
+    vectors = embedding.encode(["a b c", "d"])
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-5)
+    assert embedding.encode([]).shape == (0, 16)
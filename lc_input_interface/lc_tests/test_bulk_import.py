@@ -0,0 +1,68 @@
+# test_bulk_import.py
+
+import io
+import json
+
+import pytest
+
+from input_providers.bulk import BulkImportProvider, TokenSplitter, estimate_tokens
+
+
+def test_splitter_chunks_stay_near_size_and_overlap():
+    words = [f"w{i}" for i in range(1000)]
+    lines = [" ".join(words[i:i + 10]) + "\n" for i in range(0, len(words), 10)]
+    chunks = list(TokenSplitter(chunk_tokens=100, overlap_tokens=20).split(lines))
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert sum(estimate_tokens(w) for w in chunk.split()) <= 100
+    for previous, chunk in zip(chunks, chunks[1:]):
+        # The next chunk repeats the tail of the previous one, up to overlap_tokens
+        previous, chunk = previous.split(), chunk.split()
+        start = previous.index(chunk[0])
+        overlap = previous[start:]
+        assert chunk[:len(overlap)] == overlap
+        assert 0 < sum(estimate_tokens(w) for w in overlap) <= 20
+    # Every word is imported, in order
+    seen = []
+    for chunk in chunks:
+        for word in chunk.split():
+            if word not in seen[-40:]:
+                seen.append(word)
+    assert seen == words
+
+
+def test_splitter_rejects_overlap_not_below_chunk_size():
+    with pytest.raises(ValueError):
+        TokenSplitter(chunk_tokens=50, overlap_tokens=50)
+
+
+def test_jsonl_text_fields_are_extracted(tmp_path):
+    path = tmp_path / "transcript.jsonl"
+    path.write_text("\n".join([
+        json.dumps({"ts": 1, "text": "Alice opens the door"}),
+        "",
+        json.dumps({"message": "Bob follows"}),
+        "not json",
+    ]) + "\n")
+
+    provider = BulkImportProvider(str(path))
+    assert list(provider.chunks()) == ["Alice opens the door\nBob follows\nnot json"]
+    assert provider.progress == 1.0
+
+
+def test_stream_source_reports_progress_and_ends_with_none():
+    data = ("lorem ipsum dolor sit amet\n" * 200).encode()
+    provider = BulkImportProvider(io.BytesIO(data), filename="notes.md", chunk_tokens=50, overlap_tokens=0)
+    assert provider.total_bytes == len(data)
+
+    first = provider.get_next_chunk()
+    assert first and 0 < provider.progress < 1
+    while provider.get_next_chunk() is not None:
+        pass
+    assert provider.bytes_read == len(data)
+
+
+def test_unsupported_extension_is_rejected():
+    with pytest.raises(ValueError):
+        BulkImportProvider(io.BytesIO(b"data"), filename="dump.csv")
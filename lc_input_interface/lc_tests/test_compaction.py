@@ -0,0 +1,129 @@
+# test_compaction.py
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from benchmarks.fake_embedding import in_memory_manager
+from lc_core.compaction import SUMMARY_PREFIX, CompactionArchive, Compactor, ExtractiveSummarizer
+from lc_core.hybrid_retrieval import FactMemory
+
+NOW = 1_000_000.0
+TURNS = [
+    "User: who guards the bridge?\nAI: Gandalf is a wizard. The bridge spans the chasm.",
+    "User: what lies below?\nAI: Durin has a tower. Shadow fills the depths.",
+    "User: where do we go next?\nAI: Lorien is a forest. The elves dwell there.",
+]
+
+
+@pytest.fixture
+def memory():
+    memory = in_memory_manager()
+    yield memory
+    memory.ingest.close()
+
+
+def make_compactor(memory, facts=None, **kwargs):
+    return Compactor(memory, facts, ExtractiveSummarizer(), archive=CompactionArchive(None),
+                     window=3600, group_size=20, keep_recent=0, min_age=60, **kwargs)
+
+
+def add_turns(memory, session_id="s", at=NOW - 600):
+    metadatas = [{"kind": "turn", "created_at": at + i} for i in range(len(TURNS))]
+    return memory.add(TURNS, session_id, metadatas=metadatas, dedup=False)
+
+
+def stored(memory, session_id="s"):
+    docs = memory.documents(session_id)
+    return {doc.page_content: memory.vectors(session_id, [doc.id])[0] for doc in docs}
+
+
+def test_compact_archive_rollback_round_trip(memory):
+    facts = FactMemory(None)
+    compactor = make_compactor(memory, facts)
+    add_turns(memory)
+    before = stored(memory)
+
+    result = compactor.compact("s", now=NOW)
+    docs = memory.documents("s")
+    assert result.turns == 3 and result.summaries == 1 and result.facts > 0
+    assert [doc.metadata["provenance"] for doc in docs] == [result.tag]
+    assert docs[0].page_content.startswith(SUMMARY_PREFIX)
+    assert compactor.archive.tags("s") == [result.tag]
+    assert facts.get("s").get_facts(provenance=result.tag)
+
+    assert compactor.rollback("s", result.tag) == 3
+    after = stored(memory)
+    assert sorted(after) == sorted(before)
+    for text, vector in before.items():
+        np.testing.assert_array_equal(after[text], vector)
+    assert not facts.get("s").get_facts(provenance=result.tag)
+    assert compactor.archive.tags("s") == []
+
+
+def test_compaction_is_idempotent(memory):
+    compactor = make_compactor(memory)
+    add_turns(memory)
+    assert compactor.compact("s", now=NOW) is not None
+    summaries = memory.documents("s")
+
+    assert compactor.compact("s", now=NOW) is None
+    assert memory.documents("s") == summaries
+
+
+def test_archived_vectors_are_copied_not_re_encoded(memory):
+    compactor = make_compactor(memory)
+    add_turns(memory)
+    before = stored(memory)
+    calls = []
+    encode = memory._model.encode
+    memory._model.encode = lambda texts: calls.append(list(texts)) or encode(texts)
+
+    result = compactor.compact("s", now=NOW)
+    records, vectors = compactor.archive.load("s", result.tag)
+    assert [record["text"] for record in records] not in calls
+    for record, vector in zip(records, vectors):
+        np.testing.assert_array_equal(vector, before[record["text"]])
+
+
+def test_restored_turns_are_compacted_again_once_old_enough(memory):
+    compactor = make_compactor(memory)
+    add_turns(memory)
+    tag = compactor.compact("s", now=NOW).tag
+    compactor.rollback("s", tag)
+    restored_at = memory.documents("s")[0].metadata["restored_at"]
+
+    assert compactor.compact("s", now=restored_at + 1) is None
+    result = compactor.compact("s", now=restored_at + 61)
+    assert result is not None and result.turns == 3
+
+
+def test_compactors_sharing_a_lock_file_do_not_duplicate_summaries(memory, tmp_path):
+    # Two workers' compactors over one shared memory, each with its own thread lock
+    add_turns(memory)
+    entered = threading.Barrier(2)
+    lock_path = str(tmp_path / "compaction.lock")
+
+    def slow_summary(turns):
+        time.sleep(0.2)
+        return ExtractiveSummarizer()(turns)
+
+    compactors = [make_compactor(memory, lock_path=lock_path) for _ in range(2)]
+    for compactor in compactors:
+        compactor.summarizer = slow_summary
+    results = []
+
+    def run(compactor):
+        entered.wait()
+        results.append(compactor.compact("s", now=NOW))
+
+    threads = [threading.Thread(target=run, args=(compactor,)) for compactor in compactors]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(result is None for result in results) == [False, True]
+    assert len(memory.documents("s")) == 1
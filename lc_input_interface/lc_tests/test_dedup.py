@@ -0,0 +1,85 @@
+# test_dedup.py
+
+import numpy as np
+import pytest
+
+from benchmarks.fake_embedding import in_memory_manager
+from lc_core.dedup import Deduplicator, merge_metadata, simhashes
+
+LONG = "the party follows the river north past the old mill until the bridge where the troll waits for travellers"
+
+
+def unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_exact_repeat_matches_whatever_the_whitespace():
+    dedup = Deduplicator(window=8, simhash_distance=None, similarity=None)
+    assert dedup.check(["the gate is locked"], None, ["a"]) == [None]
+    assert dedup.check(["the  gate is\nlocked", "the gate is open"], None, ["b", "c"]) == [("a", "exact"), None]
+
+
+def test_simhash_catches_a_near_copy_but_not_unrelated_text():
+    # Case, punctuation and a trailing word differ; the content hash does not match
+    near = LONG.capitalize() + ". Again"
+    assert int(np.bitwise_count(simhashes([LONG])[0] ^ simhashes([near])[0])) <= 4
+    dedup = Deduplicator(window=8, simhash_distance=4, similarity=None)
+    dedup.check([LONG], None, ["a"])
+    assert dedup.check([near, "a dragon circles the tower at dawn"], None, ["b", "c"]) == [("a", "simhash"), None]
+
+
+def test_cosine_check_needs_vectors_and_the_threshold():
+    dedup = Deduplicator(window=8, simhash_distance=None, similarity=0.97)
+    dedup.check(["first text"], np.stack([unit(1, 0, 0)]), ["a"])
+    close, far = unit(1, 0.1, 0), unit(1, 1, 0)
+    assert dedup.check(["second text", "third text"], np.stack([close, far]), ["b", "c"]) == [("a", "embedding"), None]
+    # Without vectors only the text checks run
+    assert dedup.check(["fourth text"], None, ["d"]) == [None]
+
+
+def test_repeats_within_one_batch_are_caught():
+    dedup = Deduplicator(window=8, simhash_distance=4, similarity=None)
+    assert dedup.check(["same words here", "same words here"], None, ["a", "b"]) == [None, ("a", "exact")]
+
+
+def test_merge_metadata_unions_lists_and_counts():
+    merged = merge_metadata({"context_ids": ["x"], "source": "log"}, {"context_ids": ["x", "y"], "page": 2})
+    assert merged == {"context_ids": ["x", "y"], "source": "log", "page": 2, "duplicates": 1}
+
+
+@pytest.fixture
+def memory():
+    memory = in_memory_manager()
+    yield memory
+    memory.ingest.close()
+
+
+def test_repeated_turn_is_merged_into_the_stored_document(memory):
+    turn = "User: open the chest\nAI: It is empty."
+    first = memory.add([turn], "s", metadatas=[{"context_ids": ["a"]}])
+    second = memory.add([turn], "s", metadatas=[{"context_ids": ["b"]}])
+    assert first == second and memory.size("s") == 1
+    assert memory.documents("s")[0].metadata["context_ids"] == ["a", "b"]
+
+
+def test_dedup_false_keeps_every_copy(memory):
+    turn = "User: open the chest\nAI: It is empty."
+    ids = memory.add([turn, turn], "s", dedup=False)
+    assert ids[0] != ids[1] and memory.size("s") == 2
+
+
+def test_embedding_level_dedup_is_opt_in_for_turns(memory):
+    # Same words in another order: same bag-of-words embedding, unrelated shingles
+    turns = ["User: I attack again\nAI: The orc staggers back", "User: again I attack\nAI: back staggers the orc"]
+    memory.add(turns[:1], "turns")
+    memory.add(turns[1:], "turns")
+    assert memory.size("turns") == 2
+
+    memory.add(turns[:1], "opted", dedup_embeddings=True)
+    memory.add(turns[1:], "opted", dedup_embeddings=True)
+    assert memory.size("opted") == 1
+
+    # Imports opt in
+    assert memory.import_texts(turns, "imported") == 2
+    assert memory.size("imported") == 1
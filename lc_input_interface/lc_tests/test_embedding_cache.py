@@ -0,0 +1,128 @@
+# test_embedding_cache.py
+
+import os
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from lc_core.embedding_cache import KEY_SIZE, CachedEmbedding, DiskEmbeddingStore, cache_key
+
+
+class Counting(Embeddings):
+    """A model whose vector for a text is its length, recording what it was asked to encode."""
+
+    dimension = 4
+    model_name = "counting"
+
+    def __init__(self):
+        self.encoded = []
+
+    def embed_documents(self, texts):
+        self.encoded.extend(texts)
+        return [[float(len(text))] * self.dimension for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def test_repeated_texts_are_encoded_once():
+    cache = CachedEmbedding(Counting(), max_entries=10)
+    vectors = cache.embed_documents(["ab", "abc", "ab"])
+    assert cache.embed_query("abc") == vectors[1] == [3.0] * 4
+
+    assert cache.base.encoded == ["ab", "abc"]
+    assert cache.stats()["misses"] == 2 and cache.stats()["hits"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = CachedEmbedding(Counting(), max_entries=2)
+    cache.embed_documents(["a", "bb"])
+    cache.embed_query("a")             # "bb" is now the oldest
+    cache.embed_query("ccc")
+    cache.embed_documents(["a", "bb"])
+    assert cache.base.encoded == ["a", "bb", "ccc", "bb"]
+    assert cache.stats()["memory_entries"] == 2
+
+
+def test_disk_tier_is_shared_by_a_new_instance(tmp_path):
+    first = CachedEmbedding(Counting(), max_entries=10, disk_path=str(tmp_path))
+    first.embed_documents(["one", "three"])
+
+    second = CachedEmbedding(Counting(), max_entries=10, disk_path=str(tmp_path))
+    np.testing.assert_array_equal(second.embed_documents(["three", "one"]), [[5.0] * 4, [3.0] * 4])
+    assert second.base.encoded == [] and second.stats()["disk_hits"] == 2
+
+
+def key(name):
+    return cache_key("model", name)
+
+
+def vector(value, dimension=4):
+    return np.full(dimension, value, dtype=np.float32)
+
+
+def test_torn_append_is_cut_off_so_new_keys_line_up(tmp_path):
+    store = DiskEmbeddingStore(str(tmp_path), 4)
+    store.put_many([key("a"), key("b")], np.stack([vector(1), vector(2)]))
+    # A crash between the vector and key writes leaves an orphan row
+    with open(store.vectors_path, "ab") as f:
+        f.write(vector(9).tobytes())
+
+    reopened = DiskEmbeddingStore(str(tmp_path), 4)
+    assert os.path.getsize(reopened.vectors_path) == 2 * 16
+    reopened.put_many([key("c")], np.stack([vector(3)]))
+
+    again = DiskEmbeddingStore(str(tmp_path), 4)
+    for name, value in (("a", 1), ("b", 2), ("c", 3)):
+        np.testing.assert_array_equal(again.get(key(name)), vector(value))
+
+
+def test_torn_key_write_is_dropped(tmp_path):
+    store = DiskEmbeddingStore(str(tmp_path), 4)
+    store.put_many([key("a")], np.stack([vector(1)]))
+    with open(store.keys_path, "ab") as f:
+        f.write(key("b")[:KEY_SIZE // 2])
+
+    reopened = DiskEmbeddingStore(str(tmp_path), 4)
+    assert len(reopened) == 1 and os.path.getsize(reopened.keys_path) == KEY_SIZE
+    reopened.put_many([key("c")], np.stack([vector(3)]))
+    np.testing.assert_array_equal(DiskEmbeddingStore(str(tmp_path), 4).get(key("c")), vector(3))
+
+
+def test_stores_sharing_a_directory_append_without_clobbering(tmp_path):
+    # Two workers open the same cache, then both append
+    first = DiskEmbeddingStore(str(tmp_path), 4)
+    second = DiskEmbeddingStore(str(tmp_path), 4)
+    first.put_many([key("a"), key("b")], np.stack([vector(1), vector(2)]))
+    second.put_many([key("c"), key("a")], np.stack([vector(3), vector(1)]))
+    first.put_many([key("d")], np.stack([vector(4)]))
+
+    for store in (first, second, DiskEmbeddingStore(str(tmp_path), 4)):
+        for name, value in (("a", 1), ("c", 3), ("d", 4)):
+            if key(name) in store.rows:
+                np.testing.assert_array_equal(store.get(key(name)), vector(value))
+    assert len(DiskEmbeddingStore(str(tmp_path), 4)) == 4
+
+
+class Base:
+    dimension = 4
+
+    def __init__(self, normalize):
+        self.model_name = "model"
+        self.normalize = normalize
+        self.calls = 0
+
+    def encode(self, texts):
+        self.calls += 1
+        return np.stack([vector(0.5 if self.normalize else 2.0) for _ in texts])
+
+
+def test_normalized_and_raw_vectors_do_not_share_entries(tmp_path):
+    raw = CachedEmbedding(Base(normalize=False), disk_path=str(tmp_path))
+    normalized = CachedEmbedding(Base(normalize=True), disk_path=str(tmp_path))
+    raw_vector = raw.encode(["same text"])[0]
+    normalized_vector = normalized.encode(["same text"])[0]
+
+    assert normalized.base.calls == 1
+    assert raw_vector[0] == 2.0 and normalized_vector[0] == 0.5
+    assert cache_key("model", "x", True) != cache_key("model", "x", False)
@@ -0,0 +1,71 @@
+# test_fact_store_columnar.py
+
+from uuid import UUID
+
+import pytest
+
+from lc_memory.fact_store import FactStore
+
+
+def test_add_facts_accepts_tuples_and_dicts():
+    store = FactStore("test-session")
+    ids = store.add_facts([
+        ("dragon", "breathes", "fire"),
+        ("dragon", "hoards", "gold", {"provenance": "myth"}),
+        {"subject": "knight", "predicate": "wields", "object": "sword", "source": "import"},
+    ])
+    assert all(isinstance(fid, UUID) for fid in ids)
+    assert len(store) == 3
+    assert store.facts[ids[1]].provenance == "myth"
+    assert store.facts[ids[2]].source == "import"
+
+
+def test_query_matches_brute_force():
+    store = FactStore("test-session")
+    store.add_facts((f"npc{i % 7}", f"rel{i % 3}", f"obj{i}", {"provenance": f"log{i % 2}"}) for i in range(200))
+    expected = {
+        f.id for f in store.export_session("test-session")
+        if f.subject == "npc3" and f.predicate == "rel1" and f.provenance == "log0"
+    }
+    found = {f.id for f in store.get_facts(subject="npc3", predicate="rel1", provenance="log0")}
+    assert found == expected
+    assert store.count_facts(subject="npc3", predicate="rel1", provenance="log0") == len(expected)
+
+
+def test_unknown_keys_return_nothing():
+    store = FactStore("test-session")
+    store.add_fact("wizard", "casts", "spell")
+    assert store.get_facts(subject="nobody") == []
+    assert store.get_facts(state="bogus") == []
+
+
+def test_delete_by_provenance_prunes_postings():
+    store = FactStore("test-session")
+    keep = store.add_fact("wizard", "casts", "spell", provenance="book1")
+    drop = store.add_fact("wizard", "casts", "curse", provenance="book2")
+    store.delete_facts_by_provenance("book2")
+    assert drop not in store.facts
+    assert store.by_subject["wizard"] == {keep}
+    assert [f.id for f in store.get_facts(predicate="casts")] == [keep]
+    with pytest.raises(KeyError):
+        store.get_fact(drop)
+
+
+def test_overwrite_records_justification():
+    store = FactStore("test-session")
+    old = store.add_fact("king", "rules", "kingdom")
+    new = store.overwrite_fact(old, "king", "rules", "empire", justification="conquest")
+    assert store.facts[new].justification == "conquest"
+    assert store.get_facts(subject="king", state="active")[0].id == new
+
+
+def test_load_facts_round_trips_export():
+    source = FactStore("test-session")
+    old = source.add_fact("ship", "named", "Endeavour", provenance="log1")
+    new = source.overwrite_fact(old, "ship", "named", "Resolution", justification="renamed")
+
+    target = FactStore("test-session")
+    assert target.load_facts(source.export_session("test-session")) == 2
+    assert target.facts[old].state == "superseded"
+    assert target.get_lineage(new)["replaces"] == [old]
+    assert target.facts[new] == source.facts[new]
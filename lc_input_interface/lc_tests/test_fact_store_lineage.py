@@ -0,0 +1,72 @@
+# test_fact_store_lineage.py
+
+import pytest
+
+from lc_memory.fact_store import FactStore
+from lc_memory.lineage import LineageCycleError, LineageIndex
+from lc_memory.schema import Fact
+from lc_memory.sqlite_store import SQLiteFactStore
+
+
+def revise(store, fact_id, *objects):
+    ids = [fact_id]
+    for obj in objects:
+        ids.append(store.overwrite_fact(ids[-1], "king", "rules", obj, justification=f"now {obj}"))
+    return ids
+
+
+@pytest.fixture(params=["memory", "sqlite-cached", "sqlite-uncached"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield FactStore("test-session")
+        return
+    store = SQLiteFactStore("test-session", str(tmp_path / "facts.db"), cache=request.param == "sqlite-cached")
+    yield store
+    store.close()
+
+
+def test_chain_head_and_history(store):
+    ids = revise(store, store.add_fact("king", "rules", "kingdom"), "empire", "republic")
+    other = store.add_fact("king", "wears", "crown")
+
+    assert [f.id for f in store.get_chain(ids[1])] == ids
+    assert store.current_head(ids[0]).id == ids[-1]
+    assert store.get_lineage(ids[0])["head"] == ids[-1]
+    assert [[f.id for f in chain] for chain in store.history("king")] == [ids, [other]]
+    assert [[f.id for f in chain] for chain in store.history("king", "rules")] == [ids]
+    assert {f.id for f in store.resolve_contradictions("king")} == {ids[-1], other}
+    assert [f.id for f in store.resolve_contradictions("king", "rules")] == [ids[-1]]
+
+
+def test_head_falls_back_when_latest_revision_is_deleted():
+    store = FactStore("test-session")
+    first = store.add_fact("king", "rules", "kingdom")
+    second = store.overwrite_fact(first, "king", "rules", "empire", justification="x")
+    store.overwrite_fact(second, "king", "rules", "ruin", justification="y", provenance="bad-log")
+    store.delete_facts_by_provenance("bad-log")
+    assert store.current_head(first).id == second
+
+
+def test_chains_merge_when_loaded_out_of_order():
+    source = FactStore("test-session")
+    ids = revise(source, source.add_fact("king", "rules", "kingdom"), "empire", "republic")
+    target = FactStore("test-session")
+    target.load_facts(reversed(source.export_session("test-session")))
+    assert {f.id for f in target.get_chain(ids[0])} == set(ids)
+    assert target.current_head(ids[0]).id == ids[-1]
+
+
+def test_cycles_are_rejected():
+    index = LineageIndex()
+    for row in range(3):
+        index.append(row)
+    index.link(0, 1)
+    index.link(1, 2)
+    with pytest.raises(LineageCycleError):
+        index.link(2, 0)
+
+    a = Fact(subject="a", predicate="p", object="x", state="active", session_id="s", source="t")
+    b = Fact(subject="a", predicate="p", object="y", state="active", session_id="s", source="t",
+             replaces=[a.id], replaced_by=[a.id])
+    with pytest.raises(LineageCycleError):
+        FactStore("s").load_facts([a, b])
@@ -0,0 +1,107 @@
+# test_fact_store_temporal.py
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from lc_memory import interval_index
+from lc_memory.fact_store import FactStore
+from lc_memory.sqlite_store import SQLiteFactStore
+
+T0 = datetime(2024, 1, 1)
+
+
+def day(n):
+    return T0 + timedelta(days=n)
+
+
+def test_overwrite_closes_validity_and_as_of_sees_history():
+    store = FactStore("test-session")
+    old = store.add_fact("king", "rules", "kingdom", valid_from=day(0))
+    new = store.overwrite_fact(old, "king", "rules", "empire", justification="conquest", valid_from=day(10))
+
+    assert store.facts[old].valid_until == day(10)
+    assert [f.id for f in store.get_facts(subject="king", as_of=day(5))] == [old]
+    assert [f.id for f in store.get_facts(subject="king", as_of=day(10))] == [new]
+    assert store.get_facts(subject="king", as_of=day(-1)) == []
+    assert {f.id for f in store.get_facts(subject="king", between=(day(5), day(15)))} == {old, new}
+
+
+def test_temporal_queries_match_brute_force():
+    rng = random.Random(7)
+    store = FactStore("test-session")
+    for i in range(400):
+        start = rng.randrange(0, 100)
+        end = start + rng.randrange(0, 30) if rng.random() < 0.7 else None
+        store.add_fact(f"npc{i % 5}", f"rel{i % 3}", f"obj{i}", valid_from=day(start),
+                       valid_until=day(end) if end is not None else None)
+    facts = store.export_session("test-session")
+
+    def valid(f, t):
+        return f.valid_from <= t and (f.valid_until is None or f.valid_until > t)
+
+    for t in range(-1, 131, 7):
+        expected = {f.id for f in facts if f.subject == "npc2" and valid(f, day(t))}
+        assert {f.id for f in store.get_facts(subject="npc2", as_of=day(t))} == expected
+        expected = {f.id for f in facts if f.predicate == "rel1" and valid(f, day(t))}
+        assert {f.id for f in store.get_facts(predicate="rel1", as_of=day(t))} == expected
+
+    lo, hi = day(40), day(45)
+    expected = {
+        f.id for f in facts
+        if (valid(f, lo) or lo < f.valid_from < hi and (f.valid_until is None or f.valid_until > f.valid_from))
+    }
+    assert {f.id for f in store.get_facts(between=(lo, hi))} == expected
+
+
+def test_interleaved_writes_and_queries_match_brute_force_without_rebuilding_each_time(monkeypatch):
+    builds = []
+    build = interval_index.IntervalIndex._build
+    monkeypatch.setattr(interval_index.IntervalIndex, "_build", lambda self: builds.append(1) or build(self))
+    rng = random.Random(11)
+    store = FactStore("test-session")
+    live = []
+
+    def valid(f, t):
+        return f.valid_from <= t and (f.valid_until is None or f.valid_until > t)
+
+    for i in range(600):
+        roll = rng.random()
+        if roll < 0.15 and live:
+            old = live.pop(rng.randrange(len(live)))
+            start = store.get_fact(old).valid_from + timedelta(days=rng.randrange(0, 20))
+            live.append(store.overwrite_fact(old, f"npc{i % 4}", "rel", f"obj{i}", justification="",
+                                             valid_from=start))
+        elif roll < 0.2:
+            store.delete_facts_by_provenance(f"batch{rng.randrange(10)}")
+            remaining = {f.id for f in store.export_session("test-session")}
+            live = [fid for fid in live if fid in remaining]
+        else:
+            live.append(store.add_fact(f"npc{i % 4}", "rel", f"obj{i}", valid_from=day(rng.randrange(0, 100)),
+                                       provenance=f"batch{rng.randrange(10)}"))
+        t = day(rng.randrange(-5, 130))
+        facts = store.export_session("test-session")
+        assert {f.id for f in store.get_facts(as_of=t)} == {f.id for f in facts if valid(f, t)}
+        expected = {f.id for f in facts if f.subject == "npc1" and valid(f, t)}
+        assert {f.id for f in store.get_facts(subject="npc1", as_of=t)} == expected
+        lo, hi = t, t + timedelta(days=3)
+        expected = {f.id for f in facts
+                    if valid(f, lo) or lo < f.valid_from < hi and (f.valid_until is None or f.valid_until > f.valid_from)}
+        assert {f.id for f in store.get_facts(between=(lo, hi))} == expected
+
+    # One query after every write, yet the trees are rebuilt only every REBUILD_MIN or so writes
+    assert len(builds) < 600 * 5 // interval_index.REBUILD_MIN
+
+
+@pytest.mark.parametrize("cache", [True, False], ids=["cached", "uncached"])
+def test_sqlite_store_answers_the_same(tmp_path, cache):
+    store = SQLiteFactStore("test-session", str(tmp_path / "facts.db"), cache=cache)
+    old = store.add_fact("king", "rules", "kingdom", valid_from=day(0))
+    new = store.overwrite_fact(old, "king", "rules", "empire", justification="conquest", valid_from=day(10))
+
+    assert store.get_fact(old).valid_until == day(10)
+    assert [f.id for f in store.get_facts(subject="king", as_of=day(5))] == [old]
+    assert store.count_facts(subject="king", between=(day(5), day(15))) == 2
+    assert [f.id for f in store.iter_facts(as_of=day(12))] == [new]
+    store.close()
@@ -0,0 +1,68 @@
+# test_hybrid_retrieval.py
+
+import pytest
+from langchain_core.documents import Document
+
+from lc_core.chain_manager import ChainManager
+from lc_core.hybrid_retrieval import FactMemory, estimate_tokens, merge_context
+
+
+def test_merge_interleaves_by_rank_and_drops_restated_facts():
+    store = FactMemory(None).get("s")
+    store.add_fact("Frodo", "carries", "the ring")
+    store.add_fact("Sam", "carries", "the pans")
+    store.add_fact("Gollum", "wants", "the ring")
+    facts = store.get_facts(predicate="carries") + store.get_facts(subject="Gollum")
+    docs = [Document(page_content="Sam carries the pans up the mountain"),
+            Document(page_content="The ring grows heavier"),
+            Document(page_content="The ring grows heavier")]
+
+    kept_facts, kept_docs = merge_context(facts, docs, token_budget=1000)
+    # The second fact is already stated by a retrieved chunk; the repeated chunk is dropped
+    assert [f.subject for f in kept_facts] == ["Frodo", "Gollum"]
+    assert [doc.page_content for doc in kept_docs] == ["Sam carries the pans up the mountain", "The ring grows heavier"]
+
+    # Under a tight budget the best-ranked items win, facts before hits of the same rank
+    kept_facts, kept_docs = merge_context(facts, docs, token_budget=estimate_tokens("Frodo carries the ring"))
+    assert [f.subject for f in kept_facts] == ["Frodo"] and kept_docs == []
+
+
+def test_find_facts_ranks_facts_matching_more_of_the_question_first():
+    facts = FactMemory(None)
+    store = facts.get("s")
+    store.add_fact("Frodo", "carries", "the ring")
+    store.add_fact("Frodo", "lives in", "the Shire")
+    store.add_fact("Bilbo", "lives in", "Rivendell")
+
+    assert facts.extract_entities("Where does Frodo live? Frodo lives in?", "s") == (["Frodo"], ["lives in"])
+    found = facts.find_facts("where does frodo lives in", "s")
+    assert [(f.subject, f.predicate) for f in found] == [("Frodo", "lives in"), ("Frodo", "carries")]
+    assert facts.find_facts("what about the weather", "s") == []
+
+
+def test_chain_retrieve_adds_facts_to_the_context(hash_memory):
+    facts = FactMemory(None)
+    facts.get("s").add_fact("Aragorn", "wields", "Anduril")
+    hash_memory.add(["the fellowship rests in Lothlorien"], "s")
+
+    ctx = ChainManager(hash_memory, facts=facts).retrieve("what does Aragorn wield?", session_id="s")
+    assert [f.object for f in ctx.facts] == ["Anduril"]
+    assert ctx.text.startswith("Known facts:\n- Aragorn wields Anduril")
+    assert {"facts", "merge"} <= set(ctx.timings)
+
+
+@pytest.mark.parametrize("on_disk", [False, True], ids=["memory", "sqlite"])
+def test_entity_matchers_follow_same_size_changes(tmp_path, on_disk):
+    facts = FactMemory(None)
+    if on_disk:
+        facts.path = str(tmp_path / "facts.db")
+    store = facts.get("s")
+    store.add_fact("king", "rules", "the kingdom", provenance="chapter1")
+    assert facts.extract_entities("the king rules how?", "s") == (["king"], ["rules"])
+
+    # Delete-then-add keeps the subject and predicate counts the same
+    store.delete_facts_by_provenance("chapter1")
+    store.add_fact("queen", "governs", "the kingdom", provenance="chapter2")
+    assert facts.extract_entities("who governs now, the queen or the king?", "s") == (["queen"], ["governs"])
+    assert [f.object for f in facts.find_facts("what does the queen govern?", "s")] == ["the kingdom"]
+    facts.close()
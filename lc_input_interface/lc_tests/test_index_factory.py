@@ -0,0 +1,100 @@
+# test_index_factory.py
+
+from functools import partial
+
+import faiss
+import numpy as np
+import pytest
+
+from lc_core import index_factory, memory_manager
+from lc_core.index_factory import initial_index, should_train, train_from
+
+FACTORY = "IVF4,Flat"
+
+
+def test_trainable_factory_buffers_in_a_flat_index_until_the_threshold(monkeypatch):
+    monkeypatch.setattr(index_factory, "FAISS_TRAIN_MIN_VECTORS", 64)
+    index = initial_index(8, FACTORY)
+    assert type(index) is faiss.IndexFlatL2 and index.is_trained
+
+    vectors = np.random.default_rng(0).standard_normal((64, 8)).astype(np.float32)
+    index.add(vectors[:63])
+    assert not should_train(index, FACTORY)
+    index.add(vectors[63:])
+    assert should_train(index, FACTORY)
+
+    trained = train_from(index, FACTORY)
+    assert faiss.extract_index_ivf(trained).nlist == 4
+    # Same rows in the same order, so the docstore mapping still holds
+    np.testing.assert_array_equal(faiss.extract_index_ivf(trained).reconstruct_n(0, 64), vectors)
+    assert not should_train(trained, FACTORY)
+
+
+def test_flat_factory_never_trains():
+    index = initial_index(8, "Flat")
+    index.add(np.zeros((100, 8), dtype=np.float32))
+    assert not should_train(index, "Flat")
+
+
+@pytest.fixture
+def ivf_memory(hash_memory, monkeypatch):
+    monkeypatch.setattr(index_factory, "FAISS_TRAIN_MIN_VECTORS", 40)
+    monkeypatch.setattr(memory_manager, "initial_index", partial(initial_index, factory=FACTORY))
+    monkeypatch.setattr(memory_manager, "should_train", partial(should_train, factory=FACTORY))
+    monkeypatch.setattr(memory_manager, "train_from", partial(train_from, factory=FACTORY))
+    return hash_memory
+
+
+def test_memory_trains_on_ingest_at_the_threshold(ivf_memory):
+    texts = [f"entry {i} about cave{i} torch{i} map{i}" for i in range(50)]
+    ivf_memory.add(texts[:39], "s")
+    store = ivf_memory.get_store("s")
+    assert type(store.index) is faiss.IndexFlatL2
+    # Untrained: searches run against the flat buffer
+    assert ivf_memory.search(texts[5], 1, "s")[0].page_content == texts[5]
+
+    ivf_memory.add(texts[39:], "s")
+    store = ivf_memory.get_store("s")
+    assert type(store.index) is not faiss.IndexFlatL2
+    assert faiss.extract_index_ivf(store.index).is_trained and store.index.ntotal == 50
+    faiss.extract_index_ivf(store.index).nprobe = 4
+    for i in (0, 38, 49):
+        assert ivf_memory.search(texts[i], 1, "s")[0].page_content == texts[i]
+
+
+def test_deleting_from_a_trained_shard_keeps_hits_on_their_documents(ivf_memory):
+    texts = [f"entry {i} about cave{i} torch{i} map{i}" for i in range(50)]
+    ids = ivf_memory.add(texts, "s")
+    assert ivf_memory.delete_documents("s", [ids[i] for i in (3, 7, 20, 33, 41)]) == 5
+    ivf_memory.save()                                # checkpoints the trained shard
+    ivf_memory.delete_documents("s", [ids[0]])
+    ivf_memory.save()                                # appended to the log, replayed on reopen
+
+    reloaded = memory_manager.VectorStoreMemory()
+    reloaded.root = ivf_memory.root
+    for memory in (ivf_memory, reloaded):
+        store = memory.get_store("s")
+        assert faiss.extract_index_ivf(store.index).is_trained and store.index.ntotal == 44
+        faiss.extract_index_ivf(store.index).nprobe = 4
+        for i in (1, 10, 15, 45, 49):
+            assert memory.search(texts[i], 1, "s")[0].page_content == texts[i]
+        assert all(hit.page_content != texts[7] for hit in memory.search(texts[7], 5, "s"))
+
+
+def test_reading_a_saved_shard_leaves_it_mapped(hash_memory, monkeypatch):
+    texts = [f"entry {i} about cave{i} torch{i} map{i}" for i in range(5)]
+    hash_memory.add(texts, "s")
+    hash_memory.save()
+    reloaded = memory_manager.VectorStoreMemory()
+    reloaded.root = hash_memory.root
+
+    monkeypatch.setattr(memory_manager, "FAISS_MMAP_READ_ONLY", True)
+    store = reloaded.get_store("s")
+    assert store.similarity_search(texts[2], k=1)[0].page_content == texts[2]
+    assert "s" in reloaded._mapped
+    with pytest.raises(RuntimeError):
+        reloaded.get_store("s", writable=True)
+
+    monkeypatch.setattr(memory_manager, "FAISS_MMAP_READ_ONLY", False)
+    reloaded.get_store("s", writable=True)
+    assert "s" not in reloaded._mapped
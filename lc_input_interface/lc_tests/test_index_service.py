@@ -0,0 +1,91 @@
+# test_index_service.py
+
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+import pytest
+
+from benchmarks.fake_embedding import in_memory_manager
+from lc_core.index_service import IndexServer, RemoteMemory
+
+AUTHKEY = b"test-secret"
+
+
+@pytest.fixture
+def server():
+    # Unix socket paths are limited to ~100 bytes, so not under pytest's tmp_path
+    folder = tempfile.mkdtemp(prefix="lc_index")
+    server = IndexServer(in_memory_manager(), address=os.path.join(folder, "index.sock"), authkey=AUTHKEY)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    # Closing the listener does not wake the blocked accept(); the daemon thread is left behind
+    server.shutdown()
+    shutil.rmtree(folder, ignore_errors=True)
+
+
+def client(server):
+    return RemoteMemory(server.address, authkey=AUTHKEY, connect_timeout=5)
+
+
+def test_calls_round_trip_through_the_service(server):
+    remote = client(server)
+    ids = remote.add(["the blacksmith forges swords", "the baker sells bread"], "village")
+    assert len(ids) == 2 and remote.size("village") == 2 and remote.list_sessions() == ["village"]
+
+    assert remote.search("who forges swords", 1, "village")[0].page_content == "the blacksmith forges swords"
+    ctx = remote.retrieve("who sells bread", 1, "village")
+    assert ctx.docs[0].page_content == "the baker sells bread" and {"embed", "search"} <= set(ctx.timings)
+    assert ctx.vectors.shape == (1, remote.model.dimension)
+    np.testing.assert_allclose(remote.vectors("village", ids[::-1]),
+                               server.memory.model.encode(["the baker sells bread", "the blacksmith forges swords"]))
+    np.testing.assert_allclose(remote.model.encode(["x"]), server.memory.model.encode(["x"]))
+    # Searches of any worker see queued writes of every worker
+    client(server).enqueue("village", "the miller grinds wheat")
+    assert remote.search("who grinds wheat", 1, "village")[0].page_content == "the miller grinds wheat"
+
+    assert remote.import_texts(["chapter one", "chapter two", "chapter three"], "book", batch_size=2) == 3
+    assert [doc.metadata["chunk"] for doc in remote.documents("book")] == [0, 1, 2]
+    assert remote.delete_documents("village", ids[:1]) == 1 and remote.size("village") == 2
+
+
+def test_service_errors_are_raised_in_the_client(server):
+    remote = client(server)
+    with pytest.raises(AttributeError):
+        remote._call("no_such_method")
+    # The connection stays usable
+    assert remote._call("ping") is True
+
+
+def test_get_store_returns_a_searchable_snapshot(server):
+    remote = client(server)
+    remote.add(["the dragon sleeps under the mountain"], "lair")
+    store = remote.get_store("lair")
+    assert store.index.ntotal == 1
+    assert store.similarity_search("where does the dragon sleep", k=1)[0].page_content \
+        == "the dragon sleeps under the mountain"
+    assert remote.get_store("nowhere", create=False) is None
+    # A snapshot: writing to it does not change the service's shard
+    store.add_texts(["a local note"])
+    assert remote.size("lair") == 1
+
+
+def test_deletes_by_one_worker_run_every_workers_on_forget(server):
+    deleting, other = client(server), client(server)
+    forgotten = {id(deleting): [], id(other): []}
+    for remote in (deleting, other):
+        remote.on_forget.append(forgotten[id(remote)].append)
+    ids = deleting.add(["the vault code is 1234"], "s1")
+    deleting.add(["the weather is fine"], "s2")
+    other.size()                      # both in sync before the deletes
+
+    deleting.delete_documents("s1", ids)
+    assert forgotten[id(deleting)] == ["s1"]    # before the call returns
+    deleting.delete("s2")
+
+    # The other worker learns of both on its next call, before it can serve from its cache
+    assert other.search("vault code", 1, "s1") == []
+    assert sorted(forgotten[id(other)]) == ["s1", "s2"]
+    assert forgotten[id(deleting)] == ["s1", "s2"]
@@ -0,0 +1,90 @@
+# test_ingest_queue.py
+
+import threading
+import time
+
+from lc_core.ingest_queue import IngestQueue
+
+
+class RecordingSink:
+    def __init__(self):
+        self.batches = []
+        self.times = []
+        self.written = threading.Event()
+
+    def __call__(self, batch):
+        self.batches.append({sid: [text for text, _ in items] for sid, items in batch.items()})
+        self.times.append(time.monotonic())
+        self.written.set()
+        return {sid: [f"id-{text}" for text, _ in items] for sid, items in batch.items()}
+
+    def sizes(self):
+        return [sum(len(texts) for texts in batch.values()) for batch in self.batches]
+
+
+def test_a_full_batch_is_written_without_waiting_for_the_delay():
+    sink = RecordingSink()
+    ingest = IngestQueue(sink, max_batch=4, max_delay=60)
+    futures = [ingest.submit("s", f"t{i}") for i in range(4)]
+    assert [future.result(timeout=2) for future in futures] == ["id-t0", "id-t1", "id-t2", "id-t3"]
+    assert sink.sizes() == [4]
+    ingest.close()
+
+
+def test_a_burst_is_written_in_micro_batches_of_max_batch():
+    sink = RecordingSink()
+    ingest = IngestQueue(sink, max_batch=4, max_delay=60)
+    with ingest._flush_lock:    # hold the worker back until the whole burst is queued
+        futures = [ingest.submit(f"s{i % 3}", f"t{i}") for i in range(11)]
+    deadline = time.monotonic() + 2
+    while len(sink.batches) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # The remaining three wait for max_delay
+    assert sink.sizes() == [4, 4] and len(ingest) == 3
+    ingest.close()
+    assert sink.sizes() == [4, 4, 3] and all(future.done() for future in futures)
+    assert sorted(text for batch in sink.batches for texts in batch.values() for text in texts) \
+        == sorted(f"t{i}" for i in range(11))
+
+
+def test_a_partial_batch_is_written_once_the_oldest_write_is_max_delay_old():
+    sink = RecordingSink()
+    ingest = IngestQueue(sink, max_batch=100, max_delay=0.1)
+    started = time.monotonic()
+    future = ingest.submit("s", "lonely")
+    assert future.result(timeout=2) == "id-lonely"
+    assert sink.times[0] - started >= 0.1
+    ingest.close()
+
+
+def test_writes_left_behind_keep_their_age():
+    sink = RecordingSink()
+    ingest = IngestQueue(sink, max_batch=3, max_delay=0.3)
+    started = time.monotonic()
+    ingest.submit("a", "a0")
+    left_behind = ingest.submit("b", "b0")
+    time.sleep(0.15)
+    ingest.submit("a", "a1")
+    ingest.submit("a", "a2")        # fills a batch of session a's three writes
+    assert left_behind.result(timeout=2) == "id-b0"
+    assert sink.batches[0] == {"a": ["a0", "a1", "a2"]}
+    # Due 0.3s after b0 was queued, not 0.3s after a's batch was taken
+    assert sink.times[1] - started < 0.42
+    ingest.close()
+
+
+def test_close_drains_everything_queued():
+    sink = RecordingSink()
+    ingest = IngestQueue(sink, max_batch=5, max_delay=60)
+    futures = [ingest.submit(f"s{i % 2}", f"t{i}") for i in range(12)]
+    ingest.close()
+    assert all(future.done() for future in futures) and len(ingest) == 0
+    assert sum(sink.sizes()) == 12 and max(sink.sizes()) <= 5
+
+
+def test_a_session_sees_its_own_queued_writes(hash_memory):
+    future = hash_memory.enqueue("s", "the bell tolls at midnight", {})
+    # The search flushes the session's pending writes first
+    hit = hash_memory.search("when does the bell toll", 1, "s")[0]
+    assert hit.page_content == "the bell tolls at midnight" and future.result(timeout=2) == hit.id
+    assert hash_memory.search("the bell tolls", 1, "other") == []
@@ -0,0 +1,96 @@
+# test_live_provider.py
+
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from input_providers.live import LiveInputProvider
+
+
+def append(path, *records):
+    with open(path, "a") as f:
+        for record in records:
+            f.write((json.dumps(record) if isinstance(record, dict) else record) + "\n")
+
+
+@pytest.fixture(params=[True, False], ids=["inotify", "poll"])
+def provider_factory(tmp_path, request):
+    made = []
+
+    def make(**kwargs):
+        kwargs.setdefault("window", 0.05)
+        kwargs.setdefault("poll_interval", 0.05)
+        provider = LiveInputProvider(str(tmp_path / "game.jsonl"), use_inotify=request.param, **kwargs)
+        made.append(provider)
+        return provider
+
+    yield str(tmp_path / "game.jsonl"), make
+    for provider in made:
+        provider.close()
+
+
+def drain(provider, idle=0.3):
+    return [chunk.text for chunk in provider.chunks(idle_timeout=idle)]
+
+
+def test_reads_jsonl_text_fields_and_resumes_from_offset(provider_factory):
+    path, make = provider_factory
+    append(path, {"text": "the dragon wakes"}, {"message": "the knight flees"}, "not json")
+    assert drain(make()) == ["the dragon wakes\nthe knight flees\nnot json"]
+
+    # A new provider resumes after what was already consumed
+    append(path, {"content": "the village burns"})
+    assert drain(make()) == ["the village burns"]
+
+
+def test_partial_line_waits_for_its_newline(provider_factory):
+    path, make = provider_factory
+    with open(path, "w") as f:
+        f.write('{"text": "half a li')
+    provider = make()
+    assert drain(provider, idle=0.1) == []
+    with open(path, "a") as f:
+        f.write('ne"}\n')
+    assert drain(provider) == ["half a line"]
+
+
+def test_rotation_and_truncation(provider_factory):
+    path, make = provider_factory
+    provider = make()
+    append(path, {"text": "before rotation"})
+    assert drain(provider) == ["before rotation"]
+
+    append(path, {"text": "last words"})
+    os.rename(path, path + ".1")
+    append(path, {"text": "fresh file"})
+    assert drain(provider) == ["last words\nfresh file"]
+
+    with open(path, "w") as f:
+        f.write(json.dumps({"text": "after truncate"}) + "\n")
+    assert drain(provider) == ["after truncate"]
+
+
+def test_chunks_split_by_token_budget(provider_factory):
+    path, make = provider_factory
+    append(path, *({"text": "x" * 40} for _ in range(10)))  # ~11 tokens each
+    chunks = list(make(max_tokens=30, window=10).chunks(idle_timeout=0.3))
+    assert [len(chunk.records) for chunk in chunks] == [3, 3, 3, 1]
+
+
+def test_waits_for_new_lines_without_fixed_sleep(provider_factory):
+    path, make = provider_factory
+    append(path, {"text": "first"})
+    provider = make()
+    assert provider.get_next_chunk() == "first"
+
+    def write_later():
+        time.sleep(0.1)
+        append(path, {"text": "second", "ts": time.time()})
+
+    threading.Thread(target=write_later).start()
+    start = time.monotonic()
+    assert provider.get_next_chunk() == "second"
+    assert time.monotonic() - start < 1.0
@@ -0,0 +1,79 @@
+# test_memory_manager.py
+
+import pytest
+
+from benchmarks.fake_embedding import in_memory_manager
+
+
+@pytest.fixture
+def memory():
+    memory = in_memory_manager(dimension=64)
+    yield memory
+    memory.ingest.close()
+
+
+def test_search_never_returns_another_sessions_documents(memory):
+    memory.add([f"dragon lair note {i}: rune{i} glyph{i} sigil{i} ward{i}" for i in range(20)], "a")
+    memory.add([f"dragon lair secret {i}: rune{i} glyph{i} sigil{i} ward{i}" for i in range(20)], "b")
+
+    for session_id in ("a", "b"):
+        hits = memory.search("dragon lair", 40, session_id)
+        assert len(hits) == 20
+        assert {doc.metadata["session_id"] for doc in hits} == {session_id}
+    # A session that was never written has nothing to find, not the others' hits
+    assert memory.search("dragon lair", 5, "c") == []
+    assert memory.size("a") == memory.size("b") == 20
+
+
+def disk_memory(root):
+    """A VectorStoreMemory on HashEmbedding persisting under `root`."""
+    memory = in_memory_manager()
+    memory.root = str(root)
+    memory._sessions = None
+    return memory
+
+
+def test_deleted_session_recreated_before_save_does_not_resurrect(tmp_path):
+    memory = disk_memory(tmp_path)
+    memory.add(["the secret password is swordfish"], "s1")
+    memory.save()
+    memory.delete("s1")
+    memory.add(["a brand new beginning"], "s1")
+    memory.save()
+    memory.ingest.close()
+
+    reloaded = disk_memory(tmp_path)
+    assert [doc.page_content for doc in reloaded.documents("s1")] == ["a brand new beginning"]
+    reloaded.ingest.close()
+
+
+def test_saved_adds_and_deletes_survive_reload(tmp_path):
+    memory = disk_memory(tmp_path)
+    ids = memory.add([f"log line {i}: lantern{i} rope{i} coin{i}" for i in range(5)], "s1")
+    memory.save()                       # first save checkpoints
+    memory.delete_documents("s1", ids[:2])
+    memory.add(["one more line"], "s1")
+    memory.save()                       # then the log is appended to
+    memory.ingest.close()
+
+    reloaded = disk_memory(tmp_path)
+    texts = [doc.page_content for doc in reloaded.documents("s1")]
+    assert texts == [f"log line {i}: lantern{i} rope{i} coin{i}" for i in range(2, 5)] + ["one more line"]
+    reloaded.ingest.close()
+
+
+def test_import_streams_each_batch_to_the_log(tmp_path):
+    memory = disk_memory(tmp_path)
+    texts = [f"chapter {i}: lantern{i} rope{i} coin{i}" for i in range(10)]
+    unsaved = []
+    memory.import_texts(iter(texts), "book", batch_size=3,
+                        progress=lambda count: unsaved.append(len(memory._pending.get("book", []))))
+    assert unsaved == [0, 0, 0, 0]
+    storage = memory._storage("book")
+    assert storage.exists() and storage.wal_entries == 3   # first batch checkpoints, the rest are logged
+    memory.ingest.close()
+
+    # No save(): every batch is already on disk
+    reloaded = disk_memory(tmp_path)
+    assert [doc.page_content for doc in reloaded.documents("book")] == texts
+    reloaded.ingest.close()
@@ -0,0 +1,57 @@
+# test_memory_store.py
+
+import pytest
+
+faiss = pytest.importorskip("faiss")
+pytest.importorskip("langchain_community")
+
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores.faiss import FAISS
+from langchain_core.embeddings import Embeddings
+
+from lc_memory.memory_store import store_memory, retrieve_context
+
+DIM = 8
+
+
+class KeywordEmbedding(Embeddings):
+    """Bag-of-words hashing embedding, deterministic and model-free."""
+
+    def _vector(self, text):
+        vector = [0.0] * DIM
+        for word in text.lower().split():
+            vector[sum(map(ord, word)) % DIM] += 1.0
+        return vector
+
+    def embed_documents(self, texts):
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+def make_store(model):
+    return FAISS(
+        embedding_function=model,
+        index=faiss.IndexFlatL2(DIM),
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={},
+    )
+
+
+def test_store_memory_tags_session():
+    model = KeywordEmbedding()
+    store = make_store(model)
+    doc_id = store_memory("chat-1", "User: Hi\nAI: Hello!", embedding_model=model, vectorstore=store)
+    doc = store.docstore.search(doc_id)
+    assert doc.metadata["session_id"] == "chat-1"
+    assert store.index.ntotal == 1
+
+
+def test_retrieve_context_filters_by_session():
+    model = KeywordEmbedding()
+    store = make_store(model)
+    store_memory("chat-1", "the dragon sleeps", embedding_model=model, vectorstore=store)
+    store_memory("chat-2", "the dragon wakes", embedding_model=model, vectorstore=store)
+    results = retrieve_context("chat-1", "dragon", k=5, embedding_model=model, vectorstore=store)
+    assert results == ["the dragon sleeps"]
@@ -0,0 +1,96 @@
+# test_metrics.py
+
+import pytest
+
+from lc_core import metrics
+from lc_core.metrics import Histogram, MetricsRegistry, span
+
+
+def samples(text):
+    """{series: value} from Prometheus text, skipping HELP/TYPE comments."""
+    out = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            series, value = line.rsplit(" ", 1)
+            out[series] = float(value)
+    return out
+
+
+def test_histogram_buckets_are_cumulative_and_upper_bounds_inclusive():
+    histogram = Histogram("h", "test", buckets=(1, 2, 5))
+    for value in (0.5, 1, 1.5, 2, 5, 7):
+        histogram.observe(value)
+    got = samples("\n".join(histogram.render()))
+    # A value equal to a bound falls in that bucket (le = "less than or equal")
+    assert got == {
+        'h_bucket{le="1"}': 2,
+        'h_bucket{le="2"}': 4,
+        'h_bucket{le="5"}': 5,
+        'h_bucket{le="+Inf"}': 6,
+        "h_sum": 17.0,
+        "h_count": 6,
+    }
+
+
+def test_render_is_prometheus_text_with_sorted_labels():
+    registry = MetricsRegistry()
+    requests = registry.counter("app_requests_total", "Requests served")
+    requests.inc(route="/", method="GET")
+    requests.inc(2, route="/", method="GET")
+    requests.inc(route="/ask", method="POST")
+    registry.histogram("app_seconds", "Latency", buckets=(0.1,)).observe(0.05, route="/")
+    registry.add_collector(lambda: [("app_sessions", "gauge", "Open sessions", [({"kind": "live"}, 3)])])
+
+    text = registry.render()
+    assert text.endswith("\n")
+    lines = text.splitlines()
+    assert lines[:4] == [
+        "# HELP app_requests_total Requests served",
+        "# TYPE app_requests_total counter",
+        'app_requests_total{method="GET",route="/"} 3.0',
+        'app_requests_total{method="POST",route="/ask"} 1.0',
+    ]
+    assert "# TYPE app_seconds histogram" in lines
+    assert 'app_seconds_bucket{route="/",le="0.1"} 1' in lines
+    assert 'app_seconds_bucket{route="/",le="+Inf"} 1' in lines
+    assert lines[-3:] == ["# HELP app_sessions Open sessions", "# TYPE app_sessions gauge", 'app_sessions{kind="live"} 3']
+    # Registering a name again returns the same metric
+    assert registry.counter("app_requests_total", "ignored") is requests
+
+
+def test_a_failing_collector_does_not_break_the_scrape():
+    registry = MetricsRegistry()
+    registry.counter("ok_total", "Fine").inc()
+
+    def broken():
+        raise RuntimeError("index not loaded")
+
+    registry.add_collector(broken)
+    text = registry.render()
+    assert "ok_total 1.0" in text and "# collector failed: index not loaded" in text
+
+
+def test_span_records_duration_size_and_errors():
+    before = samples(metrics.METRICS.render())
+    with span("test.op", size=3):
+        pass
+    with pytest.raises(ValueError):
+        with span("test.op"):
+            raise ValueError("boom")
+    after = samples(metrics.METRICS.render())
+
+    def delta(series):
+        return after.get(series, 0) - before.get(series, 0)
+
+    assert delta('lc_core_span_seconds_count{span="test.op"}') == 2
+    assert delta('lc_core_batch_size_bucket{span="test.op",le="4"}') == 1
+    assert delta('lc_core_batch_size_bucket{span="test.op",le="2"}') == 0
+    assert delta('lc_core_span_errors_total{span="test.op"}') == 1
+
+
+def test_disabled_registry_records_nothing(monkeypatch):
+    monkeypatch.setattr(metrics.METRICS, "enabled", False)
+    before = metrics.METRICS.render()
+    with span("test.disabled", size=1):
+        pass
+    assert metrics.METRICS.render() == before
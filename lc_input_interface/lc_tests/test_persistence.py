@@ -0,0 +1,63 @@
+# test_persistence.py
+
+import glob
+import os
+
+from lc_core import memory_manager
+from lc_core.memory_manager import VectorStoreMemory
+
+TEXTS = [f"ledger entry {i}: barrel{i} crate{i} sack{i}" for i in range(6)]
+
+
+def reopen(memory):
+    reloaded = VectorStoreMemory()
+    reloaded.root = memory.root
+    return reloaded
+
+
+def texts(memory, session_id):
+    return sorted(doc.page_content for doc in memory.search("ledger entry", 50, session_id))
+
+
+def test_later_saves_append_to_the_log(hash_memory):
+    ids = hash_memory.add(TEXTS[:3], "s")
+    hash_memory.save()                               # a new session is checkpointed
+    hash_memory.delete_documents("s", ids[:1])
+    hash_memory.add(TEXTS[3:4], "s")
+    hash_memory.save()
+    assert hash_memory._storage("s").wal_entries == 2
+
+    assert texts(reopen(hash_memory), "s") == TEXTS[1:4]
+
+
+def test_torn_log_tail_is_dropped_and_appends_line_up_after_it(hash_memory):
+    hash_memory.add(TEXTS[:2], "s")
+    hash_memory.save()
+    hash_memory.add(TEXTS[2:3], "s")
+    hash_memory.save()
+    # A crash mid-append leaves half a vector and half a log line
+    folder = hash_memory._session_dir("s")
+    with open(glob.glob(os.path.join(folder, "wal-*.f32"))[0], "ab") as f:
+        f.write(b"\0" * 10)
+    with open(glob.glob(os.path.join(folder, "wal-*.jsonl"))[0], "ab") as f:
+        f.write(b'{"op": "add", "ids": ["x"')
+
+    reloaded = reopen(hash_memory)
+    assert texts(reloaded, "s") == TEXTS[:3]
+    reloaded.add(TEXTS[3:4], "s")
+    reloaded.save()
+    assert texts(reopen(hash_memory), "s") == TEXTS[:4]
+
+
+def test_long_log_is_folded_into_a_new_checkpoint(hash_memory, monkeypatch):
+    monkeypatch.setattr(memory_manager, "WAL_COMPACT_ENTRIES", 2)
+    for text in TEXTS:
+        hash_memory.add([text], "s")
+        hash_memory.save()
+
+    folder = hash_memory._session_dir("s")
+    bases = sorted(name for name in os.listdir(folder) if name.startswith("base-"))
+    with open(os.path.join(folder, "CURRENT")) as f:
+        assert bases == [f.read().strip()] and bases != ["base-000001"]
+    assert hash_memory._storage("s").wal_entries <= 2
+    assert texts(reopen(hash_memory), "s") == TEXTS
@@ -0,0 +1,82 @@
+# test_rerank.py
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from benchmarks.fake_embedding import HashEmbedding, in_memory_manager
+from lc_core.rerank import Reranker, mmr
+from lc_core.retrieval import RetrievalContext
+
+QUERY = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+# Two near-identical, highly relevant hits and a less relevant, different one
+CANDIDATES = np.array([[0.9, 0.1, 0.0], [0.88, 0.12, 0.0], [0.6, 0.0, 0.8]], dtype=np.float32)
+
+
+def test_mmr_skips_near_duplicates_for_a_diverse_hit():
+    assert mmr(QUERY, CANDIDATES, 2, lambda_mult=0.5) == [0, 2]
+    # Relevance only: plain similarity order
+    assert mmr(QUERY, CANDIDATES, 3, lambda_mult=1.0) == [0, 1, 2]
+    assert mmr(QUERY, CANDIDATES, 10, lambda_mult=0.5) == [0, 2, 1]
+    assert mmr(QUERY, CANDIDATES[:0], 2) == [] and mmr(QUERY, CANDIDATES, 0) == []
+
+
+def context(vectors=None):
+    ctx = RetrievalContext(query="q", session_id="s", k=3, vector=QUERY)
+    ctx.docs = [Document(page_content=text) for text in ("first", "first again", "something else")]
+    ctx.vectors = vectors
+    return ctx
+
+
+def no_embedding(texts):
+    raise AssertionError("candidates were re-encoded")
+
+
+def test_rerank_uses_the_searched_vectors_instead_of_re_encoding():
+    reranker = Reranker(no_embedding, lambda_mult=0.5, budget=10.0)
+    docs = reranker.rerank(context(CANDIDATES), 2)
+    assert [doc.page_content for doc in docs] == ["first", "something else"]
+
+
+def test_rerank_encodes_when_the_index_gave_no_vectors():
+    calls = []
+
+    def embed(texts):
+        calls.append(list(texts))
+        return CANDIDATES
+
+    docs = Reranker(embed, lambda_mult=0.5, budget=10.0).rerank(context(None), 2)
+    assert [doc.page_content for doc in docs] == ["first", "something else"]
+    assert calls == [["first", "first again", "something else"]]
+
+
+def test_rerank_keeps_search_order_once_the_budget_is_spent():
+    reranker = Reranker(no_embedding, budget=0.05)
+    ctx = context(CANDIDATES)
+    ctx.timings["search"] = 0.06        # retrieval alone used up the budget
+    assert [doc.page_content for doc in reranker.rerank(ctx, 2)] == ["first", "first again"]
+    assert "mmr" not in ctx.timings
+
+    # A stage whose running cost would overrun what is left is skipped as well
+    reranker._cost["mmr"] = 0.01
+    ctx = context(CANDIDATES)
+    ctx.timings["search"] = 0.03
+    assert [doc.page_content for doc in reranker.rerank(ctx, 2)] == ["first", "first again"]
+    assert [doc.page_content for doc in reranker.rerank(ctx, 2, budget=1.0)] == ["first", "something else"]
+
+
+@pytest.fixture
+def memory():
+    memory = in_memory_manager()
+    yield memory
+    memory.ingest.close()
+
+
+def test_retrieve_returns_the_hits_stored_vectors(memory):
+    texts = [f"torch{i} rope{i} lantern map" for i in range(6)]
+    memory.add(texts, "s")
+    ctx = memory.retrieve("lantern map torch2", 4, "s")
+    assert len(ctx.docs) == 4 and ctx.docs[0].page_content == texts[2]
+    np.testing.assert_allclose(ctx.vectors, HashEmbedding().encode([doc.page_content for doc in ctx.docs]), rtol=1e-6)
+    assert [doc.page_content for doc in ctx.docs] \
+        == [doc.page_content for doc in memory.search_by_vector(ctx.vector, 4, "s")]
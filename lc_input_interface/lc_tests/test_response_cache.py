@@ -0,0 +1,71 @@
+# test_response_cache.py
+
+from lc_core.chain_manager import ChainManager
+from lc_core.response_cache import ResponseCache
+
+
+def test_lru_evicts_the_least_recently_used_entry():
+    cache = ResponseCache(max_entries=2, ttl=None)
+    cache.put("a", "s", "answer a", latency=1.5, tokens=10)
+    cache.put("b", "s", "answer b")
+    assert cache.get("a") == "answer a"     # a is now the most recent
+    cache.put("c", "s", "answer c")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "answer a" and cache.get("c") == "answer c"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["memory_entries"]) == (3, 1, 2)
+    assert stats["saved_seconds"] == 3.0 and stats["saved_tokens"] == 20
+
+
+def test_sqlite_tier_serves_hits_after_a_restart(tmp_path):
+    path = str(tmp_path / "responses.db")
+    cache = ResponseCache(max_entries=10, ttl=None, path=path)
+    cache.put("k", "s", "persisted answer")
+    cache.close()
+
+    reopened = ResponseCache(max_entries=10, ttl=None, path=path)
+    assert reopened.stats()["memory_entries"] == 0
+    assert reopened.get("k") == "persisted answer"
+    # The disk hit is promoted into the LRU
+    assert reopened.stats()["memory_entries"] == 1 and reopened.stats()["disk_entries"] == 1
+    reopened.close()
+
+
+def test_expired_entries_miss_and_are_dropped_from_both_tiers(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("lc_core.response_cache.time.time", lambda: now[0])
+    cache = ResponseCache(max_entries=10, ttl=60, path=str(tmp_path / "responses.db"))
+    cache.put("k", "s", "stale soon")
+    now[0] += 61
+    assert cache.get("k") is None
+    assert cache.stats()["memory_entries"] == 0 and len(cache.disk) == 0
+    cache.close()
+
+
+def test_invalidate_drops_only_that_sessions_entries(tmp_path):
+    cache = ResponseCache(max_entries=10, ttl=None, path=str(tmp_path / "responses.db"))
+    cache.put("a1", "a", "from a")
+    cache.put("b1", "b", "from b")
+    cache.invalidate("a")
+    assert cache.get("a1") is None and cache.get("b1") == "from b"
+    assert len(cache.disk) == 1
+    cache.close()
+
+
+def test_forgetting_documents_invalidates_the_sessions_cached_responses(hash_memory, tmp_path):
+    memory = hash_memory
+    cache = ResponseCache(max_entries=10, ttl=None, path=str(tmp_path / "responses.db"))
+    ChainManager(memory, cache=cache)
+    ids = memory.add(["the vault code is 1234"], "s")
+    memory.add(["the weather is fine"], "other")
+    cache.put("k", "s", "the code is 1234")
+    cache.put("other-k", "other", "fine weather")
+
+    memory.delete_documents("s", ids)
+    assert cache.get("k") is None and cache.get("other-k") == "fine weather"
+
+    cache.put("k2", "other", "fine again")
+    memory.delete("other")
+    assert cache.get("other-k") is None and cache.get("k2") is None
+    cache.close()
@@ -0,0 +1,17 @@
+# test_retrieval.py
+
+def test_retrieve_embeds_the_query_once_and_times_each_stage(hash_memory):
+    hash_memory.add(["the ferryman crosses at dawn", "the miller grinds wheat at noon"], "s")
+    ctx = hash_memory.retrieve("when does the ferryman cross", k=1, session_id="s")
+
+    assert hash_memory.model.base.encoded.count("when does the ferryman cross") == 1
+    assert len(ctx.vector) == hash_memory.model.dimension
+    assert [doc.page_content for doc in ctx.docs] == ["the ferryman crosses at dawn"]
+    assert ctx.doc_ids == [ctx.docs[0].id] and ctx.text == "the ferryman crosses at dawn"
+    assert {"embed", "search"} <= set(ctx.timings) and ctx.total_time >= 0
+
+
+def test_retrieve_from_an_unknown_session_finds_nothing(hash_memory):
+    hash_memory.add(["the ferryman crosses at dawn"], "s")
+    ctx = hash_memory.retrieve("the ferryman", k=3, session_id="other")
+    assert ctx.docs == [] and ctx.text == ""
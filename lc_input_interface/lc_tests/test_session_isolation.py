@@ -0,0 +1,26 @@
+# test_session_isolation.py
+
+import pytest
+
+from benchmarks import session_isolation
+from lc_core.memory_manager import VectorStoreMemory
+
+
+@pytest.mark.parametrize("shared", [False, True], ids=["per-session", "shared"])
+def test_threads_mixing_adds_and_searches_only_see_their_own_session(shared):
+    result = session_isolation.run(threads=4, duration=0.5, docs=40, write_every=3, k=10, shared=shared)
+    assert result["ops"] > 4
+    assert result["violations"] == 0
+    assert result["min_session_size"] > 0
+
+
+def test_a_foreign_hit_is_reported_as_a_violation(monkeypatch):
+    # Guard against the check itself going blind: leak one session's hits into another's search
+    search = VectorStoreMemory.search
+
+    def leaky_search(self, query, k, session_id):
+        return search(self, query, k, "session-0")
+
+    monkeypatch.setattr(VectorStoreMemory, "search", leaky_search)
+    result = session_isolation.run(threads=2, duration=0.2, docs=10, write_every=0, k=5, shared=False)
+    assert result["violations"] > 0
@@ -0,0 +1,143 @@
+# test_session_registry.py
+
+import threading
+import time
+
+from benchmarks.fake_embedding import in_memory_manager
+from lc_core.session_registry import SessionRegistry
+
+
+class Occupancy:
+    """Counts threads inside a session's critical sections and records any overlap a writer should prevent."""
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self.readers = self.writers = 0
+        self.max_readers = 0
+        self.violations = []
+
+    def enter(self, writer):
+        with self._mutex:
+            if writer:
+                self.writers += 1
+            else:
+                self.readers += 1
+                self.max_readers = max(self.max_readers, self.readers)
+            if self.writers > 1 or (self.writers and self.readers):
+                self.violations.append((self.readers, self.writers))
+
+    def leave(self, writer):
+        with self._mutex:
+            if writer:
+                self.writers -= 1
+            else:
+                self.readers -= 1
+
+
+def test_concurrent_readers_share_and_a_writer_excludes_them():
+    registry, seen = SessionRegistry(), Occupancy()
+    stop = threading.Event()
+    errors = []
+
+    def reader():
+        while not stop.is_set():
+            with registry.read("s"):
+                seen.enter(False)
+                time.sleep(0.0005)
+                seen.leave(False)
+
+    def writer():
+        try:
+            for _ in range(50):
+                with registry.write("s"):
+                    seen.enter(True)
+                    time.sleep(0.0005)
+                    seen.leave(True)
+        except Exception as e:
+            errors.append(e)
+
+    readers = [threading.Thread(target=reader) for _ in range(6)]
+    writers = [threading.Thread(target=writer) for _ in range(2)]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join(timeout=10)
+    stop.set()
+    for thread in readers:
+        thread.join(timeout=10)
+
+    # Writers were not starved by the stream of readers, and never overlapped anyone
+    assert not any(thread.is_alive() for thread in readers + writers) and not errors
+    assert seen.violations == []
+    assert seen.max_readers > 1
+
+
+def test_waiting_writer_holds_back_new_readers():
+    registry = SessionRegistry()
+    order = []
+    first_reader = registry.read("s")
+    first_reader.__enter__()
+
+    def writer():
+        with registry.write("s"):
+            order.append("writer")
+
+    def late_reader():
+        with registry.read("s"):
+            order.append("late reader")
+
+    threads = [threading.Thread(target=writer)]
+    threads[0].start()
+    while not registry.lock("s")._writers_waiting:
+        time.sleep(0.001)
+    threads.append(threading.Thread(target=late_reader))
+    threads[1].start()
+    time.sleep(0.05)
+    assert order == []              # the writer waits for the first reader, the late reader for the writer
+    first_reader.__exit__(None, None, None)
+    for thread in threads:
+        thread.join(timeout=5)
+    assert order == ["writer", "late reader"]
+
+
+def test_sessions_do_not_wait_on_each_other():
+    registry = SessionRegistry()
+    with registry.write("a"):
+        done = threading.Event()
+
+        def other_session():
+            with registry.write("b"), registry.read("c"):
+                done.set()
+
+        threading.Thread(target=other_session).start()
+        assert done.wait(timeout=2)
+    assert len(registry) == 3 and "a" in registry and "z" not in registry
+
+
+def test_searches_run_against_concurrent_adds():
+    memory = in_memory_manager()
+    memory.add(["the first entry: lantern0 rope0"], "s")
+    stop = threading.Event()
+    results, errors = [], []
+
+    def search():
+        try:
+            while not stop.is_set():
+                hits = memory.search("lantern0 rope0", 50, "s")
+                results.append(len(hits))
+                assert hits[0].page_content == "the first entry: lantern0 rope0"
+        except Exception as e:
+            errors.append(e)
+
+    searchers = [threading.Thread(target=search) for _ in range(4)]
+    for thread in searchers:
+        thread.start()
+    for i in range(1, 30):
+        memory.add([f"entry {i}: candle{i} anvil{i} quill{i}"], "s")
+    stop.set()
+    for thread in searchers:
+        thread.join(timeout=10)
+    memory.ingest.close()
+
+    assert errors == [] and results
+    assert memory.size("s") == 30 and max(results) <= 30
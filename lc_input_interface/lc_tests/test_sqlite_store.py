@@ -0,0 +1,150 @@
+# test_sqlite_store.py
+
+import sqlite3
+
+import pytest
+
+from lc_memory.sqlite_store import SQLiteFactStore
+
+
+@pytest.fixture(params=[True, False], ids=["cached", "uncached"])
+def db(tmp_path, request):
+    path = str(tmp_path / "facts.db")
+    store = SQLiteFactStore("test-session", path, cache=request.param)
+    yield path, request.param, store
+    store.close()
+
+
+def test_facts_survive_reopen(db):
+    path, cache, store = db
+    old = store.add_fact("king", "rules", "kingdom", provenance="legend")
+    new = store.overwrite_fact(old, "king", "rules", "empire", justification="updated lore")
+    store.add_facts([("knight", "wields", "sword"), {"subject": "knight", "predicate": "rides", "object": "horse"}])
+    store.close()
+
+    reopened = SQLiteFactStore("test-session", path, cache=cache)
+    assert len(reopened) == 4
+    assert reopened.get_fact(old).state == "superseded"
+    assert reopened.get_lineage(new)["replaces"] == [old]
+    assert reopened.get_fact(new).justification == "updated lore"
+    assert [f.object for f in reopened.resolve_contradictions("king")] == ["empire"]
+    assert {f.object for f in reopened.get_facts(subject="knight")} == {"sword", "horse"}
+    reopened.close()
+
+
+def test_sessions_share_a_file_without_mixing(db):
+    path, cache, store = db
+    store.add_fact("dragon", "breathes", "fire")
+    other = SQLiteFactStore("other-session", path, cache=cache)
+    other.add_fact("dragon", "breathes", "ice")
+    assert [f.object for f in store.get_facts(subject="dragon")] == ["fire"]
+    assert [f.object for f in other.iter_facts(subject="dragon")] == ["ice"]
+    other.close()
+
+
+def test_delete_by_provenance_and_streaming(db):
+    _, _, store = db
+    store.add_facts(("wizard", "knows", f"spell{i}", {"provenance": "book1"}) for i in range(600))
+    keep = store.add_fact("wizard", "flies", "broom", provenance="book2")
+    assert store.count_facts(provenance="book1") == 600
+    assert sum(1 for _ in store.iter_facts(subject="wizard", batch_size=64)) == 601
+
+    assert store.delete_facts_by_provenance("book1") == 600
+    assert [f.id for f in store.get_facts(subject="wizard")] == [keep]
+    assert store.count_facts() == 1
+
+
+def test_invalid_fact_is_not_cached(db):
+    _, _, store = db
+    with pytest.raises(ValueError):
+        store.add_facts([("ok", "is", "fine"), ("bad", " ", "predicate")])
+    assert len(store) == 0
+
+
+def test_ids_map_to_cache_rows_after_reopen(tmp_path):
+    path = str(tmp_path / "facts.db")
+    store = SQLiteFactStore("test-session", path)
+    ids = store.add_facts(("bard", "sings", f"song{i}", {"provenance": f"night{i % 2}"}) for i in range(10))
+    store.delete_facts_by_provenance("night0")
+    store.close()
+
+    reopened = SQLiteFactStore("test-session", path)
+    # Every stored ID is one the cache minted, so none needs the side table
+    assert reopened.cache._foreign_rows == {}
+    assert [f.object for f in reopened.get_facts(subject="bard")] == [f"song{i}" for i in range(1, 10, 2)]
+    assert reopened.get_fact(ids[3]).object == "song3"
+    with pytest.raises(KeyError):
+        reopened.get_fact(ids[2])
+    new = reopened.add_fact("bard", "sings", "encore")
+    assert new not in ids and reopened.get_fact(new).object == "encore"
+    reopened.close()
+
+
+def test_delete_by_provenance_removes_lineage_links(db):
+    _, _, store = db
+    old = store.add_fact("king", "rules", "kingdom", provenance="legend")
+    new = store.overwrite_fact(old, "king", "rules", "empire", justification="rumour", provenance="rumour")
+    store.overwrite_fact(new, "king", "rules", "nothing", justification="later", provenance="later")
+
+    store.delete_facts_by_provenance("rumour")
+    # Both links touched the deleted fact
+    assert store._conn.execute("SELECT COUNT(*) FROM lineage").fetchone()[0] == 0
+
+
+def test_failed_insert_leaves_cache_untouched(tmp_path):
+    path = str(tmp_path / "facts.db")
+    store = SQLiteFactStore("test-session", path)
+    store.add_fact("ok", "is", "fine")
+    store._conn.execute(
+        "CREATE TRIGGER refuse BEFORE INSERT ON facts WHEN NEW.subject = 'boom' BEGIN SELECT RAISE(ABORT, 'no'); END"
+    )
+    with pytest.raises(sqlite3.DatabaseError):
+        store.add_facts([("good", "is", "fine"), ("boom", "is", "refused")])
+    assert len(store) == 1 and store.get_facts(subject="good") == []
+
+    later = store.add_fact("later", "is", "fine")
+    store.close()
+    reopened = SQLiteFactStore("test-session", path)
+    assert reopened.get_fact(later).subject == "later" and len(reopened) == 2
+    reopened.close()
+
+
+def test_two_caching_writers_on_one_session_never_clash(tmp_path):
+    path = str(tmp_path / "facts.db")
+    first = SQLiteFactStore("test-session", path)
+    second = SQLiteFactStore("test-session", path)
+    a = first.add_facts([("elf", "sings", "a"), ("elf", "sings", "b")])
+    b = second.add_facts([("dwarf", "digs", "c")])
+    c = first.overwrite_fact(b[0], "dwarf", "digs", "deeper", justification="news")
+
+    assert len({*a, *b, c}) == 4
+    # Each writer has caught up with what the other wrote before its own write
+    assert second.get_fact(a[1]).object == "b" and first.get_fact(b[0]).object == "c"
+    first.close()
+    second.close()
+    reopened = SQLiteFactStore("test-session", path)
+    assert reopened.cache._foreign_rows == {}
+    assert reopened.get_lineage(c)["replaces"] == b
+    reopened.close()
+
+
+def test_cached_reads_see_overwrites_and_deletes_from_another_connection(tmp_path):
+    path = str(tmp_path / "facts.db")
+    reader = SQLiteFactStore("test-session", path)
+    writer = SQLiteFactStore("test-session", path)
+    old = writer.add_fact("tower", "stands in", "the north", provenance="map1")
+    writer.add_fact("bridge", "spans", "the river", provenance="map2")
+    assert reader.get_fact(old).state == "active" and len(reader) == 2
+
+    new = writer.overwrite_fact(old, "tower", "stands in", "the south", justification="redrawn")
+    assert reader.get_fact(old).state == "superseded"
+    assert [f.object for f in reader.resolve_contradictions("tower")] == ["the south"]
+    assert reader.get_lineage(new)["replaces"] == [old]
+
+    writer.delete_facts_by_provenance("map2")
+    assert reader.get_facts(subject="bridge") == [] and len(reader) == 2
+    # The reader's own writes still mint free IDs after the reload
+    added = reader.add_fact("gate", "opens", "at dawn")
+    assert writer.get_fact(added).object == "at dawn"
+    reader.close()
+    writer.close()
@@ -0,0 +1,57 @@
+# test_warm_up.py
+
+import threading
+import time
+
+import lc_core
+from lc_core import memory_manager
+from lc_core.chain_manager import ChainManager
+
+
+def count_builds(monkeypatch, delay=0.0):
+    """Wrap the (already faked) model class so constructions are counted, each taking `delay`."""
+    built = []
+    model_class = memory_manager.BGEEmbedding
+
+    def build(*args, **kwargs):
+        time.sleep(delay)
+        built.append(1)
+        return model_class(*args, **kwargs)
+
+    monkeypatch.setattr(memory_manager, "BGEEmbedding", build)
+    return built
+
+
+def test_nothing_loads_until_first_use(hash_memory, monkeypatch):
+    built = count_builds(monkeypatch)
+    chain_manager = ChainManager(hash_memory)
+    assert built == [] and not hash_memory.is_loaded
+    assert chain_manager._chain is None
+
+    hash_memory.add(["the lighthouse keeper trims the wick"], "s")
+    assert hash_memory.retrieve("who trims the wick", k=1, session_id="s").docs
+    assert len(built) == 1 and hash_memory.is_loaded
+
+
+def test_concurrent_first_uses_build_the_model_once(hash_memory, monkeypatch):
+    built = count_builds(monkeypatch, delay=0.05)
+    threads = [threading.Thread(target=lambda: hash_memory.model) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(built) == 1
+
+
+def test_background_warm_up_records_its_error(hash_memory, monkeypatch):
+    def broken(*args, **kwargs):
+        raise OSError("model files missing")
+
+    monkeypatch.setattr(memory_manager, "BGEEmbedding", broken)
+    monkeypatch.setattr(lc_core, "_memory_manager", hash_memory)
+    monkeypatch.setattr(lc_core, "_warm_up_thread", None)
+    monkeypatch.setattr(lc_core, "_warm_up_error", None)
+
+    lc_core.warm_up(background=True).join()
+    assert isinstance(lc_core.get_warm_up_error(), OSError)
+    assert not lc_core.is_ready()